@@ -4,18 +4,28 @@
 
 直接执行模式 - 不依赖 Claude API
 
+各步骤在同一进程内直接调用 scripts/ 中的阶段函数，记录通过职位库 (data/jobs.db) 传递，
+每步返回结构化结果用于统计，不再启动子进程、解析输出文本。
+
 使用方法:
     python agent_workflow.py
 
 环境变量:
     NOTION_TOKEN - Notion Integration Token (必需)
+    MAX_PAGES    - 每个来源的列表最大页数 (默认 5)
+    SOURCES      - 采集来源，逗号分隔 (默认全部，见 scripts/sources.py)
+    MAX_JOBS     - 每次最多抓取详情数 (默认 300)
+    DETAIL_MAX_ATTEMPTS - 详情抓取失败几次后不再重试 (默认 3，见 scripts/job_store.py)
+    ATTACHMENTS  - 设为 0 时跳过附件下载 (默认下载，见 scripts/attachments.py)
+    RECHECK      - 设为 0 时跳过未截止公告的复查 (默认复查，见 scripts/recheck.py)
+    WORKFLOW_TIMINGS - 把各阶段耗时写入该 JSON 文件 (压测用，见 scripts/load_test.py)
 """
 
-import asyncio
 import json
 import os
-import subprocess
 import sys
+import time
+import traceback
 from datetime import datetime
 from pathlib import Path
 
@@ -23,6 +33,17 @@ PROJECT_DIR = Path(__file__).parent
 SCRIPTS_DIR = PROJECT_DIR / "scripts"
 DATA_DIR = PROJECT_DIR / "data"
 
+sys.path.insert(0, str(SCRIPTS_DIR))
+from attachments import attachments_enabled, run_attachments
+from position_table import run_positions
+from http_cache import format_cache_stats
+from job_store import JobStore
+from process_data import run_process
+from recheck import recheck_enabled, run_recheck
+from scrape_detail import run_details
+from scrape_list import run_list
+from sync_notion import run_sync
+
 
 def validate_environment() -> bool:
     """验证必要的环境变量"""
@@ -33,17 +54,21 @@ def validate_environment() -> bool:
     return True
 
 
-def run_script(script_name: str, args: list = None) -> tuple[bool, str]:
-    """运行 Python 脚本"""
-    script_path = SCRIPTS_DIR / script_name
-    cmd = [sys.executable, str(script_path)]
-    if args:
-        cmd.extend(args)
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    output = result.stdout + result.stderr
-    
-    return result.returncode == 0, output
+# 各阶段耗时 (秒)，按执行顺序
+stage_timings = {}
+
+
+def run_stage(name: str, func, *args, **kwargs):
+    """执行一个阶段并记录耗时，异常时打印并返回 None，后续阶段继续（可能有之前的数据）"""
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        print(f"❌ {name}出错:")
+        traceback.print_exc()
+        return None
+    finally:
+        stage_timings[name] = time.perf_counter() - start
 
 
 def main():
@@ -57,80 +82,91 @@ def main():
     
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     
-    stats = {"scraped": 0, "synced": 0, "skipped": 0, "failed": 0}
+    stats = {
+        "scraped": 0, "synced": 0, "updated": 0, "skipped": 0, "near_dup": 0, "failed": 0,
+        "attachments": 0, "positions": 0, "rechecked": 0, "changed": 0,
+    }
+    cache_stats = []
     
     # Step 1: 抓取职位列表
     print("\n" + "="*50)
-    print("🌐 Step 1: 抓取公考雷达职位列表")
+    print("🌐 Step 1: 抓取职位列表 (各来源并发)")
     print("="*50)
     
-    success, output = run_script("scrape_list.py")
-    print(output)
+    max_pages = int(os.environ.get("MAX_PAGES", "5"))
+    result = run_stage("抓取列表", run_list, max_pages)
     
-    if not success:
+    if not result or result["error"]:
         print("❌ 抓取列表失败")
         # 继续执行，可能有之前的数据
-    
-    # 读取职位列表获取 URL
-    today = datetime.now().strftime("%Y%m%d")
-    job_list_file = DATA_DIR / f"job_list_{today}.json"
-    
-    job_urls = []
-    if job_list_file.exists():
-        with open(job_list_file, "r", encoding="utf-8") as f:
-            jobs = json.load(f)
-            job_urls = [job.get("url") for job in jobs if job.get("url")]
-            stats["scraped"] = len(job_urls)
-            print(f"📊 找到 {len(job_urls)} 个职位")
+    else:
+        cache_stats.append(result["cache"])
+        for name, count in result["per_source"].items():
+            print(f"   📌 {name}: {count} 条")
+    
+    # 从职位库读取待抓取详情的 URL（包括之前运行中超出数量限制的，以及失败次数未到上限的，失败过的排在后面）
+    max_jobs = int(os.environ.get("MAX_JOBS", "300"))
+    with JobStore() as store:
+        job_urls = [row["url"] for row in store.pending("list", limit=max_jobs)]
+    stats["scraped"] = len(job_urls)
+    print(f"📊 待抓取详情: {len(job_urls)} 个职位")
     
     # Step 2: 抓取职位详情 (限制数量避免超时)
     if job_urls:
         print("\n" + "="*50)
         print("📄 Step 2: 抓取职位详情")
         print("="*50)
+        print(f"   将处理 {len(job_urls)} 个职位详情")
         
-        max_jobs = int(os.environ.get("MAX_JOBS", "30"))
-        jobs_to_process = job_urls[:max_jobs]
-        print(f"   将处理 {len(jobs_to_process)} 个职位详情")
+        # 一个浏览器，多页并发；结果直接写入职位库
+        result = run_stage("抓取详情", run_details, job_urls)
+        success_count = result["success"] if result else 0
+        if result:
+            cache_stats.append(result["cache"])
+        print(f"   ✅ 详情抓取完成: {success_count}/{len(job_urls)}")
+    
+    # 复查仍在报名期内的已同步公告（已采集的公告不会再出现在待抓取列表中），有更新的重新处理和同步
+    if recheck_enabled():
+        print("\n🔁 复查未截止公告")
+        result = run_stage("复查公告", run_recheck)
+        if result:
+            stats["rechecked"] = result["checked"]
+            stats["changed"] = result["changed"]
+            if result["cache"]:
+                cache_stats.append(result["cache"])
+    
+    # 下载详情页中的附件（内容寻址存储，未变化的附件只发 HEAD）
+    if attachments_enabled():
+        print("\n📎 下载附件")
+        result = run_stage("下载附件", run_attachments)
+        if result:
+            stats["attachments"] = result["downloaded"] + result["deduplicated"]
         
-        success_count = 0
-        for i, url in enumerate(jobs_to_process, 1):
-            print(f"   [{i}/{len(jobs_to_process)}] 获取详情...")
-            success, output = run_script("scrape_detail.py", ["--url", url])
-            if success and "内容长度" in output:
-                success_count += 1
-            else:
-                print(f"      ⚠️ 失败或内容为空")
-        
-        print(f"   ✅ 详情抓取完成: {success_count}/{len(jobs_to_process)}")
+        # 解析附件中的岗位表，每个岗位一条记录
+        print("\n📑 解析岗位表")
+        result = run_stage("解析岗位表", run_positions)
+        if result:
+            stats["positions"] = result["positions"]
     
     # Step 3: 处理数据
     print("\n" + "="*50)
     print("🔄 Step 3: 处理合并数据")
     print("="*50)
     
-    success, output = run_script("process_data.py")
-    print(output)
+    run_stage("处理数据", run_process)
     
     # Step 4: 同步到 Notion
     print("\n" + "="*50)
     print("☁️ Step 4: 同步到 Notion")
     print("="*50)
     
-    success, output = run_script("sync_notion.py")
-    print(output)
-    
-    # 解析同步结果
-    import re
-    match = re.search(r"成功:\s*(\d+)", output)
-    if match:
-        stats["synced"] = int(match.group(1))
-    match = re.search(r"跳过:\s*(\d+)", output)
-    if match:
-        stats["skipped"] = int(match.group(1))
-    match = re.search(r"失败:\s*(\d+)", output)
-    if match:
-        stats["failed"] = int(match.group(1))
+    result = run_stage("同步 Notion", run_sync, os.environ["NOTION_TOKEN"])
+    if result:
+        stats["synced"] = result["success"]
+        stats["updated"] = result["updated"]
+        stats["skipped"] = result["skipped"]
+        stats["near_dup"] = result["near_dup"]
+        stats["failed"] = result["failed"]
     
     # Step 5: 生成报告
     print("\n" + "="*50)
@@ -138,15 +174,27 @@ def main():
     print("="*50)
     print(f"📥 抓取职位: {stats['scraped']} 条")
     print(f"✅ 新增同步: {stats['synced']} 条")
-    print(f"⏭️ 跳过重复: {stats['skipped']} 条")
+    print(f"🔄 更新变更: {stats['updated']} 条")
+    print(f"⏭️ 跳过重复: {stats['skipped']} 条 (其中近似重复 {stats['near_dup']} 条)")
     print(f"❌ 处理失败: {stats['failed']} 条")
+    print(f"🔁 复查公告: {stats['rechecked']} 条, 有更新 {stats['changed']} 条")
+    print(f"📎 下载附件: {stats['attachments']} 个, 解析岗位 {stats['positions']} 个")
+    if any(cache_stats):
+        print(f"💾 响应缓存: {format_cache_stats(*cache_stats)}")
+    print("⏱️ 阶段耗时: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in stage_timings.items()))
+    
+    timings_file = os.environ.get("WORKFLOW_TIMINGS")
+    if timings_file:
+        with open(timings_file, "w", encoding="utf-8") as f:
+            json.dump({"stages": stage_timings, "stats": stats}, f, ensure_ascii=False, indent=2)
     
     # 保存摘要
     summary_file = DATA_DIR / "collect_summary.md"
     with open(summary_file, "w", encoding="utf-8") as f:
         f.write(f"- 抓取职位: {stats['scraped']} 条\n")
         f.write(f"- 新增同步: {stats['synced']} 条\n")
-        f.write(f"- 跳过重复: {stats['skipped']} 条\n")
+        f.write(f"- 更新变更: {stats['updated']} 条\n")
+        f.write(f"- 跳过重复: {stats['skipped']} 条 (其中近似重复 {stats['near_dup']} 条)\n")
     
     print("\n🎉 采集工作流完成!")
 
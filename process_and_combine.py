@@ -1,10 +1,15 @@
 
+import argparse
 import json
 import glob
 import re
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from parallel import DEFAULT_CHUNK_SIZE, Throughput, default_workers, imap_ordered
+
 def extract_salary(text):
     # Match patterns like "3000-5000元", "10-15万", "5k-8k"
     match = re.search(r'(\d+(?:-\d+)?(?:k|K|万|元|kw|KW)(?:/月|/年|/days)?)', text)
@@ -47,7 +52,30 @@ def extract_location(text, title, source):
             
     return "江苏省"
 
-def process_batches():
+def process_item(item_meta):
+    item, meta = item_meta
+    content = item.get("content", "")
+    
+    title = item.get("title") or meta.get("title", "")
+    source = item.get("source") or meta.get("source", "")
+    date_val = item.get("date") or meta.get("date", datetime.now().strftime("%Y-%m-%d"))
+
+    return {
+        "职位名称": title,
+        "招聘单位": source,
+        "薪资范围": extract_salary(content),
+        "工作地点": extract_location(content, title, source),
+        "发布日期": date_val,
+        "来源网站": "公考雷达",
+        "原文链接": item.get("url", ""),
+        "职位描述": content[:2000], # Truncate if too long for Notion text block, though rich_text can handle more, keeping it safe
+        "招聘人数": extract_count(content),
+        "学历要求": extract_education(content),
+        "报名截止": extract_deadline(content),
+        "采集时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def process_batches(workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
     data_dir = "/Users/xusheng/Desktop/视频素材/课程/智能体/00 skill/0106采集招聘信息/job-listing-collector/data"
     today_str = datetime.now().strftime("%Y%m%d")
     output_file = f"{data_dir}/gongkaoleida_{today_str}.json"
@@ -71,33 +99,19 @@ def process_batches():
         except Exception as e:
             print(f"Error loading {jf}: {e}")
 
-    for fpath in batch_files:
-        with open(fpath, 'r', encoding='utf-8') as f:
-            batch_data = json.load(f)
+    def iter_items():
+        for fpath in batch_files:
+            with open(fpath, 'r', encoding='utf-8') as f:
+                batch_data = json.load(f)
             for item in batch_data:
-                content = item.get("content", "")
-                url = item.get("url", "")
-                meta = metadata_map.get(url, {})
-                
-                title = item.get("title") or meta.get("title", "")
-                source = item.get("source") or meta.get("source", "")
-                date_val = item.get("date") or meta.get("date", datetime.now().strftime("%Y-%m-%d"))
+                yield item, metadata_map.get(item.get("url", ""), {})
 
-                job = {
-                    "职位名称": title,
-                    "招聘单位": source,
-                    "薪资范围": extract_salary(content),
-                    "工作地点": extract_location(content, title, source),
-                    "发布日期": date_val,
-                    "来源网站": "公考雷达",
-                    "原文链接": item.get("url", ""),
-                    "职位描述": content[:2000], # Truncate if too long for Notion text block, though rich_text can handle more, keeping it safe
-                    "招聘人数": extract_count(content),
-                    "学历要求": extract_education(content),
-                    "报名截止": extract_deadline(content),
-                    "采集时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                all_jobs.append(job)
+    # Records are processed in chunks across worker processes and merged back in file order
+    throughput = Throughput()
+    for _, job in imap_ordered(process_item, iter_items(), workers, chunk_size):
+        all_jobs.append(job)
+        throughput.add()
+    print(f"Processed {throughput.summary()} (workers: {workers})")
     
     # Save combined file
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -107,4 +121,10 @@ def process_batches():
     return output_file
 
 if __name__ == "__main__":
-    process_batches()
+    parser = argparse.ArgumentParser(description="Combine temp_batch_*.json into gongkaoleida_YYYYMMDD.json")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"Worker processes (0 = all {default_workers()} cores, default 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Records per chunk sent to a worker")
+    args = parser.parse_args()
+    process_batches(args.workers or default_workers(), args.chunk_size)
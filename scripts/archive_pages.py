@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+批量归档 Notion 记录
+
+按条件选出要删除（归档）的页面，先预览，再按限速并发归档:
+    --date       采集时间（或 --date-field 指定的日期属性）在某一天的记录，如一次错误导入
+    --file       数据文件中的原文链接（如 data/gongkaoleida_YYYYMMDD.json）
+    --url        指定原文链接，可重复
+    --exclude-keywords  标题含排除关键词的非招聘公告（成绩、名单、面试等，
+                        默认使用 scrape_list.py 的 EXCLUDE_KEYWORDS，也可逗号分隔自定义）
+多个条件同时给出时取交集。
+
+日期和关键词条件在 Notion 查询中筛选（分页返回）；按链接选择时先查本地索引
+(notion_index.py) 中该链接的全部页面（重复同步产生的同链接页面一起归档），索引中没有的链接
+每 100 个合并成一次 or 查询，不再每个链接单独查询。归档成功的页面同时从本地索引和近似重复索引中移除。
+
+使用方法:
+    python scripts/archive_pages.py --date 2026-01-12 --dry-run
+    python scripts/archive_pages.py --file data/gongkaoleida_20260112.json
+    python scripts/archive_pages.py --exclude-keywords [成绩,名单] [--date 2026-01-12]
+
+环境变量: NOTION_TOKEN (限速/并发见 notion_client.py)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from near_dup import NearDupIndex
+from notion_client import NotionClient, run_concurrent
+from notion_index import NotionIndex, page_title, page_url
+from scrape_list import EXCLUDE_KEYWORDS
+
+DATABASE_NAME = "📋 招聘信息库"
+URL_FILTER_CHUNK = 100  # 单个 or 条件中的链接数
+
+
+def date_conditions(day: str, field: str) -> list:
+    start = date.fromisoformat(day)
+    return [
+        {"property": field, "date": {"on_or_after": start.isoformat()}},
+        {"property": field, "date": {"before": (start + timedelta(days=1)).isoformat()}},
+    ]
+
+
+def keyword_filter(keywords: list) -> dict:
+    return {"or": [{"property": "职位名称", "title": {"contains": kw}} for kw in keywords]}
+
+
+def url_filter(urls: list) -> dict:
+    return {"or": [{"property": "原文链接", "url": {"equals": url}} for url in urls]}
+
+
+def combine(conditions: list, any_of: dict = None) -> dict:
+    """
+    单层 and 条件 + 至多一个 or 子条件 -> 查询筛选
+
+    Notion 的复合筛选最多嵌套两层，因此不把 and / or 条件再套进 and 中
+    """
+    filters = conditions + ([any_of] if any_of else [])
+    if not filters:
+        return None
+    return filters[0] if len(filters) == 1 else {"and": filters}
+
+
+def title_matches(title: str, keywords: list) -> bool:
+    return any(kw in (title or "") for kw in keywords)
+
+
+def load_urls(file_path: str) -> list:
+    """数据文件中的原文链接（JSON 数组，或包含 招聘信息 列表的对象）"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("招聘信息") or data.get("招聘信息列表") or [data]
+    return [job["原文链接"] for job in data if isinstance(job, dict) and job.get("原文链接")]
+
+
+class Archiver:
+    def __init__(self, token: str, database_id: str = None):
+        self.client = NotionClient(token)
+        self.index = NotionIndex()
+        self.database_id = database_id
+
+    def find_database(self) -> bool:
+        """优先使用参数或本地索引中缓存的数据库 ID，否则搜索"""
+        if self.database_id:
+            return True
+        self.database_id = self.index.get_meta("database_id")
+        if self.database_id:
+            return True
+        resp = self.client.post("search", {"query": DATABASE_NAME,
+                                           "filter": {"value": "database", "property": "object"}})
+        if resp.status_code == 200:
+            results = resp.json().get("results", [])
+            if results:
+                self.database_id = results[0]["id"]
+                return True
+        print(f"❌ 未找到数据库: {DATABASE_NAME}")
+        return False
+
+    def query(self, filter_: dict) -> list:
+        """分页查询，返回 [{"page_id", "url", "title"}]"""
+        pages = []
+        has_more = True
+        start_cursor = None
+        while has_more:
+            data = {"page_size": 100, "filter": filter_}
+            if start_cursor:
+                data["start_cursor"] = start_cursor
+            resp = self.client.post(f"databases/{self.database_id}/query", data)
+            if resp.status_code != 200:
+                raise RuntimeError(f"查询失败: {resp.status_code} - {resp.text[:200]}")
+            result = resp.json()
+            for page in result.get("results", []):
+                pages.append({"page_id": page["id"], "url": page_url(page), "title": page_title(page)})
+            has_more = result.get("has_more", False)
+            start_cursor = result.get("next_cursor")
+        return pages
+
+    def select(self, urls: list = None, day: str = None, date_field: str = "采集时间",
+               keywords: list = None) -> list:
+        """
+        按条件（取交集）选出页面
+
+        同时按链接和关键词选择时，查询中只放链接的 or 条件，关键词在返回的标题上筛选
+        """
+        conditions = date_conditions(day, date_field) if day else []
+        if urls is None:
+            return self.query(combine(conditions, keyword_filter(keywords) if keywords else None))
+
+        urls = list(dict.fromkeys(urls))
+        pages = []
+        if not conditions and not keywords:
+            # 只按链接选择：本地索引能解析的不查询，同一链接的多个页面都归档
+            unresolved = []
+            for url in urls:
+                found = self.index.pages(url)
+                pages.extend(found)
+                if not found:
+                    unresolved.append(url)
+            if pages:
+                print(f"🗂️ 本地索引解析: {len(urls) - len(unresolved)} 个链接, {len(pages)} 个页面")
+        else:
+            unresolved = urls
+
+        for i in range(0, len(unresolved), URL_FILTER_CHUNK):
+            chunk = unresolved[i:i + URL_FILTER_CHUNK]
+            found = self.query(combine(conditions, url_filter(chunk)))
+            if keywords:
+                found = [page for page in found if title_matches(page["title"], keywords)]
+            pages.extend(found)
+        return pages
+
+    def archive_page(self, page: dict) -> tuple:
+        try:
+            resp = self.client.patch(f"pages/{page['page_id']}", {"archived": True})
+        except Exception as e:
+            return False, str(e)
+        if resp.status_code == 200:
+            return True, ""
+        return False, resp.text[:200] if resp.text else f"HTTP {resp.status_code}"
+
+    def archive(self, pages: list) -> dict:
+        """并发归档，成功的页面从本地索引中移除"""
+        stats = {"archived": 0, "failed": 0, "pages_per_sec": 0.0}
+        start = time.perf_counter()
+        results = run_concurrent(self.archive_page, pages, self.client.concurrency)
+        elapsed = time.perf_counter() - start
+
+        with NearDupIndex() as near_dup:
+            for page, (ok, error) in zip(pages, results):
+                if ok:
+                    stats["archived"] += 1
+                    self.index.remove(page["page_id"])
+                    if page["url"]:
+                        near_dup.delete(page["url"])
+                else:
+                    stats["failed"] += 1
+                    print(f"   ❌ 归档失败: {page['title'][:35] or page['url']} - {error}")
+        stats["pages_per_sec"] = len(pages) / elapsed if elapsed else 0.0
+        print(f"⚡ 吞吐: {stats['pages_per_sec']:.2f} 页/秒 ({elapsed:.1f}s, "
+              f"请求 {self.client.stats['requests']} 次, 429 {self.client.stats['rate_limited']} 次)")
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量归档 Notion 记录")
+    parser.add_argument("--date", help="归档该日期 (YYYY-MM-DD) 的记录")
+    parser.add_argument("--date-field", default="采集时间", help="--date 使用的日期属性 (默认 采集时间)")
+    parser.add_argument("--file", help="归档数据文件中的原文链接")
+    parser.add_argument("--url", action="append", help="归档指定原文链接，可重复")
+    parser.add_argument("--exclude-keywords", nargs="?", const=",".join(EXCLUDE_KEYWORDS),
+                        help="归档标题含这些关键词的记录（逗号分隔，不填为 scrape_list.EXCLUDE_KEYWORDS）")
+    parser.add_argument("--database-id", help="数据库 ID（默认使用本地索引缓存或按名称搜索）")
+    parser.add_argument("--dry-run", action="store_true", help="只预览，不归档")
+    args = parser.parse_args()
+
+    if not (args.date or args.file or args.url or args.exclude_keywords):
+        parser.error("至少指定一个条件: --date / --file / --url / --exclude-keywords")
+
+    token = os.environ.get("NOTION_TOKEN")
+    if not token:
+        print("❌ 请设置 NOTION_TOKEN 环境变量")
+        sys.exit(1)
+
+    urls = None
+    if args.file or args.url:
+        urls = list(args.url or [])
+        if args.file:
+            urls += load_urls(args.file)
+        print(f"📂 目标链接: {len(urls)} 个")
+    keywords = [kw.strip() for kw in (args.exclude_keywords or "").split(",") if kw.strip()]
+
+    archiver = Archiver(token, args.database_id)
+    if not archiver.find_database():
+        sys.exit(1)
+
+    print("🔍 解析目标页面...")
+    try:
+        pages = archiver.select(urls, args.date, args.date_field, keywords)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"📊 匹配 {len(pages)} 个页面 (查询 {archiver.client.stats['requests']} 次)")
+
+    for i, page in enumerate(pages, 1):
+        print(f"   [{i}/{len(pages)}] {page['title'][:35] or '(标题未知)'} {page['url']}")
+
+    if not pages:
+        return
+    if args.dry_run:
+        print(f"\n📋 dry run: 将归档 {len(pages)} 个页面，未写入")
+        return
+
+    print(f"\n🗑️ 并发归档 {len(pages)} 个页面 (并发 {archiver.client.concurrency}, "
+          f"限速 {archiver.client.limiter.rate:g} 次/秒)")
+    stats = archiver.archive(pages)
+    print(f"\n🎉 归档完成: {stats['archived']} 条成功, {stats['failed']} 条失败")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+公告附件下载（岗位表、报名表等 .pdf/.doc/.docx/.xls/.xlsx）
+
+scrape_detail.py 抓取详情时记录页面上真实存在的附件链接 (detail["attachments"])，
+本阶段读取职位库中的附件链接，并发流式下载:
+    - 文件按内容 SHA-256 保存为 data/attachments/<前两位>/<哈希><扩展名>，
+      多个公告共用的岗位表只保存一份
+    - data/jobs.db 的 attachments 表记录 URL -> 哈希、ETag/Last-Modified/大小；
+      再次运行时先发 HEAD，验证信息没变的跳过，不支持 HEAD 的站点改用条件 GET
+    - 只复查最近 ATTACHMENT_RECHECK_DAYS 天内采集的公告的附件；更早的公告只下载从未下载过的附件，
+      已记录哈希的不再发请求，即使文件不在本地 (data/attachments/ 不提交到仓库，CI 每次运行都是空目录)。
+      每次运行的请求数取决于近期公告数，不随历史累积增长
+    - 本地文件缺失时同样先发 HEAD：未变化且岗位表已按该哈希解析过 (position_table.py) 的
+      只保留记录的哈希，不重新下载；只有还要解析的文件才重新下载
+
+使用方法:
+    python scripts/attachments.py [--limit N] [--no-recheck] [--recheck-days N] [--concurrency N]
+
+环境变量:
+    ATTACHMENTS             - 设为 0 时工作流跳过附件下载
+    ATTACHMENT_CONCURRENCY  - 并发下载数 (默认 8)
+    ATTACHMENT_MAX_MB       - 单个附件大小上限 (默认 50)
+    ATTACHMENT_RECHECK_DAYS - 复查最近多少天采集的公告的附件 (默认 14)
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import unquote, urljoin, urlsplit
+
+from job_store import STORE_FILE, JobStore
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+ATTACHMENT_DIR = DATA_DIR / "attachments"
+
+ATTACHMENT_CONCURRENCY = int(os.environ.get("ATTACHMENT_CONCURRENCY", "8"))
+ATTACHMENT_MAX_BYTES = int(float(os.environ.get("ATTACHMENT_MAX_MB", "50")) * 1024 * 1024)
+ATTACHMENT_RECHECK_DAYS = float(os.environ.get("ATTACHMENT_RECHECK_DAYS", "14"))
+CHUNK_SIZE = 64 * 1024
+
+ATTACHMENT_RE = re.compile(r'\.(pdf|doc|docx|xls|xlsx)$', re.IGNORECASE)
+
+# 浏览器中收集页面上的全部链接，由 find_attachments 过滤
+EXTRACT_LINKS_JS = """
+    () => Array.from(document.querySelectorAll('a[href]')).map(a => ({
+        url: a.href,
+        name: a.innerText.trim(),
+    }))
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attachments (
+    url           TEXT PRIMARY KEY,
+    name          TEXT,
+    sha256        TEXT,
+    ext           TEXT,
+    size          INTEGER,
+    etag          TEXT,
+    last_modified TEXT,
+    checked_at    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attachments_sha256 ON attachments (sha256);
+"""
+
+
+def attachment_ext(url: str) -> str:
+    """附件扩展名（小写，含点），不是附件链接时返回空字符串"""
+    match = ATTACHMENT_RE.search(unquote(urlsplit(url).path))
+    return f".{match.group(1).lower()}" if match else ""
+
+
+def find_attachments(base_url: str, links: list) -> list:
+    """从 [{"url", "name"}] 中找出附件链接（相对链接按 base_url 补全，按 URL 去重）"""
+    found = {}
+    for link in links:
+        url = urljoin(base_url, (link.get("url") or "").strip())
+        if not url.startswith(("http://", "https://")) or url in found or not attachment_ext(url):
+            continue
+        name = (link.get("name") or "").strip() or unquote(urlsplit(url).path.rsplit("/", 1)[-1])
+        found[url] = {"name": name[:200], "url": url}
+    return list(found.values())
+
+
+def attachments_enabled() -> bool:
+    return os.environ.get("ATTACHMENTS", "1") != "0"
+
+
+class AttachmentStore:
+    """附件记录 + 内容寻址文件存储，线程安全"""
+
+    def __init__(self, path: Path = STORE_FILE, root: Path = ATTACHMENT_DIR):
+        self.path = Path(path)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, url: str) -> dict:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT sha256, ext, size, etag, last_modified FROM attachments WHERE url = ?",
+                (url,)).fetchone()
+        if not row:
+            return None
+        return {"sha256": row[0], "ext": row[1], "size": row[2], "etag": row[3], "last_modified": row[4]}
+
+    def file_path(self, sha256: str, ext: str) -> Path:
+        return self.root / sha256[:2] / f"{sha256}{ext}"
+
+    def save(self, url: str, name: str, entry: dict):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO attachments "
+                "(url, name, sha256, ext, size, etag, last_modified, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, name, entry["sha256"], entry["ext"], entry["size"], entry.get("etag"),
+                 entry.get("last_modified"), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+
+    def touch(self, url: str):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE attachments SET checked_at = ? WHERE url = ?",
+                              (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), url))
+
+    def put_file(self, tmp_path: Path, sha256: str, ext: str) -> tuple:
+        """
+        把下载好的临时文件放到内容地址，返回 (是否为新文件, 扩展名)
+
+        已有相同内容的文件时（扩展名可能不同，如同一岗位表分别以 .xls 和 .xlsx 链接发布）
+        删除临时文件，沿用已有文件的扩展名。
+        """
+        with self.lock:
+            existing = next(self.file_path(sha256, "").parent.glob(f"{sha256}*"), None)
+            if existing:
+                tmp_path.unlink()
+                return False, existing.suffix
+            target = self.file_path(sha256, ext)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.replace(target)
+            return True, ext
+
+
+def _validators(headers) -> dict:
+    return {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"),
+            "size": int(headers["Content-Length"]) if headers.get("Content-Length", "").isdigit() else None}
+
+
+def unchanged_by_head(session, url: str, entry: dict) -> bool:
+    """HEAD 的 ETag / Last-Modified / 大小与记录一致时认为未变化（没有任何验证信息时返回 False）"""
+    resp = session.head(url, timeout=15, allow_redirects=True)
+    if resp.status_code != 200:
+        return False
+    current = _validators(resp.headers)
+    checks = [(current[key], entry[key]) for key in ("etag", "last_modified") if current[key] and entry[key]]
+    if not checks:
+        return False
+    if current["size"] is not None and current["size"] != entry["size"]:
+        return False
+    return all(a == b for a, b in checks)
+
+
+def download(session, url: str, store: AttachmentStore, entry: dict = None) -> tuple:
+    """
+    流式下载并按内容哈希保存，返回 (状态, 记录)
+
+    状态: "downloaded" 新内容 / "deduplicated" 内容与已有文件相同 / "unchanged" 条件请求返回 304
+    """
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    with session.get(url, timeout=30, stream=True, headers=headers) as resp:
+        if resp.status_code == 304 and entry:
+            return "unchanged", entry
+        resp.raise_for_status()
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=store.root, suffix=".part")
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > ATTACHMENT_MAX_BYTES:
+                        raise ValueError(f"超过大小上限 {ATTACHMENT_MAX_BYTES // 1024 // 1024}MB")
+                    digest.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        validators = _validators(resp.headers)
+
+    sha256 = digest.hexdigest()
+    ext = attachment_ext(resp.url) or attachment_ext(url)
+    is_new, ext = store.put_file(tmp_path, sha256, ext)
+    record = {"sha256": sha256, "ext": ext, "size": size,
+              "etag": validators["etag"], "last_modified": validators["last_modified"]}
+    return ("downloaded" if is_new else "deduplicated"), record
+
+
+def harvest_one(session, store: AttachmentStore, item: dict, recheck: bool = True,
+                needs_file: bool = True) -> tuple:
+    """
+    处理一个附件，返回 (状态, 错误信息)
+
+    状态: download 的返回值，HEAD 验证未变化时为 "unchanged"，
+    recheck=False 跳过已下载附件时为 "skipped"（不论文件是否在本地），出错时为 "failed"。
+    needs_file: 文件内容是否还要用（岗位表未按当前哈希解析过），为 False 时本地文件缺失但
+    HEAD 验证未变化的附件不重新下载
+    """
+    url = item["url"]
+    entry = store.get(url)
+    try:
+        if entry and not recheck:
+            return "skipped", None
+        missing = entry and not store.file_path(entry["sha256"], entry["ext"]).exists()
+        if entry and (not missing or not needs_file) and unchanged_by_head(session, url, entry):
+            store.touch(url)
+            return "unchanged", None
+        if missing:
+            entry = None  # 文件不在本地（被删除或新的运行环境）又需要内容，不发条件请求，完整下载
+        status, record = download(session, url, store, entry)
+    except Exception as e:
+        return "failed", str(e)
+    store.save(url, item.get("name", ""), record)
+    return status, None
+
+
+def job_attachments(limit: int = None, recent_since: str = None) -> dict:
+    """
+    职位库中详情已抓取的记录里的附件，按附件 URL 去重: {url: ({"name", "url"}, recent)}
+
+    recent: 引用该附件的公告中有 recent_since (采集时间) 之后的
+    """
+    attachments = {}
+    with JobStore() as store:
+        for row in store.iter_stage(["detail", "processed", "synced"]):
+            recent = bool(recent_since) and row["created_at"] >= recent_since
+            for item in row["detail"].get("attachments", []):
+                if item["url"] in attachments:
+                    if recent:
+                        attachments[item["url"]] = (attachments[item["url"]][0], True)
+                elif not limit or len(attachments) < limit:
+                    attachments[item["url"]] = (item, recent)
+    return attachments
+
+
+def run_attachments(limit: int = None, recheck: bool = True, concurrency: int = None,
+                    recheck_days: float = None) -> dict:
+    """
+    下载职位库中记录的附件
+
+    只复查最近 recheck_days 天内采集的公告的附件，更早的和 recheck=False 时已下载的附件不再发请求。
+    返回 {"found", "downloaded", "deduplicated", "unchanged", "skipped", "failed", "bytes"}
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    from browser_pool import USER_AGENT
+    from position_table import pending_files
+
+    recheck_days = ATTACHMENT_RECHECK_DAYS if recheck_days is None else recheck_days
+    recent_since = (datetime.now() - timedelta(days=recheck_days)).strftime("%Y-%m-%d %H:%M:%S")
+    attachments = job_attachments(limit, recent_since if recheck else None)
+    items = [item for item, _ in attachments.values()]
+    # 还要解析岗位表的附件，本地文件缺失时需要重新下载
+    unparsed = {attachment_url for entry in pending_files().values() for _, attachment_url in entry["targets"]}
+    stats = {"found": len(items), "downloaded": 0, "deduplicated": 0, "unchanged": 0,
+             "skipped": 0, "failed": 0, "bytes": 0}
+    print(f"📎 附件: {len(items)} 个")
+    if not items:
+        return stats
+
+    concurrency = concurrency or ATTACHMENT_CONCURRENCY
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+
+    start = time.perf_counter()
+    with AttachmentStore() as store, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = executor.map(
+            lambda item: harvest_one(session, store, item, attachments[item["url"]][1],
+                                     item["url"] in unparsed), items)
+        for i, (item, (status, error)) in enumerate(zip(items, results), 1):
+            stats[status] += 1
+            if status == "failed":
+                print(f"   [{i}/{len(items)}] ❌ {item['name'][:40]}: {error[:100]}")
+            elif status in ("downloaded", "deduplicated"):
+                entry = store.get(item["url"])
+                stats["bytes"] += entry["size"]
+                note = "" if status == "downloaded" else " (内容已存在)"
+                print(f"   [{i}/{len(items)}] ✅ {item['name'][:40]} {entry['size'] / 1024:.0f}KB{note}")
+    session.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 新文件 {stats['downloaded']}, 重复内容 {stats['deduplicated']}, "
+          f"未变化 {stats['unchanged']}, 跳过 {stats['skipped']}, 失败 {stats['failed']}, "
+          f"下载 {stats['bytes'] / 1024 / 1024:.1f} MB ({elapsed:.1f}s)")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="下载公告附件（内容寻址存储）")
+    parser.add_argument("--limit", type=int, help="最多处理的附件数")
+    parser.add_argument("--no-recheck", action="store_true", help="已下载的附件不再检查是否变化")
+    parser.add_argument("--recheck-days", type=float,
+                        help=f"复查最近多少天采集的公告的附件 (默认 {ATTACHMENT_RECHECK_DAYS:g})")
+    parser.add_argument("--concurrency", type=int, help=f"并发下载数 (默认 {ATTACHMENT_CONCURRENCY})")
+    args = parser.parse_args()
+
+    run_attachments(args.limit, recheck=not args.no_recheck, concurrency=args.concurrency,
+                    recheck_days=args.recheck_days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+全量回填（分片、可断点续跑）
+
+把来源的列表页码范围切成分片放进工作队列 (data/jobs.db 的 backfill_* 表)，
+worker 领取分片后逐页抓取列表和该页公告的详情，每页完成后记录检查点:
+    - 列表记录和详情写入职位库 (list / detail 阶段，已到 detail 及之后阶段的不重抓)
+    - backfill_pages 记录该页结果，分片的 next_page 前移
+进程崩溃或被中断后重新运行，从每个分片的 next_page 继续，已完成的页不会重抓。
+
+worker 以租约持有分片，每完成一页续租；租约过期 (默认 10 分钟) 的分片可被其他 worker 接手。
+同一台机器上的多个进程 (--workers N，或另开终端再运行 run) 可同时领取同一个队列。
+队列依赖 SQLite WAL 模式的共享内存和文件锁，只支持单机：不要把 --db 指向网络文件系统上的
+共享文件让多台机器同时使用，NFS/SMB 上的 SQLite 锁不可靠，可能领到同一分片甚至损坏数据库。
+与日常增量抓取不同，回填不会因为空页或已采集页停止翻页。
+
+使用方法:
+    python scripts/backfill.py init [--source gongkaoleida] [--pages 1-334] [--shard-size 20]
+    python scripts/backfill.py run [--workers N] [--concurrency N] [--no-http]
+    python scripts/backfill.py status
+    python scripts/backfill.py retry-failed    # 失败的页重新排队
+
+回填得到的记录停留在 detail 阶段，之后照常运行 process_data.py / sync_notion.py。
+
+环境变量:
+    BACKFILL_LEASE   - 分片租约秒数 (默认 600)
+    BACKFILL_RETRIES - 单页列表抓取失败时的重试次数 (默认 2)
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from frontier import Frontier, frontier_enabled
+from job_store import STORE_FILE, JobStore
+from sources import SOURCES
+
+LEASE_SECONDS = float(os.environ.get("BACKFILL_LEASE", "600"))
+PAGE_RETRIES = int(os.environ.get("BACKFILL_RETRIES", "2"))
+DEFAULT_SHARD_SIZE = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backfill_shards (
+    shard_id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    source      TEXT NOT NULL,
+    start_page  INTEGER NOT NULL,
+    end_page    INTEGER NOT NULL,
+    next_page   INTEGER NOT NULL,
+    status      TEXT NOT NULL,      -- pending / running / done
+    owner       TEXT,
+    lease_until REAL,
+    updated_at  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_backfill_shards_status ON backfill_shards (status, shard_id);
+CREATE TABLE IF NOT EXISTS backfill_pages (
+    source   TEXT NOT NULL,
+    page     INTEGER NOT NULL,
+    status   TEXT NOT NULL,         -- done / failed
+    found    INTEGER,
+    details  INTEGER,
+    failed   INTEGER,
+    worker   TEXT,
+    error    TEXT,
+    done_at  TEXT,
+    PRIMARY KEY (source, page)
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def parse_pages(text: str) -> tuple:
+    """"1-334" 或 "334" -> (1, 334)"""
+    first, _, last = text.partition("-")
+    if not last:
+        first, last = "1", first
+    first, last = int(first), int(last)
+    if first < 1 or last < first:
+        raise ValueError(f"页码范围无效: {text}")
+    return first, last
+
+
+class BackfillQueue:
+    """SQLite 工作队列（单机）：分片领取用 BEGIN IMMEDIATE 加写锁，多个进程不会领到同一分片"""
+
+    def __init__(self, path: Path = STORE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def init(self, source: str, first: int, last: int, shard_size: int) -> int:
+        """为 [first, last] 中还没有分片的页码创建分片，返回新建分片数（重复执行不会重复排队）"""
+        self._transaction()
+        try:
+            covered = set()
+            for row in self.conn.execute(
+                    "SELECT start_page, end_page FROM backfill_shards WHERE source = ?", (source,)):
+                covered.update(range(row["start_page"], row["end_page"] + 1))
+            created = 0
+            start = None
+            for page in range(first, last + 2):
+                free = page <= last and page not in covered
+                if free and start is None:
+                    start = page
+                # 连续的未排队页码按 shard_size 切分
+                if start is not None and (not free or page - start == shard_size):
+                    self._add_shard(source, start, page - 1)
+                    created += 1
+                    start = page if free else None
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return created
+
+    def _add_shard(self, source: str, start: int, end: int):
+        self.conn.execute(
+            "INSERT INTO backfill_shards (source, start_page, end_page, next_page, status, updated_at) "
+            "VALUES (?, ?, ?, ?, 'pending', ?)",
+            (source, start, end, start, _now()),
+        )
+
+    def claim(self, owner: str) -> dict:
+        """领取一个待处理或租约已过期的分片，没有时返回 None"""
+        now = time.time()
+        self._transaction()
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM backfill_shards WHERE status = 'pending' "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY shard_id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE backfill_shards SET status = 'running', owner = ?, lease_until = ?, "
+                    "updated_at = ? WHERE shard_id = ?",
+                    (owner, now + LEASE_SECONDS, _now(), row["shard_id"]),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return dict(row) if row else None
+
+    def checkpoint(self, shard: dict, owner: str, page: int, status: str, found: int = 0,
+                   details: int = 0, failed: int = 0, error: str = None) -> bool:
+        """记录一页的结果并前移 next_page、续租；分片已被他人接手时返回 False（本页结果不记录）"""
+        self._transaction()
+        try:
+            cur = self.conn.execute(
+                "UPDATE backfill_shards SET next_page = ?, lease_until = ?, updated_at = ? "
+                "WHERE shard_id = ? AND owner = ? AND status = 'running'",
+                (page + 1, time.time() + LEASE_SECONDS, _now(), shard["shard_id"], owner),
+            )
+            if cur.rowcount:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO backfill_pages "
+                    "(source, page, status, found, details, failed, worker, error, done_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (shard["source"], page, status, found, details, failed, owner, error, _now()),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return bool(cur.rowcount)
+
+    def finish(self, shard: dict, owner: str):
+        self.conn.execute(
+            "UPDATE backfill_shards SET status = 'done', lease_until = NULL, updated_at = ? "
+            "WHERE shard_id = ? AND owner = ?",
+            (_now(), shard["shard_id"], owner),
+        )
+
+    def retry_failed(self) -> int:
+        """失败的页各自重新建一个单页分片，返回重新排队的页数"""
+        self._transaction()
+        try:
+            rows = self.conn.execute(
+                "SELECT source, page FROM backfill_pages WHERE status = 'failed'").fetchall()
+            for row in rows:
+                self._add_shard(row["source"], row["page"], row["page"])
+            self.conn.execute("DELETE FROM backfill_pages WHERE status = 'failed'")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def status(self) -> dict:
+        """{来源: {"shards": {状态: 数量}, "pages": 总页数, "done": n, "failed": n, "found": n, "details": n}}"""
+        result = {}
+        pages = {}
+        for row in self.conn.execute("SELECT source, status, start_page, end_page FROM backfill_shards"):
+            info = result.setdefault(row[0], {"shards": {}, "pages": 0, "done": 0, "failed": 0,
+                                              "found": 0, "details": 0})
+            info["shards"][row[1]] = info["shards"].get(row[1], 0) + 1
+            # retry-failed 为失败页新建的分片与原分片重叠，页数按去重后的页码计
+            pages.setdefault(row[0], set()).update(range(row[2], row[3] + 1))
+        for source, covered in pages.items():
+            result[source]["pages"] = len(covered)
+        for row in self.conn.execute(
+                "SELECT source, status, COUNT(*), SUM(found), SUM(details) "
+                "FROM backfill_pages GROUP BY source, status"):
+            info = result.setdefault(row[0], {"shards": {}, "pages": 0, "done": 0, "failed": 0,
+                                              "found": 0, "details": 0})
+            info[row[1]] = row[2]
+            info["found"] += row[3] or 0
+            info["details"] += row[4] or 0
+        return result
+
+
+async def run_shard(queue: BackfillQueue, shard: dict, owner: str, pool, store: JobStore,
+                    frontier: Frontier = None, use_http: bool = None) -> dict:
+    """逐页处理一个分片，返回 {"pages", "found", "details", "failed_pages", "lost"}"""
+    from scrape_detail import fetch_details
+    from scrape_list import fetch_page
+
+    source = SOURCES[shard["source"]]
+    stats = {"pages": 0, "found": 0, "details": 0, "failed_pages": 0, "lost": False}
+    print(f"📦 [{owner}] 分片 #{shard['shard_id']} {source.name} "
+          f"第 {shard['next_page']}-{shard['end_page']} 页 (起始 {shard['start_page']})")
+
+    for page_num in range(shard["next_page"], shard["end_page"] + 1):
+        for attempt in range(PAGE_RETRIES + 1):
+            errors = []
+            jobs = await fetch_page(source, page_num, pool, errors=errors)
+            if not errors:
+                break
+
+        if errors:
+            stats["failed_pages"] += 1
+            ok = queue.checkpoint(shard, owner, page_num, "failed", error=errors[-1][:500])
+        else:
+            store.add_list(jobs)
+            # 已抓过详情（detail 及之后阶段）的公告不重抓，避免把已处理/已同步的记录退回 detail 阶段
+            urls = []
+            for job in jobs:
+                row = store.get(job["url"])
+                if row is None or row["stage"] == "list":
+                    urls.append(job["url"])
+            results = await fetch_details(urls, use_http=use_http, pool=pool) if urls else []
+            saved = store.save_details(results)
+            if frontier is not None:
+                frontier.add([r["url"] for r in results if not r.get("error") and r.get("content")])
+
+            stats["found"] += len(jobs)
+            stats["details"] += saved
+            ok = queue.checkpoint(shard, owner, page_num, "done", len(jobs), saved, len(urls) - saved)
+
+        if not ok:
+            print(f"⚠️ [{owner}] 分片 #{shard['shard_id']} 租约已过期并被接手，放弃该分片")
+            stats["lost"] = True
+            return stats
+        stats["pages"] += 1
+
+    queue.finish(shard, owner)
+    print(f"✅ [{owner}] 分片 #{shard['shard_id']} 完成")
+    return stats
+
+
+async def run_worker(db_path: str, worker_id: int, concurrency: int = None,
+                     use_http: bool = None) -> dict:
+    """领取分片直到队列为空；一个浏览器池服务该 worker 的全部分片"""
+    from playwright.async_api import async_playwright
+
+    from browser_pool import BrowserPool
+
+    owner = f"{socket.gethostname()}:{os.getpid()}:{worker_id}"
+    total = {"worker": owner, "shards": 0, "pages": 0, "found": 0, "details": 0, "failed_pages": 0}
+    frontier = Frontier() if frontier_enabled() else None
+
+    # 多个进程共享 http_cache.db 会互相锁表，回填不使用响应缓存
+    with BackfillQueue(db_path) as queue, JobStore(db_path) as store:
+        async with async_playwright() as p:
+            async with BrowserPool(p, concurrency=concurrency) as pool:
+                while True:
+                    shard = queue.claim(owner)
+                    if not shard:
+                        break
+                    stats = await run_shard(queue, shard, owner, pool, store, frontier, use_http)
+                    total["shards"] += 0 if stats["lost"] else 1
+                    for key in ("pages", "found", "details", "failed_pages"):
+                        total[key] += stats[key]
+    return total
+
+
+def worker_main(db_path: str, worker_id: int, concurrency: int = None, use_http: bool = None) -> dict:
+    """进程入口（ProcessPoolExecutor 需要模块顶层函数）"""
+    return asyncio.run(run_worker(db_path, worker_id, concurrency, use_http))
+
+
+def run_backfill(db_path: str = str(STORE_FILE), workers: int = 1, concurrency: int = None,
+                 use_http: bool = None) -> list:
+    """启动 workers 个 worker 处理队列，返回每个 worker 的统计"""
+    if workers <= 1:
+        return [worker_main(db_path, 0, concurrency, use_http)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker_main, db_path, i, concurrency, use_http)
+                   for i in range(workers)]
+        return [future.result() for future in futures]
+
+
+def print_status(queue: BackfillQueue):
+    status = queue.status()
+    if not status:
+        print("📭 队列为空，先运行 init")
+        return
+    for source, info in status.items():
+        shards = ", ".join(f"{k} {v}" for k, v in sorted(info["shards"].items()))
+        print(f"📊 {source}: 页 {info['done']}/{info['pages']} 完成, 失败 {info['failed']} | "
+              f"分片 {shards} | 公告 {info['found']} 条, 详情 {info['details']} 条")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全量回填（分片、可断点续跑）")
+    parser.add_argument("--db", default=str(STORE_FILE), help="队列和职位库数据库（本机文件，不支持网络文件系统）")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_init = sub.add_parser("init", help="把页码范围切成分片放入队列")
+    p_init.add_argument("--source", default="gongkaoleida", choices=list(SOURCES))
+    p_init.add_argument("--pages", help="页码范围，如 1-334 (默认来源的总页数)")
+    p_init.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="每个分片的页数")
+
+    p_run = sub.add_parser("run", help="领取分片并抓取，直到队列为空")
+    p_run.add_argument("--workers", type=int, default=1, help="worker 进程数")
+    p_run.add_argument("--concurrency", type=int, help="每个 worker 的并发页数 (默认读取 BROWSER_CONCURRENCY)")
+    p_run.add_argument("--no-http", action="store_true", help="详情关闭 HTTP 快速通道")
+
+    sub.add_parser("status", help="查看进度")
+    sub.add_parser("retry-failed", help="失败的页重新排队")
+    args = parser.parse_args()
+
+    if args.command == "init":
+        source = SOURCES[args.source]
+        if args.pages:
+            first, last = parse_pages(args.pages)
+        elif source.total_pages:
+            first, last = 1, source.total_pages
+        else:
+            print(f"❌ {source.name} 没有默认总页数，请用 --pages 指定")
+            sys.exit(1)
+        with BackfillQueue(args.db) as queue:
+            created = queue.init(source.name, first, last, max(1, args.shard_size))
+            print(f"✅ {source.name} 第 {first}-{last} 页: 新建 {created} 个分片")
+            print_status(queue)
+
+    elif args.command == "run":
+        start = time.perf_counter()
+        totals = run_backfill(args.db, max(1, args.workers), args.concurrency,
+                              use_http=False if args.no_http else None)
+        elapsed = time.perf_counter() - start
+        print(f"\n{'='*40}")
+        for total in totals:
+            print(f"👷 {total['worker']}: 分片 {total['shards']}, 页 {total['pages']} "
+                  f"(失败 {total['failed_pages']}), 公告 {total['found']}, 详情 {total['details']}")
+        pages = sum(total["pages"] for total in totals)
+        print(f"⚡ {pages} 页, {elapsed:.1f}s, {pages / elapsed * 60 if elapsed else 0:.1f} 页/分钟")
+        with BackfillQueue(args.db) as queue:
+            print_status(queue)
+
+    elif args.command == "status":
+        with BackfillQueue(args.db) as queue:
+            print_status(queue)
+
+    elif args.command == "retry-failed":
+        with BackfillQueue(args.db) as queue:
+            count = queue.retry_failed()
+            print(f"🔁 重新排队: {count} 页")
+
+
+if __name__ == "__main__":
+    main()
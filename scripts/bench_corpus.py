@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+提取规则基准测试 + golden 语料回归
+
+语料 data/golden_corpus.json 来自真实页面:
+    - data/debug_page.html 的正文和其中的公告标题
+    - 采集结果_20260106.json 中每条公告的描述和完整字段文本
+每条语料记录了各提取函数的 golden 输出。默认模式逐个提取函数对比 golden 值，
+并测量每秒处理条数和峰值内存；任何输出变化都会列出并以非 0 退出。
+
+覆盖的提取函数:
+    process_data.extract_*        (scripts/process_data.py)
+    extractor.extract_fields      (scripts/extractor.py)
+    process_and_combine.extract_* (旧版规则)
+    scrape_list.is_recruitment_post
+
+使用方法:
+    python scripts/bench_corpus.py [--repeat 200] [--only 名称片段]
+    python scripts/bench_corpus.py --update   # 规则有意修改后，重建语料并记录新的 golden 值
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import process_and_combine as pac  # noqa: E402
+import process_data as pd  # noqa: E402
+from extractor import extract_fields  # noqa: E402
+from scrape_list import is_recruitment_post  # noqa: E402
+
+DATA_DIR = ROOT_DIR / "data"
+CORPUS_FILE = DATA_DIR / "golden_corpus.json"
+DEBUG_PAGE = DATA_DIR / "debug_page.html"
+COLLECT_RESULT = ROOT_DIR / "采集结果_20260106.json"
+
+# 名称 -> (语料类型, 函数)；texts 语料有 title/source/content，titles 语料只有 title
+EXTRACTORS = {
+    "process_data.extract_salary": ("texts", lambda c: pd.extract_salary(c["content"])),
+    "process_data.extract_count": ("texts", lambda c: pd.extract_count(c["content"])),
+    "process_data.extract_education": ("texts", lambda c: pd.extract_education(c["content"])),
+    "process_data.extract_deadline": ("texts", lambda c: pd.extract_deadline(c["content"])),
+    "process_data.extract_location": ("texts", lambda c: pd.extract_location(c["content"], c["title"])),
+    "process_data.extract_employer": ("texts", lambda c: pd.extract_employer(c["content"], c["title"])),
+    "extractor.extract_fields": ("texts", lambda c: extract_fields(c["content"], c["title"])),
+    "process_and_combine.extract_salary": ("texts", lambda c: pac.extract_salary(c["content"])),
+    "process_and_combine.extract_count": ("texts", lambda c: pac.extract_count(c["content"])),
+    "process_and_combine.extract_education": ("texts", lambda c: pac.extract_education(c["content"])),
+    "process_and_combine.extract_deadline": ("texts", lambda c: pac.extract_deadline(c["content"])),
+    "process_and_combine.extract_location": (
+        "texts", lambda c: pac.extract_location(c["content"], c["title"], c["source"])),
+    "scrape_list.is_recruitment_post": ("titles", lambda c: is_recruitment_post(c["title"])),
+}
+
+
+def build_corpus() -> dict:
+    """从 debug_page.html 和 采集结果_20260106.json 生成语料输入"""
+    from bs4 import BeautifulSoup
+
+    texts = []
+    titles = []
+
+    soup = BeautifulSoup(DEBUG_PAGE.read_text(encoding="utf-8"), "html.parser")
+    page_title = soup.title.get_text(strip=True) if soup.title else ""
+    links = []
+    for a in soup.find_all("a", href=True):
+        text = a.get_text(strip=True)
+        if text and ("/article/" in a["href"] or "/info/" in a["href"]):
+            links.append(text)
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    texts.append({
+        "id": "debug_page",
+        "title": page_title,
+        "source": "",
+        "content": soup.get_text("\n", strip=True),
+    })
+    for i, text in enumerate(links, 1):
+        titles.append({"id": f"debug_page-link-{i}", "title": text})
+
+    collected = json.loads(COLLECT_RESULT.read_text(encoding="utf-8"))
+    for i, item in enumerate(collected.get("招聘信息", []), 1):
+        title = item.get("职位名称", "")
+        source = item.get("招聘单位", "")
+        texts.append({
+            "id": f"jshrss-{i}-desc",
+            "title": title,
+            "source": source,
+            "content": item.get("职位描述", ""),
+        })
+        # 全部字段按 “键：值” 拼成一段，接近公告正文中字段的写法
+        texts.append({
+            "id": f"jshrss-{i}-full",
+            "title": title,
+            "source": source,
+            "content": "\n".join(f"{k}：{v}" for k, v in item.items() if isinstance(v, str)),
+        })
+        titles.append({"id": f"jshrss-{i}-title", "title": title})
+
+    return {
+        "sources": [DEBUG_PAGE.name, COLLECT_RESULT.name],
+        "texts": texts,
+        "titles": titles,
+    }
+
+
+def run_golden(corpus: dict, names: list) -> dict:
+    for kind in ("texts", "titles"):
+        for case in corpus[kind]:
+            case["golden"] = {
+                name: EXTRACTORS[name][1](case)
+                for name in names if EXTRACTORS[name][0] == kind
+            }
+    return corpus
+
+
+def compare(corpus: dict, names: list) -> list:
+    """返回 [(语料 id, 提取函数, golden, 当前输出)]"""
+    diffs = []
+    for name in names:
+        kind, func = EXTRACTORS[name]
+        for case in corpus[kind]:
+            expected = case.get("golden", {}).get(name)
+            actual = func(case)
+            if expected != actual:
+                diffs.append((case["id"], name, expected, actual))
+    return diffs
+
+
+def measure(func, cases: list, repeat: int) -> tuple:
+    """返回 (每秒处理条数, 单遍峰值内存字节数)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            func(case)
+    elapsed = time.perf_counter() - start
+    rate = repeat * len(cases) / elapsed if elapsed > 0 else 0
+
+    tracemalloc.start()
+    for case in cases:
+        func(case)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rate, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提取规则基准测试 + golden 语料回归")
+    parser.add_argument("--repeat", type=int, default=200, help="测速时语料重复遍数")
+    parser.add_argument("--only", help="只测名称包含该片段的提取函数")
+    parser.add_argument("--update", action="store_true", help="重建语料并记录当前输出为 golden 值")
+    args = parser.parse_args()
+
+    names = [name for name in EXTRACTORS if not args.only or args.only in name]
+    if not names:
+        print(f"❌ 没有匹配的提取函数: {args.only}")
+        sys.exit(1)
+
+    if args.update:
+        corpus = run_golden(build_corpus(), list(EXTRACTORS))
+        with open(CORPUS_FILE, "w", encoding="utf-8") as f:
+            json.dump(corpus, f, ensure_ascii=False, indent=2)
+        print(f"💾 已更新 {CORPUS_FILE.name}: "
+              f"{len(corpus['texts'])} 段正文, {len(corpus['titles'])} 个标题")
+        return
+
+    if not CORPUS_FILE.exists():
+        print(f"❌ 未找到 {CORPUS_FILE}，先运行 --update 生成")
+        sys.exit(1)
+    with open(CORPUS_FILE, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    chars = sum(len(case["content"]) for case in corpus["texts"])
+    print(f"📄 语料: {len(corpus['texts'])} 段正文 ({chars} 字), {len(corpus['titles'])} 个标题")
+    print(f"\n{'提取函数':<40} {'条/秒':>10} {'峰值内存':>10}")
+    for name in names:
+        kind, func = EXTRACTORS[name]
+        rate, peak = measure(func, corpus[kind], args.repeat)
+        print(f"{name:<40} {rate:>10.0f} {peak / 1024:>8.1f}KB")
+
+    diffs = compare(corpus, names)
+    if diffs:
+        print(f"\n❌ {len(diffs)} 处输出与 golden 不一致:")
+        for case_id, name, expected, actual in diffs:
+            print(f"   {case_id} {name}: {expected!r} -> {actual!r}")
+        sys.exit(1)
+    print("\n✅ 输出与 golden 一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+字段提取基准测试
+
+生成固定随机种子的合成公告（默认 3000 条、每条约 8000 字），
+分别用 process_data.py 的 extract_* 函数和 extractor.extract_fields 提取，
+校验两者输出逐字段一致，并打印每秒处理条数。
+
+使用方法:
+    python scripts/bench_extract.py [--docs 3000] [--length 8000] [--seed 42]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from extractor import CITIES, extract_fields
+from process_data import (extract_count, extract_deadline, extract_education,
+                          extract_employer, extract_location, extract_salary)
+
+FILLER = [
+    "根据《事业单位公开招聘人员暂行规定》等有关文件精神，经研究决定，面向社会公开招聘工作人员。",
+    "应聘人员须具有中华人民共和国国籍，遵守宪法和法律，具有良好的品行和职业道德。",
+    "具有岗位所需的专业或技能条件，身体健康，能够正常履行岗位职责。",
+    "本次招聘坚持德才兼备、以德为先的用人标准，按照公开、平等、竞争、择优的原则进行。",
+    "笔试内容为综合知识和专业知识，笔试成绩满分100分，按照笔试成绩从高到低的顺序确定面试人选。",
+    "考察工作由招聘单位组织实施，考察合格者进行体检，体检标准参照公务员录用体检通用标准执行。",
+    "拟聘用人员名单将在网站上进行公示，公示期为7个工作日。联系电话：025-83276543。",
+    "详情请见附件岗位表，应聘者只能选择一个岗位报名。",
+    "报名期间请保持通讯畅通，资格审查贯穿招聘全过程。",
+    "面试于2026-03-15前后进行，具体安排另行通知。",
+]
+
+UNITS = ["卫生健康委员会", "教育局", "人民医院", "交通运输局", "自然资源和规划局"]
+CITY_NAMES = list(CITIES)
+
+
+def field_snippets(rng: random.Random, city: str) -> list:
+    """可能出现在正文中的字段片段（每条公告随机抽取若干）"""
+    year = 2026
+    return [
+        lambda: f"招聘单位：{city}市{rng.choice(UNITS)}",
+        lambda: f"用人单位：{rng.choice(UNITS)}，地址详见附件",
+        lambda: f"本次共招聘{rng.randint(1, 80)}名工作人员。",
+        lambda: f"拟招录{rng.randint(1, 30)}人",
+        lambda: f"学历要求：{rng.choice(['本科', '硕士', '大专', '研究生'])}及以上",
+        lambda: f"具有全日制{rng.choice(['本科', '硕士'])}学历",
+        lambda: f"报名时间：{year}年{rng.randint(1, 12)}月{rng.randint(1, 28)}日至"
+                f"{year}年{rng.randint(1, 12)}月{rng.randint(1, 28)}日",
+        lambda: f"网上报名自即日起至{year}年{rng.randint(1, 12)}月{rng.randint(1, 28)}日17:00止",
+        lambda: f"{year}-{rng.randint(1, 12)}-{rng.randint(1, 28)} 18:00报名结束",
+        lambda: f"薪资待遇：月薪：{rng.randint(3, 9)}000-{rng.randint(10, 15)}000元",
+        lambda: f"年薪：{rng.randint(10, 20)}-{rng.randint(21, 40)}万",
+        lambda: f"绩效工资：{rng.randint(2000, 6000)}元",
+        lambda: f"工作地点位于{rng.choice(CITY_NAMES)}。",
+        lambda: f"名额：{rng.randint(1, 9)}",
+    ]
+
+
+def make_doc(rng: random.Random, length: int) -> tuple:
+    """生成 (标题, 正文)；约 1/5 的公告不含任何字段，模拟附件型公告的最坏情况"""
+    city = rng.choice(CITY_NAMES)
+    title = f"2026年{city}市某事业单位公开招聘工作人员公告"
+    snippets = field_snippets(rng, city)
+    field_rate = 0 if rng.random() < 0.2 else 0.12
+
+    lines = []
+    size = 0
+    while size < length:
+        line = rng.choice(snippets)() if rng.random() < field_rate else rng.choice(FILLER)
+        # 正文来自 innerText，句子之间常有换行
+        lines.append(line)
+        size += len(line) + 1
+    return title, "\n".join(lines)[:length]
+
+
+def extract_legacy(content: str, title: str) -> dict:
+    return {
+        "招聘单位": extract_employer(content, title),
+        "薪资范围": extract_salary(content),
+        "工作地点": extract_location(content, title),
+        "招聘人数": extract_count(content),
+        "学历要求": extract_education(content),
+        "报名截止": extract_deadline(content),
+    }
+
+
+def bench(func, docs: list) -> tuple:
+    start = time.perf_counter()
+    results = [func(content, title) for title, content in docs]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="字段提取基准测试")
+    parser.add_argument("--docs", type=int, default=3000, help="公告数量")
+    parser.add_argument("--length", type=int, default=8000, help="每条正文长度")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_doc(rng, args.length) for _ in range(args.docs)]
+    print(f"📄 {len(docs)} 条公告, 每条约 {args.length} 字")
+
+    legacy, legacy_secs = bench(extract_legacy, docs)
+    engine, engine_secs = bench(extract_fields, docs)
+
+    mismatches = 0
+    for (title, _), old, new in zip(docs, legacy, engine):
+        if old != new:
+            mismatches += 1
+            if mismatches <= 5:
+                diff = {k: (old[k], new[k]) for k in old if old[k] != new[k]}
+                print(f"❌ 输出不一致: {title} {diff}")
+
+    print(f"   extract_*     : {len(docs) / legacy_secs:8.0f} 条/秒 ({legacy_secs:.2f}s)")
+    print(f"   extract_fields: {len(docs) / engine_secs:8.0f} 条/秒 ({engine_secs:.2f}s)")
+    print(f"   加速: {legacy_secs / engine_secs:.1f}x")
+
+    if mismatches:
+        print(f"❌ {mismatches} 条输出不一致")
+        sys.exit(1)
+    print("✅ 输出完全一致")
+
+
+if __name__ == "__main__":
+    main()
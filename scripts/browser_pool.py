@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+共享浏览器池
+
+一个 Chromium 实例 + 可复用的 BrowserContext，供列表页和详情页抓取共用，
+避免每个页面都重新启动浏览器。每个 context 默认安装 ResourceBlocker
+(见 resource_blocker.py) 拦截图片、字体等无用资源；传入 ResponseCache
+(见 http_cache.py) 时文档请求走响应缓存。
+
+环境变量:
+    BROWSER_CONCURRENCY      - 同时打开的页面数 (默认 4)
+    BROWSER_CONTEXT_MAX_USES - 单个 context 服务多少个页面后回收重建
+                               (默认 20, 0 表示不回收, 1 表示每页全新 context)
+    READY_STRATEGY           - 页面就绪判断: selector (等待内容出现, 默认) / sleep (固定等待)
+    READY_TIMEOUT_MS         - selector 策略的最长等待 (默认 10000), 超时后按现有内容继续
+    READY_SLEEP              - sleep 策略的等待秒数 (默认 3)
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from resource_blocker import ResourceBlocker, blocking_enabled
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+DEFAULT_CONCURRENCY = int(os.environ.get("BROWSER_CONCURRENCY", "4"))
+DEFAULT_CONTEXT_MAX_USES = int(os.environ.get("BROWSER_CONTEXT_MAX_USES", "20"))
+
+READY_STRATEGY = os.environ.get("READY_STRATEGY", "selector")
+READY_TIMEOUT_MS = int(os.environ.get("READY_TIMEOUT_MS", "10000"))
+READY_SLEEP = float(os.environ.get("READY_SLEEP", "3"))
+
+
+class BrowserPool:
+    """单浏览器 + context 复用池，用 Semaphore 限制并发页面数"""
+
+    def __init__(self, playwright, concurrency: int = None, max_uses: int = None,
+                 headless: bool = True, user_agent: str = USER_AGENT,
+                 blocker: ResourceBlocker = None, cache=None):
+        self.playwright = playwright
+        self.concurrency = max(1, concurrency or DEFAULT_CONCURRENCY)
+        self.max_uses = DEFAULT_CONTEXT_MAX_USES if max_uses is None else max(0, max_uses)
+        self.headless = headless
+        self.user_agent = user_agent
+        if blocker is None and blocking_enabled():
+            blocker = ResourceBlocker()
+        self.blocker = blocker
+        self.cache = cache
+        self.browser = None
+        self.stats = {"pages": 0, "contexts": 0}
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._idle = []  # [(context, uses)]
+
+    async def __aenter__(self):
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """关闭所有 context 和浏览器"""
+        while self._idle:
+            context, _ = self._idle.pop()
+            await context.close()
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+
+    async def _new_context(self):
+        context = await self.browser.new_context(user_agent=self.user_agent)
+        if self.blocker:
+            await self.blocker.install(context)
+        # 后安装的路由先执行，缓存只处理文档请求，其余交给 blocker
+        if self.cache:
+            await self.cache.install(context)
+        self.stats["contexts"] += 1
+        return context
+
+    async def _acquire_context(self):
+        if self._idle:
+            return self._idle.pop()
+        return await self._new_context(), 0
+
+    async def _release_context(self, context, uses: int):
+        if self.max_uses and uses >= self.max_uses:
+            await context.close()
+        else:
+            self._idle.append((context, uses))
+
+    @asynccontextmanager
+    async def page(self):
+        """借出一个页面，用完自动关闭并归还 context"""
+        async with self._semaphore:
+            context, uses = await self._acquire_context()
+            page = await context.new_page()
+            self.stats["pages"] += 1
+            try:
+                yield page
+            finally:
+                try:
+                    await page.close()
+                finally:
+                    await self._release_context(context, uses + 1)
+
+
+async def wait_until_ready(page, predicate: str, arg=None, strategy: str = None,
+                           timeout_ms: int = None) -> dict:
+    """
+    等待页面就绪，替代固定 sleep
+
+    predicate 为页面内执行的 JS 函数，返回真值即视为就绪；
+    超时不抛异常，调用方按当前已渲染的内容继续提取。
+    返回 {"ready": bool, "ready_ms": int}
+    """
+    strategy = strategy or READY_STRATEGY
+    timeout_ms = READY_TIMEOUT_MS if timeout_ms is None else timeout_ms
+    start = time.perf_counter()
+
+    ready = True
+    if strategy == "sleep":
+        await asyncio.sleep(READY_SLEEP)
+    else:
+        try:
+            await page.wait_for_function(predicate, arg=arg, timeout=timeout_ms)
+        except Exception:
+            ready = False
+
+    return {"ready": ready, "ready_ms": int((time.perf_counter() - start) * 1000)}
+
+
+def summarize_ready(timings: list) -> str:
+    """汇总就绪耗时，用于衡量等待策略的效果"""
+    if not timings:
+        return "无数据"
+    ms = sorted(t["ready_ms"] for t in timings)
+    timeouts = sum(1 for t in timings if not t["ready"])
+    avg = sum(ms) / len(ms)
+    p90 = ms[min(len(ms) - 1, int(len(ms) * 0.9))]
+    return f"平均 {avg:.0f}ms, P90 {p90}ms, 最大 {ms[-1]}ms, 超时 {timeouts}/{len(ms)}"
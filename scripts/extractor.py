@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+字段提取引擎
+
+与 process_data.py 中 extract_* 系列函数输出完全一致，但:
+    - 所有正则在导入时编译一次
+    - 城市名用一条交替正则一次扫描，不再逐个城市做子串查找
+    - 每条规则只在其必需的关键词出现时才执行，关键词检测结果各字段共用
+    - 以数字开头、无匹配时要逐字符重试的规则，改为先定位字面量再回看数字
+
+使用方法:
+    from extractor import extract_fields
+    fields = extract_fields(content, title)
+
+基准测试见 scripts/bench_extract.py。
+"""
+
+import re
+
+# 江苏省城市列表（顺序即优先级，与 process_data.extract_location 一致）
+CITIES = {
+    "南京": "南京市",
+    "苏州": "苏州市",
+    "无锡": "无锡市",
+    "常州": "常州市",
+    "南通": "南通市",
+    "扬州": "扬州市",
+    "镇江": "镇江市",
+    "泰州": "泰州市",
+    "徐州": "徐州市",
+    "盐城": "盐城市",
+    "淮安": "淮安市",
+    "连云港": "连云港市",
+    "宿迁": "宿迁市",
+    "昆山": "苏州市昆山",
+    "张家港": "苏州市张家港",
+    "常熟": "苏州市常熟",
+    "江阴": "无锡市江阴",
+    "宜兴": "无锡市宜兴",
+}
+# 城市名多关键词匹配：一条交替正则一次扫描找出全部城市，再按上面的优先级取第一个。
+CITY_RE = re.compile("|".join(sorted(CITIES, key=len, reverse=True)))
+# 非重叠扫描会漏掉与前一个城市名首尾重叠（如“镇江阴”中的江阴）或被其包含的城市名，
+# 这些城市在扫描没找到时再单独做一次子串查找
+CITY_OVERLAPS = [
+    city for city in CITIES
+    if any(other != city and (city in other or any(
+        other.endswith(city[:i]) for i in range(1, len(city))))
+        for other in CITIES)
+]
+
+# 每条规则: (必需关键词组, 正则)；关键词组内任一出现即执行正则，空组表示总是执行
+SALARY_RULES = [
+    (("年薪",), re.compile(r'(年薪[：:]\s*\d+(?:-\d+)?万)')),
+    (("月薪",), re.compile(r'(月薪[：:]\s*\d+(?:-\d+)?[千元kK])')),
+    (("万/年",), re.compile(r'(\d+(?:-\d+)?万/年)')),
+    (("/月",), re.compile(r'(\d+(?:-\d+)?[千kK]/月)')),
+    (("工资",), re.compile(r'(工资[：:]\s*\d+(?:-\d+)?元)')),
+    (("k", "K", "万", "元"), re.compile(r'(\d+(?:-\d+)?(?:k|K|万|元)(?:/月|/年)?)')),
+]
+
+COUNT_RULES = [
+    (("招聘",), re.compile(r'招聘[人数]*[：:\s]*(\d+)\s*[人名]')),
+    (("招录",), re.compile(r'招录[人数]*[：:\s]*(\d+)\s*[人名]')),
+    (("拟招",), re.compile(r'拟招[聘录]*\s*(\d+)\s*[人名]')),
+    (("招聘岗位",), re.compile(r'招聘岗位\s*(\d+)\s*个')),
+    (("名额",), re.compile(r'名额[：:]\s*(\d+)')),
+    (("共",), re.compile(r'共[招聘录]*\s*(\d+)\s*[人名]')),
+    (("招",), re.compile(r'招\s*(\d+)\s*人')),
+]
+# 最后一条 (\d+)\s*个岗位 由 _count_before_positions 从“个岗位”向前回看实现
+
+EDUCATION_RULES = [
+    (("学历",), re.compile(r'学历[要求：:]*\s*(高中|中专|大专|本科|硕士|博士|研究生)(?:及以上|以上|学历)?')),
+    (("全日制",), re.compile(r'(全日制本科|全日制硕士|全日制博士|全日制研究生)')),
+    (("及以上",), re.compile(r'(本科及以上|硕士及以上|博士及以上|大专及以上)')),
+    (("以上", "学历"), re.compile(r'(本科|硕士|博士|研究生|大专|高中|中专)(?:及以上|以上|学历)')),
+]
+
+# 报名截止: 与 process_data.extract_deadline 的 5 条规则一一对应
+DEADLINE_CN_RULES = [
+    (("报名",), re.compile(r'报名[时间截止]*[：:至到]*\s*(\d{4}年\d{1,2}月\d{1,2}日)')),
+    (("截止",), re.compile(r'截止[时间日期]*[：:至到]*\s*(\d{4}年\d{1,2}月\d{1,2}日)')),
+]
+# 以数字开头的正则在无匹配时要在每个数字处重试，改为先找其后的字面量再回看 4 位年份
+CN_DATE_SUFFIX_RE = re.compile(r'年\d{1,2}月\d{1,2}日')
+ISO_DATE_SUFFIX_RE = re.compile(r'-\d{1,2}-\d{1,2}')
+YEAR_RE = re.compile(r'\d{4}')
+
+EMPLOYER_RULES = [
+    (("招聘单位",), re.compile(r'招聘单位[：:]\s*([^\n,，]{2,30})')),
+    (("用人单位",), re.compile(r'用人单位[：:]\s*([^\n,，]{2,30})')),
+    (("主管单位",), re.compile(r'主管单位[：:]\s*([^\n,，]{2,30})')),
+    (("主办",), re.compile(r'主办[单位]*[：:]\s*([^\n,，]{2,30})')),
+]
+EMPLOYER_TITLE_RE = re.compile(r'(\d{4}年)?(.{2,20}?)(公开)?招[聘录]')
+
+
+class KeywordIndex:
+    """
+    正文中锚点关键词的出现情况，按需检测并缓存
+
+    每个关键词最多扫描正文一次（str 的 in 走 C 实现的快速查找），
+    同一关键词被多个字段的规则共用时不会重复扫描。
+    """
+
+    __slots__ = ("text", "cache")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.cache = {}
+
+    def __contains__(self, keyword: str) -> bool:
+        found = self.cache.get(keyword)
+        if found is None:
+            found = self.cache[keyword] = keyword in self.text
+        return found
+
+    def any(self, keywords) -> bool:
+        return any(kw in self for kw in keywords)
+
+
+def _first_match(rules, text: str, present: KeywordIndex):
+    for keys, pattern in rules:
+        if keys and not present.any(keys):
+            continue
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+
+def _salary(text: str, present: KeywordIndex) -> str:
+    match = _first_match(SALARY_RULES, text, present)
+    return match.group(1) if match else "未公开"
+
+
+def _count_before_positions(text: str):
+    """
+    等价于 re.search(r'(\d+)\s*个岗位', text).group(1)
+
+    从每个“个岗位”向前跳过空白、再取连续数字（\s / \d 与 str.isspace / isdecimal 一致）。
+    """
+    pos = text.find("个岗位")
+    while pos >= 0:
+        end = pos
+        while end > 0 and text[end - 1].isspace():
+            end -= 1
+        start = end
+        while start > 0 and text[start - 1].isdecimal():
+            start -= 1
+        if start < end:
+            return text[start:end]
+        pos = text.find("个岗位", pos + 3)
+    return None
+
+
+def _count(text: str, present: KeywordIndex) -> str:
+    match = _first_match(COUNT_RULES, text, present)
+    if match:
+        return f"{match.group(1)}人"
+    count = _count_before_positions(text) if "个岗位" in present else None
+    return f"{count}人" if count else "若干"
+
+
+def _education(text: str, present: KeywordIndex) -> str:
+    match = _first_match(EDUCATION_RULES, text, present)
+    if match:
+        return match.group(1)
+
+    # 简单匹配
+    if "博士" in text:
+        return "博士"
+    if "硕士" in text or "研究生" in text:
+        return "硕士及以上"
+    if "本科" in text:
+        return "本科及以上"
+    if "大专" in text:
+        return "大专及以上"
+
+    return "详见公告"
+
+
+def _find_year_date(suffix_re, text: str, pos: int = 0, endpos: int = None):
+    """
+    等价于 re.search(r'\d{4}' + suffix, text[pos:endpos])，返回 (start, end) 或 None
+
+    先用以字面量开头的 suffix_re 定位，再检查前面是否正好是 4 位数字。
+    """
+    if endpos is None:
+        endpos = len(text)
+    i = pos + 4
+    while True:
+        match = suffix_re.search(text, i, endpos)
+        if not match:
+            return None
+        start = match.start() - 4
+        if YEAR_RE.fullmatch(text, start, match.start()):
+            return start, match.end()
+        i = match.start() + 1
+
+
+def _deadline_after_signup(text: str):
+    """
+    等价于 re.search(r'报名.*?至.*?(\d{4}年\d{1,2}月\d{1,2}日)', text)
+
+    . 不匹配换行，所以逐行处理：行内第一个“报名”之后第一个“至”之后的第一个中文日期；
+    该行的第一个“报名”不成功时，同一行后面的“报名”也不会成功。
+    原正则在没有日期的长行上会反复回溯，这里是线性扫描。
+    """
+    pos = text.find("报名")
+    while pos >= 0:
+        line_end = text.find("\n", pos)
+        if line_end < 0:
+            line_end = len(text)
+        to = text.find("至", pos + 2, line_end)
+        if to >= 0:
+            span = _find_year_date(CN_DATE_SUFFIX_RE, text, to + 1, line_end)
+            if span:
+                return text[span[0]:span[1]]
+        pos = text.find("报名", line_end)
+    return None
+
+
+def _deadline_iso(text: str):
+    """
+    等价于 re.search(r'(\d{4}-\d{1,2}-\d{1,2}).*?(?:截止|结束)', text).group(1)
+
+    某行第一个日期之后没有“截止/结束”时，同一行后面的日期也不会有，直接跳到下一行。
+    """
+    pos = 0
+    while True:
+        span = _find_year_date(ISO_DATE_SUFFIX_RE, text, pos)
+        if not span:
+            return None
+        start, end = span
+        line_end = text.find("\n", end)
+        if line_end < 0:
+            line_end = len(text)
+        if text.find("截止", end, line_end) >= 0 or text.find("结束", end, line_end) >= 0:
+            return text[start:end]
+        pos = line_end + 1
+
+
+def _deadline(text: str, present: KeywordIndex) -> str:
+    # 规则 1-3 和兜底规则都要求正文中有中文日期
+    first_date = _find_year_date(CN_DATE_SUFFIX_RE, text) if "年" in present else None
+
+    if first_date:
+        match = _first_match(DEADLINE_CN_RULES, text, present)
+        if match:
+            return match.group(1)
+        if "报名" in present and "至" in present:
+            date = _deadline_after_signup(text)
+            if date:
+                return date
+
+    if "截止" in present or "结束" in present:
+        date = _deadline_iso(text)
+        if date:
+            return date
+
+    if first_date:
+        return text[first_date[0]:first_date[1]]
+    return "详见公告"
+
+
+def _location(text: str, title: str) -> str:
+    found = set(CITY_RE.findall(title))
+    found.update(CITY_RE.findall(text))
+    found.update(city for city in CITY_OVERLAPS
+                 if city not in found and (city in title or city in text))
+    for city, full_name in CITIES.items():
+        if city in found:
+            return f"江苏省{full_name}"
+    return "江苏省"
+
+
+def _employer(text: str, title: str, present: KeywordIndex) -> str:
+    match = _first_match(EMPLOYER_RULES, text, present)
+    if match:
+        return match.group(1).strip()
+
+    # 从标题提取
+    # 如 "2026年南京市XXX招聘公告" -> "南京市XXX"
+    match = EMPLOYER_TITLE_RE.search(title)
+    if match:
+        employer = match.group(2).strip()
+        if len(employer) >= 4:
+            return employer
+
+    return ""
+
+
+def extract_fields(content: str, title: str = "") -> dict:
+    """一次性提取全部字段，键与 process_data.process_job 的输出字段一致"""
+    content = content or ""
+    title = title or ""
+    present = KeywordIndex(content)
+
+    return {
+        "招聘单位": _employer(content, title, present),
+        "薪资范围": _salary(content, present),
+        "工作地点": _location(content, title),
+        "招聘人数": _count(content, present),
+        "学历要求": _education(content, present),
+        "报名截止": _deadline(content, present),
+    }
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+本地假站点：公考雷达列表/详情页 + Notion API，用于端到端压测
+
+FakeGongkaoleida 生成 N 个列表页、M 个详情页，页面结构与 data/debug_page.html 一致
+(ul.link-list > li > h5 > a[href*="/article/"]，详情页 .article-info / .article-content)，
+每 10 条公告中有 1 条成绩公示等非招聘公告。可配置响应延迟和错误率 (返回 503)。
+
+FakeNotion 在内存中实现同步用到的 Notion API:
+    POST  /v1/search                    返回 “📋 招聘信息库” 数据库
+    POST  /v1/databases/<id>/query      filter (and/or、属性条件、last_edited_time)、sorts、分页
+    POST  /v1/pages                     创建页面
+    PATCH /v1/pages/<id>                更新属性 / 归档
+超过 rate_limit 次/秒时返回 429 (Retry-After)，和真实 Notion 一样要求客户端限速。
+
+使用方法:
+    python scripts/fake_sites.py [--list-pages 20] [--details 400] [--latency 0.05] [--error-rate 0.02]
+                                 [--notion-rate 3] [--site-port 8801] [--notion-port 8802]
+
+启动后按提示设置 GONGKAOLEIDA_BASE_URL / NOTION_API_URL 即可让各脚本访问假站点；
+端到端压测见 load_test.py。
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DATABASE_NAME = "📋 招聘信息库"
+FIRST_ARTICLE_ID = 2700000
+
+CITIES = ["南京市", "苏州市", "无锡市", "常州市", "南通市", "徐州市", "扬州市", "盐城市", "泰州市", "镇江市"]
+DISTRICTS = ["玄武区", "虎丘区", "梁溪区", "武进区", "崇川区", "云龙区", "邗江区", "亭湖区", "海陵区", "京口区"]
+EMPLOYERS = ["人民医院", "实验中学", "城投集团", "财政局下属事业单位", "疾病预防控制中心",
+             "高新区管委会", "交通产业集团", "中心小学", "图书馆", "水务集团"]
+KINDS = ["事业单位", "教师", "国企", "医疗卫生", "公益性岗位"]
+POSTS = ["护士", "临床医生", "语文教师", "数学教师", "英语教师", "会计", "出纳", "工程技术员", "文秘",
+         "驾驶员", "信息技术员", "规划设计员", "药剂师", "检验技师", "人力资源专员", "法务专员",
+         "审计员", "统计员", "档案管理员", "安全管理员", "网格员", "社区工作者", "辅导员", "讲解员"]
+TITLE_FORMS = ["{year}年公开招聘{posts}等工作人员公告", "关于公开招聘{posts}的公告",
+               "{year}年度招聘{posts}简章", "公开选聘{posts}启事", "{year}年招聘编外{posts}公告"]
+EDUCATION = ["大专及以上学历", "本科及以上学历", "硕士研究生及以上学历"]
+# 列表页中的非招聘公告（会被 scrape_list.is_recruitment_post 过滤）
+NOTICE_SUFFIXES = ["面试成绩公示", "拟录用人员名单公示", "体检通知"]
+
+
+class FakeGongkaoleida:
+    """假公考雷达：文章 ID 从大到小排列，第 1 页是最新的公告"""
+
+    def __init__(self, list_pages: int = 20, details: int = 400, latency: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.list_pages = list_pages
+        self.details = details
+        self.per_page = max(1, math.ceil(details / max(1, list_pages)))
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"list": 0, "detail": 0, "errors": 0, "not_found": 0}
+
+    def article(self, index: int) -> dict:
+        """第 index 条公告（0 为最新），内容由文章 ID 决定，多次请求结果相同"""
+        article_id = FIRST_ARTICLE_ID + self.details - index
+        rng = random.Random(article_id)
+        city, district = rng.choice(CITIES), rng.choice(DISTRICTS)
+        employer = f"{city}{district}{rng.choice(EMPLOYERS)}"
+        posts = [(post, rng.randint(1, 6)) for post in rng.sample(POSTS, rng.randint(2, 4))]
+        names = [post for post, _ in posts]
+        if index % 10 == 9:
+            title = f"{employer}2026年公开招聘{names[0]}{rng.choice(NOTICE_SUFFIXES)}"
+        else:
+            title = employer + rng.choice(TITLE_FORMS).format(year=2026, posts="、".join(names))
+        published = datetime(2026, 1, 17) - timedelta(days=index // max(1, self.per_page))
+        return {
+            "id": article_id,
+            "title": title,
+            "employer": employer,
+            "location": f"{city}{district}",
+            "kind": rng.choice(KINDS),
+            "posts": posts,
+            "count": sum(count for _, count in posts),
+            "education": rng.choice(EDUCATION),
+            "salary": f"月薪{rng.randint(4, 9)}000-{rng.randint(10, 15)}000元",
+            "published": published.strftime("%Y-%m-%d"),
+            "deadline": (published + timedelta(days=rng.randint(7, 20))).strftime("%Y年%m月%d日"),
+        }
+
+    def list_html(self, page: int) -> str:
+        start = (page - 1) * self.per_page
+        indexes = range(start, min(start + self.per_page, self.details)) if page <= self.list_pages else []
+        items = []
+        for index in indexes:
+            a = self.article(index)
+            items.append(
+                f'<li>\n<h5>\n<i class="notice-label">[{a["location"][3:]}]</i>\n'
+                f'<i class="notice-label">[{a["kind"]}]</i>\n'
+                f'<a href="/article/{a["id"]}" target="_blank" title="{a["title"]}">{a["title"]}</a>\n'
+                f'</h5>\n<time class="">{a["published"]}</time>\n</li>'
+            )
+        pages = "".join(f'<li><a href="/area/878-0-0-0-124?page={n}">{n}</a></li>'
+                        for n in range(max(1, page - 2), min(self.list_pages, page + 2) + 1))
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><title>江苏省公考雷达</title></head><body>\n'
+            '<div class="md-notice"> <!--公告列表-->\n<div class="notice-list">\n<ul class="link-list">\n'
+            + "\n".join(items)
+            + '\n</ul>\n</div>\n</div>\n'
+            f'<div class="pagelist-box"><ul class="pagelist clearfix">{pages}</ul></div>\n'
+            '</body></html>'
+        )
+
+    def detail_html(self, index: int) -> str:
+        a = self.article(index)
+        posts = "、".join(f"{post}{count}名" for post, count in a["posts"])
+        paragraphs = [
+            f"{a['employer']}现面向社会招聘{posts}，共招聘{a['count']}人。现将有关事项公告如下：",
+            f"一、招聘岗位及人数：{posts}，具体见岗位表。",
+            f"二、报名条件：具有{a['education']}，年龄35周岁以下，身体健康，具有良好的职业道德。",
+            f"三、工作地点：{a['location']}。",
+            f"四、薪资待遇：{a['salary']}，按规定缴纳五险一金。",
+            f"五、报名时间：即日起至{a['deadline']}17:00止，逾期不予受理。",
+            "六、招聘程序：报名、资格审查、笔试、面试、体检、考察、公示、聘用。",
+        ]
+        content = "\n".join(f"<p>{text}</p>" for text in paragraphs)
+        return (
+            f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{a["title"]}_公考雷达</title></head><body>\n'
+            f'<div class="article"><h1>{a["title"]}</h1>\n'
+            f'<div class="article-info">发布时间：{a["published"]} 来源：{a["employer"]}</div>\n'
+            f'<div class="article-content">\n{content}\n</div></div>\n</body></html>'
+        )
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def handle(self, method: str, path: str, query: dict, body: bytes) -> tuple:
+        if self.latency:
+            time.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self._count("errors")
+            return 503, {"Content-Type": "text/plain"}, b"Service Unavailable"
+
+        if path.startswith("/area/"):
+            self._count("list")
+            page = int(query.get("page", ["1"])[0])
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, self.list_html(page).encode()
+
+        match = re.fullmatch(r"/article/(\d+)", path)
+        if match:
+            index = FIRST_ARTICLE_ID + self.details - int(match.group(1))
+            if 0 <= index < self.details:
+                self._count("detail")
+                return 200, {"Content-Type": "text/html; charset=utf-8"}, self.detail_html(index).encode()
+
+        self._count("not_found")
+        return 404, {"Content-Type": "text/plain"}, b"Not Found"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _plain_text(value: dict) -> str:
+    items = value.get("title") or value.get("rich_text") or []
+    return "".join(item.get("plain_text", "") for item in items)
+
+
+class FakeNotion:
+    """内存中的 Notion 数据库，只实现同步脚本用到的接口和筛选条件"""
+
+    def __init__(self, rate_limit: float = 3.0, error_rate: float = 0.0, latency: float = 0.0,
+                 seed: int = 0):
+        self.database_id = str(uuid.UUID(int=random.Random(seed).getrandbits(128)))
+        self.pages = {}  # page_id -> page，按创建顺序
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = float(max(1, int(rate_limit)))
+        self.updated = time.monotonic()
+        self.stats = {"requests": 0, "search": 0, "query": 0, "create": 0, "update": 0,
+                      "rate_limited": 0, "errors": 0}
+
+    def _allow(self) -> bool:
+        """服务端令牌桶，平均 rate_limit 次/秒"""
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self.tokens = min(max(1, int(self.rate_limit)), self.tokens + (now - self.updated) * self.rate_limit)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    @staticmethod
+    def _normalize(properties: dict) -> dict:
+        """补上 Notion 返回的 plain_text 字段"""
+        for value in properties.values():
+            for key in ("title", "rich_text"):
+                for item in value.get(key) or []:
+                    item.setdefault("plain_text", item.get("text", {}).get("content", ""))
+        return properties
+
+    def _property_value(self, page: dict, name: str, kind: str):
+        value = page["properties"].get(name, {})
+        if kind in ("title", "rich_text"):
+            return _plain_text(value)
+        if kind == "url":
+            return value.get("url") or ""
+        if kind == "date":
+            return (value.get("date") or {}).get("start") or ""
+        if kind == "select":
+            return (value.get("select") or {}).get("name") or ""
+        raise ValueError(f"unsupported property filter: {kind}")
+
+    def _match(self, page: dict, filter_: dict) -> bool:
+        if not filter_:
+            return True
+        if "and" in filter_:
+            return all(self._match(page, f) for f in filter_["and"])
+        if "or" in filter_:
+            return any(self._match(page, f) for f in filter_["or"])
+        if "timestamp" in filter_:
+            kind = filter_["timestamp"]
+            value = page[kind]
+        else:
+            kind = next(k for k in filter_ if k != "property")
+            value = self._property_value(page, filter_["property"], kind)
+
+        for op, arg in filter_[kind].items():
+            ok = {
+                "equals": lambda: value == arg,
+                "does_not_equal": lambda: value != arg,
+                "contains": lambda: arg in value,
+                "does_not_contain": lambda: arg not in value,
+                "starts_with": lambda: value.startswith(arg),
+                "is_empty": lambda: not value,
+                "is_not_empty": lambda: bool(value),
+                "on_or_after": lambda: bool(value) and value >= arg,
+                "after": lambda: bool(value) and value > arg,
+                "before": lambda: bool(value) and value < arg,
+                "on_or_before": lambda: bool(value) and value[:len(arg)] <= arg,
+            }.get(op)
+            if ok is None:
+                raise ValueError(f"unsupported filter condition: {op}")
+            if not ok():
+                return False
+        return True
+
+    def query(self, body: dict) -> dict:
+        pages = [page for page in self.pages.values()
+                 if not page["archived"] and self._match(page, body.get("filter"))]
+        for sort in reversed(body.get("sorts") or []):
+            key = sort.get("timestamp")
+            if key:
+                pages.sort(key=lambda page: page[key], reverse=sort.get("direction") == "descending")
+        start = int(body.get("start_cursor") or 0)
+        size = min(int(body.get("page_size", 100)), 100)
+        has_more = start + size < len(pages)
+        return {"object": "list", "results": pages[start:start + size], "has_more": has_more,
+                "next_cursor": str(start + size) if has_more else None}
+
+    def handle(self, method: str, path: str, query: dict, body: bytes) -> tuple:
+        if self.latency:
+            time.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        with self.lock:
+            self.stats["requests"] += 1
+            if not self._allow():
+                self.stats["rate_limited"] += 1
+                return 429, {"Retry-After": "1"}, {"object": "error", "status": 429, "code": "rate_limited"}
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 502, {}, {"object": "error", "status": 502, "code": "bad_gateway"}
+
+            data = json.loads(body or b"{}")
+            try:
+                return self._route(method, path, data)
+            except (ValueError, KeyError, StopIteration) as e:
+                return 400, {}, {"object": "error", "status": 400, "code": "validation_error", "message": str(e)}
+
+    def _route(self, method: str, path: str, data: dict) -> tuple:
+        if method == "POST" and path == "/v1/search":
+            self.stats["search"] += 1
+            results = [{"object": "database", "id": self.database_id,
+                        "title": [{"plain_text": DATABASE_NAME}]}]
+            return 200, {}, {"object": "list", "results": results, "has_more": False, "next_cursor": None}
+
+        if method == "POST" and path == f"/v1/databases/{self.database_id}/query":
+            self.stats["query"] += 1
+            return 200, {}, self.query(data)
+
+        if method == "POST" and path == "/v1/pages":
+            self.stats["create"] += 1
+            now = _now()
+            page = {"object": "page", "id": str(uuid.uuid4()), "created_time": now, "last_edited_time": now,
+                    "archived": False, "parent": data["parent"],
+                    "properties": self._normalize(data.get("properties", {}))}
+            self.pages[page["id"]] = page
+            return 200, {}, page
+
+        match = re.fullmatch(r"/v1/pages/([0-9a-f-]+)", path)
+        if method == "PATCH" and match and match.group(1) in self.pages:
+            self.stats["update"] += 1
+            page = self.pages[match.group(1)]
+            page["properties"].update(self._normalize(data.get("properties", {})))
+            if "archived" in data:
+                page["archived"] = bool(data["archived"])
+            page["last_edited_time"] = _now()
+            return 200, {}, page
+
+        return 404, {}, {"object": "error", "status": 404, "code": "object_not_found"}
+
+    def live_pages(self) -> int:
+        with self.lock:
+            return sum(1 for page in self.pages.values() if not page["archived"])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    app = None
+
+    def log_message(self, *args):
+        pass
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status, headers, payload = self.app.handle(method, url.path, parse_qs(url.query), body)
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload, ensure_ascii=False).encode()
+            headers = {"Content-Type": "application/json", **headers}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if method != "HEAD":
+            self.wfile.write(payload)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_HEAD(self):
+        self._dispatch("HEAD")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def serve(app, port: int = 0, host: str = "127.0.0.1") -> tuple:
+    """在后台线程中启动服务，返回 (server, base_url)；server.shutdown() 停止"""
+    handler = type("Handler", (_Handler,), {"app": app})
+    server = _Server((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地假公考雷达 + 假 Notion API")
+    parser.add_argument("--list-pages", type=int, default=20, help="列表页数 (默认 20)")
+    parser.add_argument("--details", type=int, default=400, help="详情页数 (默认 400)")
+    parser.add_argument("--latency", type=float, default=0.05, help="站点平均响应延迟秒数 (默认 0.05)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="站点返回 503 的比例")
+    parser.add_argument("--notion-rate", type=float, default=3.0, help="Notion 每秒允许请求数，0 为不限 (默认 3)")
+    parser.add_argument("--notion-error-rate", type=float, default=0.0, help="Notion 返回 502 的比例")
+    parser.add_argument("--site-port", type=int, default=8801)
+    parser.add_argument("--notion-port", type=int, default=8802)
+    args = parser.parse_args()
+
+    site = FakeGongkaoleida(args.list_pages, args.details, args.latency, args.error_rate)
+    notion = FakeNotion(args.notion_rate, args.notion_error_rate)
+    _, site_url = serve(site, args.site_port)
+    _, notion_url = serve(notion, args.notion_port)
+
+    print(f"🌐 假公考雷达: {site_url} ({args.list_pages} 个列表页, {args.details} 个详情页)")
+    print(f"☁️ 假 Notion:  {notion_url}/v1 (数据库 {notion.database_id})")
+    print("\n设置环境变量后运行工作流:")
+    print(f"   export GONGKAOLEIDA_BASE_URL={site_url} SOURCES=gongkaoleida")
+    print(f"   export NOTION_API_URL={notion_url}/v1 NOTION_TOKEN=fake")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"📊 站点 {site.stats} | Notion {notion.stats}, 页面 {notion.live_pages()}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+已采集 URL 记录 (frontier)
+
+data/seen_urls.txt 为追加写入的文本文件，每行 "URL<TAB>日期"，
+记录详情已成功抓取的公告 URL。列表抓取遇到整页都是已知 URL 时停止翻页，
+详情抓取直接跳过已知 URL。文件随 data/ 一起提交，GitHub Actions 每次运行都能复用。
+
+环境变量:
+    FRONTIER - 设为 0 关闭增量模式（全量抓取）
+"""
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+FRONTIER_FILE = DATA_DIR / "seen_urls.txt"
+
+
+def frontier_enabled() -> bool:
+    return os.environ.get("FRONTIER", "1") != "0"
+
+
+class Frontier:
+    """已见 URL 集合，启动时整体读入，新增时追加写入"""
+
+    def __init__(self, path: Path = FRONTIER_FILE):
+        self.path = Path(path)
+        self.urls = set()
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    url = line.split("\t", 1)[0].strip()
+                    if url:
+                        self.urls.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.urls
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def filter_new(self, urls: list) -> list:
+        """过滤出未见过的 URL（保持顺序）"""
+        return [url for url in urls if url not in self.urls]
+
+    def add(self, urls: list) -> int:
+        """追加新 URL，返回实际新增数量"""
+        new_urls = list(dict.fromkeys(url for url in urls if url and url not in self.urls))
+        if not new_urls:
+            return 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        today = datetime.now().strftime("%Y-%m-%d")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{url}\t{today}\n" for url in new_urls))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.urls.update(new_urls)
+        return len(new_urls)
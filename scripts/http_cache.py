@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+HTTP 响应缓存
+
+data/http_cache.db 以规范化 URL 为键保存页面响应 (zlib 压缩) 及其 ETag / Last-Modified / 正文哈希
+（不提交到仓库，CI 中用 actions/cache 在运行之间保存）:
+    - TTL 内直接使用缓存，不发请求
+    - 过期后带 If-None-Match / If-Modified-Since 发条件请求，304 时沿用缓存
+    - 总大小超过上限时按最近使用时间淘汰
+
+HTTP 快速通道 (requests) 用 ResponseCache.get；浏览器通过 BrowserPool 安装
+ResponseCache.handle 拦截文档请求。列表页内容每天都变，以 ttl=0 使用 (每次都发条件请求)。
+
+环境变量:
+    HTTP_CACHE        - 设为 0 关闭缓存
+    HTTP_CACHE_TTL    - 缓存有效期，小时 (默认 168，即 7 天)
+    HTTP_CACHE_MAX_MB - 缓存文件大小上限 (默认 50)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+CACHE_FILE = DATA_DIR / "http_cache.db"
+
+DEFAULT_TTL = float(os.environ.get("HTTP_CACHE_TTL", "168")) * 3600
+DEFAULT_MAX_BYTES = int(float(os.environ.get("HTTP_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+# 不影响页面内容的查询参数（站内跳转来源、统计参数）
+IGNORED_PARAMS = {"from", "spm"}
+KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    headers_json  TEXT,
+    body          BLOB,
+    body_hash     TEXT,
+    size          INTEGER,
+    fetched_at    REAL,
+    accessed_at   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("HTTP_CACHE", "1") != "0"
+
+
+def canonical_url(url: str) -> str:
+    """规范化 URL：小写协议和域名，去掉默认端口、片段和统计参数，查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (scheme == "http" and parts.port == 80
+                           or scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in IGNORED_PARAMS and not k.startswith("utm_")
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class ResponseCache:
+    """持久化响应缓存，线程安全（HTTP 快速通道在线程池中调用）"""
+
+    def __init__(self, path: Path = CACHE_FILE, ttl: float = None, max_bytes: int = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # fresh: TTL 内命中; revalidated: 304; unchanged: 200 但正文哈希未变; fetched: 下载了新内容
+        self.stats = {"requests": 0, "fresh": 0, "revalidated": 0, "unchanged": 0,
+                      "fetched": 0, "saved_bytes": 0, "evicted": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def lookup(self, url: str) -> dict:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, headers_json, body, body_hash, size, fetched_at "
+                "FROM responses WHERE url = ?", (canonical_url(url),)).fetchone()
+        if not row:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "headers": json.loads(row[2] or "{}"),
+            "body": zlib.decompress(row[3]),
+            "body_hash": row[4],
+            "size": row[5],
+            "fetched_at": row[6],
+        }
+
+    def is_fresh(self, entry: dict) -> bool:
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, url: str, entry: dict, kind: str):
+        """记录一次缓存命中 (fresh / revalidated)，304 时刷新 fetched_at"""
+        now = time.time()
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats[kind] += 1
+            self.stats["saved_bytes"] += len(entry["body"])
+            fetched_at = now if kind == "revalidated" else entry["fetched_at"]
+            with self.conn:
+                self.conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                                  (fetched_at, now, canonical_url(url)))
+
+    def store(self, url: str, body: bytes, headers: dict, entry: dict = None):
+        """保存 200 响应；headers 的键不区分大小写"""
+        headers = {k.lower(): v for k, v in headers.items()}
+        body_hash = hashlib.sha1(body).hexdigest()
+        kept = {k: headers[k] for k in KEPT_HEADERS if k in headers}
+        data = zlib.compress(body)
+        now = time.time()
+        with self.lock:
+            self.stats["requests"] += 1
+            unchanged = entry is not None and entry["body_hash"] == body_hash
+            self.stats["unchanged" if unchanged else "fetched"] += 1
+            with self.conn:
+                old = self.conn.execute("SELECT size FROM responses WHERE url = ?",
+                                        (canonical_url(url),)).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (url, etag, last_modified, headers_json, body, "
+                    "body_hash, size, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (canonical_url(url), headers.get("etag"), headers.get("last-modified"),
+                     json.dumps(kept), data, body_hash, len(data), now, now),
+                )
+            self.total_bytes += len(data) - (old[0] if old else 0)
+            self._evict()
+
+    def _evict(self):
+        """超过大小上限时按 accessed_at 从旧到新淘汰（调用方持有锁）"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        victims = []
+        for url, size in rows:
+            if self.total_bytes <= self.max_bytes * 0.9:
+                break
+            victims.append((url,))
+            self.total_bytes -= size
+        with self.conn:
+            self.conn.executemany("DELETE FROM responses WHERE url = ?", victims)
+        self.stats["evicted"] += len(victims)
+
+    def get(self, session, url: str, timeout: float = 15) -> bytes:
+        """requests 条件请求，返回正文；非 200/304 时抛出 HTTPError"""
+        entry = self.lookup(url)
+        if self.is_fresh(entry):
+            self.hit(url, entry, "fresh")
+            return entry["body"]
+
+        resp = session.get(url, timeout=timeout, headers=self.conditional_headers(entry))
+        if resp.status_code == 304 and entry:
+            self.hit(url, entry, "revalidated")
+            return entry["body"]
+        resp.raise_for_status()
+        self.store(url, resp.content, resp.headers, entry)
+        return resp.content
+
+    async def handle(self, route):
+        """
+        Playwright 路由回调，只处理 GET 文档请求，其他请求交给之前安装的路由 (如 ResourceBlocker)
+
+        BrowserPool 在 ResourceBlocker 之后安装，后安装的路由先执行。
+        """
+        request = route.request
+        if request.resource_type != "document" or request.method != "GET":
+            await route.fallback()
+            return
+
+        url = request.url
+        entry = self.lookup(url)
+        if self.is_fresh(entry):
+            self.hit(url, entry, "fresh")
+            await route.fulfill(status=200, headers=entry["headers"], body=entry["body"])
+            return
+
+        response = await route.fetch(headers={**request.headers, **self.conditional_headers(entry)})
+        if response.status == 304 and entry:
+            self.hit(url, entry, "revalidated")
+            await route.fulfill(status=200, headers=entry["headers"], body=entry["body"])
+            return
+        if response.status == 200:
+            self.store(url, await response.body(), response.headers, entry)
+        await route.fulfill(response=response)
+
+    async def install(self, context):
+        await context.route("**/*", self.handle)
+
+    def summary(self) -> str:
+        return format_cache_stats(self.stats)
+
+
+def format_cache_stats(*stats_list) -> str:
+    """汇总一个或多个 ResponseCache.stats（None 忽略）"""
+    total = {}
+    for stats in stats_list:
+        for key, value in (stats or {}).items():
+            total[key] = total.get(key, 0) + value
+    requests = total.get("requests", 0)
+    hits = total.get("fresh", 0) + total.get("revalidated", 0)
+    rate = hits / requests * 100 if requests else 0
+    return (f"命中 {hits}/{requests} ({rate:.0f}%, 未过期 {total.get('fresh', 0)}, "
+            f"304 {total.get('revalidated', 0)}), 内容未变 {total.get('unchanged', 0)}, "
+            f"节省 {total.get('saved_bytes', 0) / 1024 / 1024:.1f} MB")
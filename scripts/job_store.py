@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+本地职位库 (SQLite)
+
+data/jobs.db 以原文 URL 为主键，记录每条公告在流水线中的阶段:
+    list      - 列表页已发现 (scrape_list.py)
+    detail    - 详情已抓取 (scrape_detail.py)
+    processed - 字段已提取 (process_data.py)
+    synced    - 已同步到 Notion (sync_notion.py)
+    failed    - 详情连续抓取失败 DETAIL_MAX_ATTEMPTS 次，不再重试（终止阶段）
+
+各脚本只读写自己阶段的待处理记录，重跑、部分失败和补采都不需要重新加载整批数据。
+详情抓取失败的记录留在 list 阶段并记录失败次数 (attempts) 和最后的错误 (last_error)，
+待处理记录按失败次数排序，失败过的排在新记录之后，不会挤占每次的抓取名额。
+dated JSON 文件 (job_list_*.json / gongkaoleida_*.json) 仍然输出，方便查看和提交。
+
+另提供 JSONL 追加写入/流式读取工具，用于 data/temp_details.jsonl。
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_FILE = DATA_DIR / "jobs.db"
+
+STAGES = ("list", "detail", "processed", "synced", "failed")
+MAX_ATTEMPTS = int(os.environ.get("DETAIL_MAX_ATTEMPTS", "3"))  # 详情抓取失败几次后进入 failed 阶段
+ITER_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url             TEXT PRIMARY KEY,
+    stage           TEXT NOT NULL,
+    list_json       TEXT,
+    detail_json     TEXT,
+    processed_json  TEXT,
+    notion_page_id  TEXT,
+    created_at      TEXT NOT NULL,
+    updated_at      TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_stage ON jobs (stage, created_at);
+"""
+# 早期版本的 jobs 表没有的列
+MIGRATIONS = {
+    "attempts": "ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0",
+    "last_error": "ALTER TABLE jobs ADD COLUMN last_error TEXT",
+}
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False)
+
+
+class JobStore:
+    """以 URL 为键的分阶段职位库"""
+
+    def __init__(self, path: Path = STORE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        with self.conn:
+            for column, sql in MIGRATIONS.items():
+                if column not in columns:
+                    self.conn.execute(sql)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add_list(self, jobs: list) -> int:
+        """写入列表阶段记录，已存在的只更新列表信息，返回新增数量"""
+        now = _now()
+        new_count = 0
+        with self.conn:
+            for job in jobs:
+                url = job.get("url")
+                if not url:
+                    continue
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO jobs (url, stage, list_json, created_at, updated_at) "
+                    "VALUES (?, 'list', ?, ?, ?)",
+                    (url, _dumps(job), now, now),
+                )
+                if cur.rowcount:
+                    new_count += 1
+                else:
+                    self.conn.execute(
+                        "UPDATE jobs SET list_json = ?, updated_at = ? WHERE url = ?",
+                        (_dumps(job), now, url),
+                    )
+        return new_count
+
+    def save_details(self, results: list) -> int:
+        """
+        写入详情，成功的记录进入 detail 阶段，返回成功数
+
+        失败的保持原阶段、失败次数加一，下次重试；list 阶段的记录失败 MAX_ATTEMPTS 次后进入 failed 阶段
+        """
+        now = _now()
+        saved = 0
+        with self.conn:
+            for result in results:
+                if not result.get("url"):
+                    continue
+                if result.get("error"):
+                    self.conn.execute(
+                        "UPDATE jobs SET attempts = attempts + 1, last_error = ?, updated_at = ?, "
+                        "stage = CASE WHEN stage = 'list' AND attempts + 1 >= ? THEN 'failed' ELSE stage END "
+                        "WHERE url = ?",
+                        (str(result["error"])[:500], now, MAX_ATTEMPTS, result["url"]),
+                    )
+                    continue
+                self.conn.execute(
+                    "INSERT INTO jobs (url, stage, detail_json, created_at, updated_at) "
+                    "VALUES (?, 'detail', ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET stage = 'detail', "
+                    "detail_json = excluded.detail_json, updated_at = excluded.updated_at, "
+                    "attempts = 0, last_error = NULL",
+                    (result["url"], _dumps(result), now, now),
+                )
+                saved += 1
+        return saved
+
+    def save_processed(self, records: list) -> int:
+        """写入处理结果（以 原文链接 为键），进入 processed 阶段"""
+        now = _now()
+        with self.conn:
+            for record in records:
+                self.conn.execute(
+                    "UPDATE jobs SET stage = 'processed', processed_json = ?, updated_at = ? "
+                    "WHERE url = ?",
+                    (_dumps(record), now, record.get("原文链接", "")),
+                )
+        return len(records)
+
+    def mark_synced(self, urls: list, page_ids: dict = None):
+        """标记已同步，page_ids 为 {url: notion_page_id}"""
+        page_ids = page_ids or {}
+        now = _now()
+        with self.conn:
+            for url in urls:
+                self.conn.execute(
+                    "UPDATE jobs SET stage = 'synced', updated_at = ?, "
+                    "notion_page_id = COALESCE(?, notion_page_id) WHERE url = ?",
+                    (now, page_ids.get(url), url),
+                )
+
+    def _row_to_dict(self, row) -> dict:
+        return {
+            "url": row["url"],
+            "stage": row["stage"],
+            "list": json.loads(row["list_json"]) if row["list_json"] else {},
+            "detail": json.loads(row["detail_json"]) if row["detail_json"] else {},
+            "processed": json.loads(row["processed_json"]) if row["processed_json"] else {},
+            "notion_page_id": row["notion_page_id"],
+            "created_at": row["created_at"],
+            "attempts": row["attempts"],
+            "last_error": row["last_error"],
+        }
+
+    def iter_stage(self, stages, limit: int = None):
+        """
+        按发现顺序逐条返回指定阶段的记录
+
+        按 rowid 分块读取，内存占用与总记录数无关；每块读完才返回，
+        因此迭代过程中可以安全地更新这些记录的阶段。
+        """
+        if isinstance(stages, str):
+            stages = [stages]
+        placeholders = ",".join("?" * len(stages))
+        last_rowid = 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = ITER_CHUNK_SIZE if remaining is None else min(ITER_CHUNK_SIZE, remaining)
+            rows = self.conn.execute(
+                f"SELECT rowid, * FROM jobs WHERE stage IN ({placeholders}) AND rowid > ? "
+                "ORDER BY rowid LIMIT ?",
+                [*stages, last_rowid, size],
+            ).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1]["rowid"]
+            if remaining is not None:
+                remaining -= len(rows)
+            for row in rows:
+                yield self._row_to_dict(row)
+
+    def pending(self, stage: str, limit: int = None) -> list:
+        """获取停留在某阶段、等待下一步处理的记录，失败次数少的在前，其次按发现顺序"""
+        rows = self.conn.execute(
+            "SELECT * FROM jobs WHERE stage = ? ORDER BY attempts, rowid LIMIT ?",
+            (stage, -1 if limit is None else limit),
+        ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def get(self, url: str) -> dict:
+        row = self.conn.execute("SELECT * FROM jobs WHERE url = ?", (url,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def counts(self) -> dict:
+        counts = {stage: 0 for stage in STAGES}
+        for row in self.conn.execute("SELECT stage, COUNT(*) FROM jobs GROUP BY stage"):
+            counts[row[0]] = row[1]
+        return counts
+
+
+def append_jsonl(path: Path, records: list) -> int:
+    """
+    以 JSONL 格式追加记录
+
+    每条记录用一次 O_APPEND write 写入整行，进程中途崩溃最多留下一行不完整的尾部，
+    不会破坏已写入的记录。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(path), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        # 上次崩溃留下的半行单独成行，避免和新记录拼在一起
+        size = os.fstat(fd).st_size
+        if size and os.pread(fd, 1, size - 1) != b"\n":
+            os.write(fd, b"\n")
+        for record in records:
+            os.write(fd, (_dumps(record) + "\n").encode("utf-8"))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return len(records)
+
+
+def iter_jsonl(path: Path):
+    """逐行读取 JSONL，跳过损坏的行（如崩溃留下的半行）"""
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ 跳过损坏的记录: {path.name} 第 {line_no} 行")
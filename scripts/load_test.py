@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+端到端压测：agent_workflow.py 对接本地假公考雷达和假 Notion API
+
+启动 fake_sites.py 中的两个假服务，把 agent_workflow.py 和 scripts/ 复制到临时目录
+（data/ 与真实数据隔离），设置 GONGKAOLEIDA_BASE_URL / NOTION_API_URL 后运行工作流，
+报告各阶段耗时、吞吐以及假服务收到的请求数、429 次数和注入的错误数。
+--runs N 在同一份数据上连续运行 N 次，第 2 次起为增量运行（frontier、响应缓存、Notion 索引生效）。
+
+列表页需要 Playwright；没有浏览器的环境可用 --seed-list 直接把列表结果写入职位库，
+只压测详情、处理和同步阶段。
+
+使用方法:
+    python scripts/load_test.py [--list-pages 20] [--details 400] [--latency 0.05] [--error-rate 0.02]
+                                [--notion-rate 3] [--notion-error-rate 0] [--client-rate 6]
+                                [--runs 2] [--seed-list] [--keep]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fake_sites import FakeGongkaoleida, FakeNotion, serve
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+
+def make_workspace() -> Path:
+    """临时目录中的项目副本（只含代码，data/ 为空）"""
+    workspace = Path(tempfile.mkdtemp(prefix="load_test_"))
+    shutil.copy2(PROJECT_DIR / "agent_workflow.py", workspace)
+    shutil.copytree(PROJECT_DIR / "scripts", workspace / "scripts",
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    (workspace / "data").mkdir()
+    return workspace
+
+
+def seed_list(site: FakeGongkaoleida, site_url: str, workspace: Path) -> int:
+    """不经过浏览器，按 scrape_list.py 的筛选规则把假站点的列表结果写入职位库"""
+    from job_store import JobStore
+    from scrape_list import is_recruitment_post
+
+    jobs = []
+    for index in range(site.details):
+        article = site.article(index)
+        if is_recruitment_post(article["title"]):
+            jobs.append({"title": article["title"], "url": f"{site_url}/article/{article['id']}",
+                         "date": "", "source": "", "site": "gongkaoleida"})
+    with JobStore(workspace / "data" / "jobs.db") as store:
+        return store.add_list(jobs)
+
+
+def run_workflow(workspace: Path, env: dict, log_file: Path) -> tuple:
+    """运行一次工作流，输出写入日志文件，返回 (耗时, 阶段耗时与统计)"""
+    timings_file = workspace / "data" / "workflow_timings.json"
+    env = {**env, "WORKFLOW_TIMINGS": str(timings_file)}
+    start = time.perf_counter()
+    with open(log_file, "w", encoding="utf-8") as log:
+        subprocess.run([sys.executable, "agent_workflow.py"], cwd=workspace, env=env,
+                       stdout=log, stderr=subprocess.STDOUT, check=False)
+    elapsed = time.perf_counter() - start
+    if not timings_file.exists():
+        return elapsed, None
+    with open(timings_file, "r", encoding="utf-8") as f:
+        return elapsed, json.load(f)
+
+
+def report(run: int, elapsed: float, result: dict, site_stats: dict, notion_stats: dict, live_pages: int):
+    print(f"\n📊 第 {run} 次运行: {elapsed:.1f}s")
+    if not result:
+        print("   ❌ 工作流未完成，见日志")
+        return
+    stats = result["stats"]
+    for name, seconds in result["stages"].items():
+        print(f"   ⏱️ {name}: {seconds:.1f}s")
+    detail_time = result["stages"].get("抓取详情")
+    sync_time = result["stages"].get("同步 Notion")
+    if detail_time and stats["scraped"]:
+        print(f"   📄 详情吞吐: {stats['scraped'] / detail_time:.1f} 页/秒")
+    if sync_time and stats["synced"] + stats["updated"]:
+        print(f"   ☁️ 同步吞吐: {(stats['synced'] + stats['updated']) / sync_time:.2f} 条/秒")
+    print(f"   📥 抓取 {stats['scraped']}, 新增 {stats['synced']}, 更新 {stats['updated']}, "
+          f"跳过 {stats['skipped']}, 失败 {stats['failed']}")
+    print(f"   🌐 站点请求: 列表 {site_stats['list']}, 详情 {site_stats['detail']}, "
+          f"注入错误 {site_stats['errors']}, 404 {site_stats['not_found']}")
+    print(f"   ☁️ Notion 请求: {notion_stats['requests']} (查询 {notion_stats['query']}, "
+          f"创建 {notion_stats['create']}, 更新 {notion_stats['update']}), "
+          f"429 {notion_stats['rate_limited']}, 注入错误 {notion_stats['errors']}, 数据库页面 {live_pages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="agent_workflow.py 端到端压测（本地假站点 + 假 Notion）")
+    parser.add_argument("--list-pages", type=int, default=20, help="列表页数 (默认 20)")
+    parser.add_argument("--details", type=int, default=400, help="详情页数 (默认 400)")
+    parser.add_argument("--latency", type=float, default=0.05, help="站点平均响应延迟秒数 (默认 0.05)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="站点返回 503 的比例")
+    parser.add_argument("--notion-rate", type=float, default=3.0, help="Notion 每秒允许请求数，0 为不限 (默认 3)")
+    parser.add_argument("--notion-error-rate", type=float, default=0.0, help="Notion 返回 502 的比例")
+    parser.add_argument("--client-rate", type=float,
+                        help="工作流的 NOTION_RATE_LIMIT（高于 --notion-rate 时可观察 429 重试，默认沿用环境变量）")
+    parser.add_argument("--runs", type=int, default=1, help="在同一份数据上连续运行次数 (默认 1)")
+    parser.add_argument("--seed-list", action="store_true", help="跳过浏览器，直接写入列表结果")
+    parser.add_argument("--keep", action="store_true", help="保留临时目录（数据和日志）")
+    args = parser.parse_args()
+
+    site = FakeGongkaoleida(args.list_pages, args.details, args.latency, args.error_rate)
+    notion = FakeNotion(args.notion_rate, args.notion_error_rate)
+    site_server, site_url = serve(site)
+    notion_server, notion_url = serve(notion)
+    workspace = make_workspace()
+
+    print(f"🌐 假公考雷达: {site_url} ({args.list_pages} 个列表页, {args.details} 个详情页, "
+          f"延迟 {args.latency}s, 错误率 {args.error_rate:.0%})")
+    print(f"☁️ 假 Notion: {notion_url}/v1 (限速 {args.notion_rate:g} 次/秒, 错误率 {args.notion_error_rate:.0%})")
+    print(f"📁 工作目录: {workspace}")
+
+    env = {
+        **os.environ,
+        "GONGKAOLEIDA_BASE_URL": site_url,
+        "SOURCES": "gongkaoleida",
+        "NOTION_API_URL": f"{notion_url}/v1",
+        "NOTION_TOKEN": "fake-token",
+        "MAX_PAGES": str(args.list_pages + 2),
+        "MAX_JOBS": str(args.details),
+        "PYTHONUNBUFFERED": "1",
+    }
+    if args.client_rate:
+        env["NOTION_RATE_LIMIT"] = str(args.client_rate)
+
+    try:
+        if args.seed_list:
+            print(f"🌱 写入列表结果: {seed_list(site, site_url, workspace)} 条")
+        for run in range(1, args.runs + 1):
+            before_site, before_notion = dict(site.stats), dict(notion.stats)
+            log_file = workspace / f"run_{run}.log"
+            elapsed, result = run_workflow(workspace, env, log_file)
+            site_stats = {key: site.stats[key] - before_site[key] for key in site.stats}
+            notion_stats = {key: notion.stats[key] - before_notion[key] for key in notion.stats}
+            report(run, elapsed, result, site_stats, notion_stats, notion.live_pages())
+            print(f"   📝 日志: {log_file}")
+    finally:
+        site_server.shutdown()
+        notion_server.shutdown()
+        if not args.keep:
+            shutil.rmtree(workspace, ignore_errors=True)
+            print("\n🧹 已删除临时目录（--keep 保留）")
+
+
+if __name__ == "__main__":
+    main()
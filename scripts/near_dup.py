@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+近似重复公告索引 (MinHash + LSH)
+
+同一公告常在 jshrss.jiangsu.gov.cn 和 gongkaoleida.com 重复发布，或标题略有改动，
+按链接/标题精确去重拦不住。这里对正文（去掉面包屑、发布时间/来源/浏览次数、字号/打印等
+站点固定内容后）取字符 n-gram，计算 MinHash 签名，按 LSH 分段放入桶中：查询只比较同桶的
+候选记录，不随历史记录数线性增长。候选记录同时满足以下条件才视为重复:
+    - 按签名估算的正文 Jaccard 相似度达到 NEAR_DUP_THRESHOLD
+    - 标题的字符二元组 (bigram) Jaccard 相似度达到 NEAR_DUP_TITLE_THRESHOLD：比较前去掉“关于”“的”、
+      年份和批次，“南京市玄武区”“苏州吴中区”等区县前的省市名也去掉，年份挪到标题中间不影响结果
+    - 标题中的年份、批次/轮次（2025年、第二批、第三轮……）和区县（鼓楼区、吴中区……）没有冲突：
+      两个标题都写了同类标记且各不相同时才算冲突，只有一边写了不算。每年、每批、各区县的
+      招聘公告模板几乎一样，但是不同的公告
+正文太短（没有可比较内容）时签名改用标题计算。只有【转】、（转载）等来源标签和标点空白不参与比较。
+
+签名保存在 data/jobs.db 的 near_dup_docs 表中，启动时载入内存建桶；签名规则变化后
+(SIGNATURE_VERSION) 旧签名自动用职位库中已同步的记录重建。
+sync_notion.py / sync_to_notion.py 新建页面成功后写入索引。
+
+data/near_dup_golden.json 记录应合并 (merge) 和不应合并 (distinct) 的公告对，
+修改规则或阈值后用 --golden 检查。
+
+使用方法:
+    python scripts/near_dup.py --rebuild           # 用职位库中已同步的记录重建索引
+    python scripts/near_dup.py --query "标题" [--desc "描述"]
+    python scripts/near_dup.py --golden            # 检查 golden 公告对，有不一致时以非 0 退出
+
+环境变量:
+    NEAR_DUP                 - 设为 0 关闭近似去重
+    NEAR_DUP_THRESHOLD       - 正文相似度阈值 (默认 0.8)
+    NEAR_DUP_TITLE_THRESHOLD - 标题相似度阈值 (默认 0.8)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import unicodedata
+from array import array
+from pathlib import Path
+
+from extractor import CITIES
+from job_store import STORE_FILE, JobStore
+
+DEFAULT_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.8"))
+DEFAULT_TITLE_THRESHOLD = float(os.environ.get("NEAR_DUP_TITLE_THRESHOLD", "0.8"))
+GOLDEN_FILE = Path(__file__).parent.parent / "data" / "near_dup_golden.json"
+
+SIGNATURE_VERSION = 2
+SHINGLE_SIZE = 3
+BODY_CHARS = 1500      # 去掉站点固定内容后的正文长度上限
+MIN_BODY_CHARS = 30    # 正文短于此长度时签名改用标题
+NUM_PERM = 64
+BANDS = 16        # 16 段 x 4 行：相似度 0.8 的记录成为候选的概率 > 99.9%
+ROWS = NUM_PERM // BANDS
+
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20260114)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+                for _ in range(NUM_PERM)]
+
+# 转载来源标签和标点空白不参与比较；年份、批次等括号内容保留
+SOURCE_TAG_RE = re.compile(r"[【\[（(]\s*(?:转|转载|转发|原创|置顶|热|新|最新|推荐|荐)\s*[】\]）)]")
+PUNCT_RE = re.compile(r"[\W_]+")
+
+# 区分不同公告的标题标记：年份、批次（第N批/次/轮/期/届、上下半年、春秋季）、区县
+YEAR_RE = re.compile(r"((?:19|20)\d{2})(?:年度|年)?")
+BATCH_RE = re.compile(r"第[一二三四五六七八九十百\d]+[批次轮期届]|[上下]半年|[春秋]季")
+DISTRICT_RE = re.compile(r"[\u4e00-\u9fff]{2}[区县]")
+# 区县和县级市前的省市名（“南京市玄武区”“苏州吴中区”“江苏省无锡市江阴”），比较前去掉
+PREFECTURES = [city for city, full_name in CITIES.items() if full_name == f"{city}市"]
+COUNTY_CITIES = [city for city, full_name in CITIES.items() if full_name != f"{city}市"]
+PLACE_PREFIX_RE = re.compile(
+    r"江苏省?(?=" + "|".join(PREFECTURES + COUNTY_CITIES) + r")|"
+    r"(?:" + "|".join(PREFECTURES) + r")市?(?=[\u4e00-\u9fff]{1,3}[区县]|" + "|".join(COUNTY_CITIES) + r")"
+)
+# 转载时常被增删、不改变含义的标题用字
+TITLE_FILLER_RE = re.compile(r"关于|的")
+
+# 站点固定内容（面包屑、发布信息、字号/打印/分享等控件、上下篇导航）所在的短行
+BOILERPLATE_RE = re.compile(
+    r"当前位置|您的位置|所在位置|首页\s*[>›»/]|[>›»]\s*正文|"
+    r"(?:发布|更新|发表)(?:时间|日期)\s*[:：]|(?:信息)?来源\s*[:：]|作者\s*[:：]|"
+    r"(?:浏览|阅读|访问|点击)(?:次数|量|数)?\s*[:：]|字[号体]\s*[:：]|[【\[]\s*[大中小]\s*[】\]]|"
+    r"打印(?:本页|此页)?|关闭(?:窗口|本页)|分享到|扫一扫|上一篇|下一篇|返回顶部|收藏本站"
+)
+BOILERPLATE_LINE_CHARS = 80
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS near_dup_docs (
+    key       TEXT PRIMARY KEY,
+    url       TEXT,
+    title     TEXT,
+    signature BLOB
+);
+"""
+
+
+def near_dup_enabled() -> bool:
+    return os.environ.get("NEAR_DUP", "1") != "0"
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return PUNCT_RE.sub("", SOURCE_TAG_RE.sub("", text))
+
+
+def strip_boilerplate(text: str) -> str:
+    """去掉正文中的站点固定内容行（只处理短行，正文段落中提到“来源：”等不受影响）"""
+    lines = unicodedata.normalize("NFKC", text or "").splitlines()
+    return "\n".join(line for line in lines
+                     if not (len(line) <= BOILERPLATE_LINE_CHARS and BOILERPLATE_RE.search(line)))
+
+
+def body_text(desc: str) -> str:
+    return normalize(strip_boilerplate(desc))[:BODY_CHARS]
+
+
+def char_shingles(text: str) -> set:
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def shingles(title: str, desc: str = "") -> set:
+    """正文（去掉站点固定内容）的字符 n-gram；正文太短时用标题"""
+    body = body_text(desc)
+    return char_shingles(body if len(body) >= MIN_BODY_CHARS else normalize(title))
+
+
+def normalize_title(title: str) -> str:
+    """标题归一化：去掉来源标签、标点空白和区县前的省市名"""
+    return PLACE_PREFIX_RE.sub("", normalize(title))
+
+
+def title_markers(title: str) -> dict:
+    """标题中的 {"year": 年份, "batch": 批次, "district": 区县} 标记"""
+    text = normalize_title(title)
+    return {
+        "year": set(YEAR_RE.findall(text)),
+        "batch": set(BATCH_RE.findall(text)),
+        "district": set(DISTRICT_RE.findall(text)),
+    }
+
+
+def markers_conflict(markers_a: dict, markers_b: dict) -> bool:
+    """
+    年份、批次不同或区县完全不同时为冲突；只有一边写了某类标记不算冲突
+
+    区县按“有一个相同就不冲突”判断：标题正文中的“面向社区”等也会被当作区县，不能要求完全相同
+    """
+    for kind in ("year", "batch"):
+        if markers_a[kind] and markers_b[kind] and markers_a[kind] != markers_b[kind]:
+            return True
+    return bool(markers_a["district"] and markers_b["district"]
+                and markers_a["district"].isdisjoint(markers_b["district"]))
+
+
+def title_bigrams(title: str) -> set:
+    """归一化标题去掉“关于”“的”、年份和批次后的字符二元组，与词序无关"""
+    text = normalize_title(title)
+    text = TITLE_FILLER_RE.sub("", BATCH_RE.sub("", YEAR_RE.sub("", text)))
+    if len(text) <= 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def title_similarity(title_a: str, title_b: str) -> float:
+    """标题字符二元组的 Jaccard 相似度（精确值）"""
+    a, b = title_bigrams(title_a), title_bigrams(title_b)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def signature(title: str, desc: str = "") -> tuple:
+    """MinHash 签名；没有可比较内容时返回空 tuple"""
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+              for s in shingles(title, desc)]
+    if not hashes:
+        return ()
+    return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS)
+
+
+def similarity(sig_a: tuple, sig_b: tuple) -> float:
+    """按签名估算 Jaccard 相似度"""
+    if not sig_a or not sig_b:
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def compare(title_a: str, sig_a: tuple, title_b: str, sig_b: tuple) -> dict:
+    """两条记录的 {"similarity": 正文, "title_similarity": 标题, "markers_conflict": 年份/批次/区县冲突}"""
+    return {
+        "similarity": similarity(sig_a, sig_b),
+        "title_similarity": title_similarity(title_a, title_b),
+        "markers_conflict": markers_conflict(title_markers(title_a), title_markers(title_b)),
+    }
+
+
+def is_duplicate(scores: dict, threshold: float = None, title_threshold: float = None) -> bool:
+    threshold = DEFAULT_THRESHOLD if threshold is None else threshold
+    title_threshold = DEFAULT_TITLE_THRESHOLD if title_threshold is None else title_threshold
+    return (not scores["markers_conflict"] and scores["similarity"] >= threshold
+            and scores["title_similarity"] >= title_threshold)
+
+
+def job_key(job: dict) -> str:
+    """索引键：原文链接，没有链接时用标题"""
+    return job.get("原文链接") or f"title:{job.get('职位名称', '')}"
+
+
+class NearDupIndex:
+    """近似重复索引，LSH 桶在内存中以 dict 提供查询"""
+
+    def __init__(self, path: Path = STORE_FILE, threshold: float = None, title_threshold: float = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = DEFAULT_THRESHOLD if threshold is None else threshold
+        self.title_threshold = DEFAULT_TITLE_THRESHOLD if title_threshold is None else title_threshold
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+        self.docs = {}  # key -> (url, title, signature)
+        self.buckets = [{} for _ in range(BANDS)]  # 每段: 签名片段 -> [key]
+        if self._stale():
+            self.rebuild()
+            return
+        for key, url, title, blob in self.conn.execute(
+                "SELECT key, url, title, signature FROM near_dup_docs"):
+            self._insert(key, url, title, tuple(array("Q", blob)))
+
+    def _stale(self) -> bool:
+        """签名规则变化后，旧版本的签名需要重建（版本号记录在 near_dup_docs 的 version 列）"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(near_dup_docs)")]
+        if "version" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE near_dup_docs ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        return self.conn.execute("SELECT 1 FROM near_dup_docs WHERE version != ? LIMIT 1",
+                                 (SIGNATURE_VERSION,)).fetchone() is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _insert(self, key: str, url: str, title: str, sig: tuple):
+        self.docs[key] = (url, title, sig)
+        for band in range(BANDS):
+            chunk = sig[band * ROWS:(band + 1) * ROWS]
+            self.buckets[band].setdefault(chunk, []).append(key)
+
+    def _remove(self, key: str):
+        url, title, sig = self.docs.pop(key)
+        for band in range(BANDS):
+            chunk = sig[band * ROWS:(band + 1) * ROWS]
+            keys = self.buckets[band][chunk]
+            keys.remove(key)
+            if not keys:
+                del self.buckets[band][chunk]
+
+    def query(self, job: dict, sig: tuple = None) -> dict:
+        """
+        查找与 job 最相似且达到阈值的已有记录（忽略同一键），没有时返回 None
+
+        返回 {"key", "url", "title", "similarity"}
+        """
+        sig = sig or signature(job.get("职位名称", ""), job.get("职位描述", ""))
+        if not sig:
+            return None
+        own_key = job_key(job)
+        candidates = set()
+        for band in range(BANDS):
+            candidates.update(self.buckets[band].get(sig[band * ROWS:(band + 1) * ROWS], ()))
+        candidates.discard(own_key)
+
+        best = None
+        for key in candidates:
+            url, title, other = self.docs[key]
+            scores = compare(job.get("职位名称", ""), sig, title, other)
+            if (is_duplicate(scores, self.threshold, self.title_threshold)
+                    and (best is None or scores["similarity"] > best["similarity"])):
+                best = {"key": key, "url": url, "title": title, **scores}
+        return best
+
+    def add(self, job: dict, sig: tuple = None, save: bool = True):
+        """加入索引；save=False 只加到内存（同一批次内去重，写入成功后再 save）"""
+        sig = sig or signature(job.get("职位名称", ""), job.get("职位描述", ""))
+        if not sig:
+            return
+        key = job_key(job)
+        if key in self.docs:
+            self._remove(key)
+        self._insert(key, job.get("原文链接") or None, job.get("职位名称", ""), sig)
+        if save:
+            self.save(key)
+
+    def save(self, key: str):
+        """把内存中的记录写入数据库"""
+        if key not in self.docs:
+            return
+        url, title, sig = self.docs[key]
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO near_dup_docs (key, url, title, signature, version) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, url, title, array("Q", sig).tobytes(), SIGNATURE_VERSION),
+            )
+
+    def discard(self, key: str):
+        """从内存中移除未写入成功的记录（数据库中已有的保留）"""
+        if key in self.docs:
+            self._remove(key)
+
+    def delete(self, key: str):
+        """从内存和数据库中删除记录（对应的 Notion 页面已归档）"""
+        self.discard(key)
+        with self.conn:
+            self.conn.execute("DELETE FROM near_dup_docs WHERE key = ?", (key,))
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM near_dup_docs")
+        self.docs.clear()
+        self.buckets = [{} for _ in range(BANDS)]
+
+    def rebuild(self) -> int:
+        """清空后用职位库中已同步的记录重建，返回记录数"""
+        self.clear()
+        with JobStore(self.path) as store:
+            for row in store.iter_stage("synced"):
+                if row["processed"]:
+                    self.add(row["processed"])
+        return len(self.docs)
+
+
+def format_match(match: dict) -> str:
+    title = (match["title"] or "")[:30]
+    return (f"≈ {title} (正文相似度 {match['similarity']:.2f}, 标题 {match['title_similarity']:.2f}, "
+            f"{match['url'] or '无链接'})")
+
+
+def check_golden(path: Path = GOLDEN_FILE, threshold: float = None, title_threshold: float = None) -> int:
+    """检查 golden 公告对，打印每一对的判断，返回不一致的数量"""
+    with open(path, "r", encoding="utf-8") as f:
+        pairs = json.load(f)["pairs"]
+    failures = 0
+    for pair in pairs:
+        a, b = pair["a"], pair["b"]
+        scores = compare(a["title"], signature(a["title"], a.get("desc", "")),
+                         b["title"], signature(b["title"], b.get("desc", "")))
+        verdict = "merge" if is_duplicate(scores, threshold, title_threshold) else "distinct"
+        ok = verdict == pair["expect"]
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {pair['id']}: 期望 {pair['expect']}, 判断 {verdict} "
+              f"(正文 {scores['similarity']:.2f}, 标题 {scores['title_similarity']:.2f}, "
+              f"标记{'冲突' if scores['markers_conflict'] else '无冲突'})")
+    print(f"📊 {len(pairs) - failures}/{len(pairs)} 对符合预期")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="近似重复公告索引")
+    parser.add_argument("--rebuild", action="store_true", help="用职位库中已同步的记录重建索引")
+    parser.add_argument("--query", help="查询与该标题近似的已有记录")
+    parser.add_argument("--desc", default="", help="查询时附带的描述")
+    parser.add_argument("--threshold", type=float, help=f"正文相似度阈值 (默认 {DEFAULT_THRESHOLD})")
+    parser.add_argument("--title-threshold", type=float, help=f"标题相似度阈值 (默认 {DEFAULT_TITLE_THRESHOLD})")
+    parser.add_argument("--golden", action="store_true", help="检查 data/near_dup_golden.json 中的公告对")
+    args = parser.parse_args()
+
+    if args.golden:
+        sys.exit(1 if check_golden(threshold=args.threshold, title_threshold=args.title_threshold) else 0)
+
+    with NearDupIndex(threshold=args.threshold, title_threshold=args.title_threshold) as index:
+        if args.rebuild:
+            print(f"✅ 索引已重建: {index.rebuild()} 条")
+
+        if args.query:
+            match = index.query({"职位名称": args.query, "职位描述": args.desc})
+            if match:
+                print(f"🔁 {format_match(match)}")
+            else:
+                print(f"✅ 未发现近似记录 (阈值 {index.threshold:g}, 索引 {len(index)} 条)")
+        elif not args.rebuild:
+            print(f"📊 索引记录: {len(index)} 条")
+
+
+if __name__ == "__main__":
+    main()
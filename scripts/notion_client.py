@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Notion API 客户端
+
+连接池 Session + 令牌桶限速（Notion 平均约 3 次/秒），
+429 按 Retry-After 等待重试，5xx 和网络错误按指数退避重试。
+只有幂等请求（GET/PATCH/DELETE、查询和搜索）在 5xx 和网络错误后重试；创建页面等其他 POST
+只在连接没建立起来（请求肯定没发出去）时重试，避免服务端已经创建成功而重复创建。
+线程安全，可在 run_concurrent 的线程池中并发调用。
+
+环境变量:
+    NOTION_API_URL     - API 地址 (默认 https://api.notion.com/v1，测试时可指向本地假服务)
+    NOTION_RATE_LIMIT  - 每秒平均请求数 (默认 3)
+    NOTION_CONCURRENCY - 并发请求数 (默认 4)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+NOTION_API_URL = os.environ.get("NOTION_API_URL", "https://api.notion.com/v1")
+NOTION_VERSION = "2022-06-28"
+NOTION_RATE_LIMIT = float(os.environ.get("NOTION_RATE_LIMIT", "3"))
+NOTION_CONCURRENCY = int(os.environ.get("NOTION_CONCURRENCY", "4"))
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+IDEMPOTENT_METHODS = {"GET", "PATCH", "DELETE"}
+
+
+class TokenBucket:
+    """令牌桶限速器：平均 rate 次/秒，允许 burst 次突发"""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """阻塞直到拿到一个令牌（暂停期间所有线程一起等待到暂停结束）"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        收到 429 时暂停到 now + seconds，并清空令牌（暂停结束后从零开始积累）
+
+        多个线程在同一个限速窗口内各自收到 429 时只延长到最晚的截止时间，不会叠加等待
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0)
+            self.updated = max(self.updated, self.paused_until)
+
+
+class NotionClient:
+    """带限速和重试的 Notion API 客户端"""
+
+    def __init__(self, token: str, base_url: str = None, rate: float = None,
+                 concurrency: int = None):
+        self.base_url = (base_url or NOTION_API_URL).rstrip("/")
+        self.concurrency = concurrency or NOTION_CONCURRENCY
+        self.limiter = TokenBucket(rate or NOTION_RATE_LIMIT)
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0}
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION
+        })
+
+    def request(self, method: str, path: str, json: dict = None) -> requests.Response:
+        """
+        发送请求，自动限速和重试；重试耗尽后返回最后一次响应或抛出网络异常
+
+        429 总是重试（请求被拒绝、没有执行）；非幂等请求的 5xx 直接返回，网络错误只在请求没发出去时重试
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        idempotent = _idempotent(method, path)
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire()
+            self._count("requests")
+            try:
+                resp = self.session.request(method, url, json=json, timeout=30)
+            except requests.RequestException as e:
+                if attempt == MAX_RETRIES or not (idempotent or _not_sent(e)):
+                    raise
+                self._backoff(attempt)
+                continue
+
+            if resp.status_code == 429 and attempt < MAX_RETRIES:
+                self._count("rate_limited")
+                self._count("retries")
+                # 由令牌桶统一等待，其他线程也会一起暂停
+                self.limiter.pause(_parse_retry_after(resp.headers.get("Retry-After")))
+                continue
+            if resp.status_code >= 500 and idempotent and attempt < MAX_RETRIES:
+                self._backoff(attempt)
+                continue
+            return resp
+        return resp
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt: int):
+        self._count("retries")
+        time.sleep(min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    def post(self, path: str, json: dict = None) -> requests.Response:
+        return self.request("POST", path, json)
+
+    def patch(self, path: str, json: dict = None) -> requests.Response:
+        return self.request("PATCH", path, json)
+
+    def close(self):
+        self.session.close()
+
+
+def _idempotent(method: str, path: str) -> bool:
+    """重复执行结果相同的请求：GET/PATCH/DELETE，以及只读的 POST（数据库查询、搜索）"""
+    if method.upper() in IDEMPOTENT_METHODS:
+        return True
+    path = path.strip("/")
+    return path == "search" or path.endswith("/query")
+
+
+def _not_sent(exc: requests.RequestException) -> bool:
+    """连接没建立起来（DNS 失败、连接被拒绝或超时）的网络错误，请求肯定没有发到服务端"""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def _parse_retry_after(value) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return BACKOFF_BASE
+
+
+def run_concurrent(func, items: list, concurrency: int = None) -> list:
+    """在线程池中并发执行 func(item)，结果顺序与 items 一致"""
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=concurrency or NOTION_CONCURRENCY) as executor:
+        return list(executor.map(func, items))
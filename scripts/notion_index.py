@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Notion 去重索引
+
+在 data/jobs.db 中缓存 Notion 数据库已有页面的 (page_id, 原文链接, 标题, 标题哈希, last_edited_time)，
+每次运行只按 last_edited_time 增量拉取上次之后编辑过的页面，不再整库翻页。
+增量查询拿不到被归档/删除的页面，需要时用 --rebuild-index 全量重建。
+
+同时记录每个页面最近一次写入的属性哈希 (content_hash / property_hashes)，
+sync_notion.py 据此只 PATCH 内容有变化的属性。
+
+使用方法:
+    python scripts/notion_index.py [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+from job_store import STORE_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notion_pages (
+    page_id          TEXT PRIMARY KEY,
+    url              TEXT,
+    title            TEXT,
+    title_hash       TEXT,
+    last_edited_time TEXT,
+    content_hash     TEXT,
+    property_hashes  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_notion_pages_url ON notion_pages (url);
+CREATE TABLE IF NOT EXISTS notion_index_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def title_hash(title: str) -> str:
+    """标题哈希（去除首尾空白后计算）"""
+    return hashlib.sha1((title or "").strip().encode("utf-8")).hexdigest()
+
+
+def property_hashes(properties: dict) -> dict:
+    """每个 Notion 属性值的哈希 {属性名: sha1}"""
+    return {
+        name: hashlib.sha1(json.dumps(value, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+        for name, value in properties.items()
+    }
+
+
+def content_hash(prop_hashes: dict) -> str:
+    """整条记录的哈希（由各属性哈希按名称排序后计算）"""
+    joined = "\n".join(f"{name}={h}" for name, h in sorted(prop_hashes.items()))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+def page_title(page: dict) -> str:
+    title_prop = page.get("properties", {}).get("职位名称", {})
+    return "".join(t.get("plain_text", "") for t in title_prop.get("title", []))
+
+
+def page_url(page: dict) -> str:
+    return page.get("properties", {}).get("原文链接", {}).get("url") or ""
+
+
+class NotionIndex:
+    """本地 Notion 页面索引，内存中以 dict/set 提供 O(1) 查询"""
+
+    def __init__(self, path: Path = STORE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.urls = {}      # url -> page_id
+        self.titles = set()  # title_hash
+        for page_id, url, t_hash in self.conn.execute(
+                "SELECT page_id, url, title_hash FROM notion_pages"):
+            if url:
+                self.urls[url] = page_id
+            if t_hash:
+                self.titles.add(t_hash)
+
+    def _migrate(self):
+        """旧版索引表补充标题和哈希列"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(notion_pages)")}
+        with self.conn:
+            for column in ("title", "content_hash", "property_hashes"):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE notion_pages ADD COLUMN {column} TEXT")
+            if "title" not in columns:
+                # 旧索引没有记录标题，下次刷新全量拉取一次补上
+                self.conn.execute("DELETE FROM notion_index_meta WHERE key = 'cursor'")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def has_url(self, url: str) -> bool:
+        return bool(url) and url in self.urls
+
+    def has_title(self, title: str) -> bool:
+        return bool(title) and title_hash(title) in self.titles
+
+    def page_id(self, url: str) -> str:
+        return self.urls.get(url)
+
+    def pages(self, url: str) -> list:
+        """原文链接对应的全部页面 [{"page_id", "url", "title"}]（重复同步时同一链接可能有多个页面）"""
+        if not url:
+            return []
+        rows = self.conn.execute("SELECT page_id, title FROM notion_pages WHERE url = ?", (url,)).fetchall()
+        return [{"page_id": page_id, "url": url, "title": title or ""} for page_id, title in rows]
+
+    def get_hashes(self, page_id: str) -> tuple:
+        """返回 (content_hash, {属性名: 哈希})，未记录时返回 (None, {})"""
+        row = self.conn.execute(
+            "SELECT content_hash, property_hashes FROM notion_pages WHERE page_id = ?",
+            (page_id,)).fetchone()
+        if not row or not row[0]:
+            return None, {}
+        return row[0], json.loads(row[1] or "{}")
+
+    def set_hashes(self, page_id: str, prop_hashes: dict):
+        """记录页面当前写入的属性哈希"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE notion_pages SET content_hash = ?, property_hashes = ? WHERE page_id = ?",
+                (content_hash(prop_hashes), json.dumps(prop_hashes, sort_keys=True), page_id),
+            )
+
+    def get_meta(self, key: str) -> str:
+        row = self.conn.execute("SELECT value FROM notion_index_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO notion_index_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def add(self, page_id: str, url: str, title: str, last_edited_time: str = None):
+        """记录一个页面（新建页面后立即调用，无需等下次刷新）"""
+        t_hash = title_hash(title) if title else None
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO notion_pages (page_id, url, title, title_hash, last_edited_time) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(page_id) DO UPDATE SET url = excluded.url, "
+                "title = excluded.title, title_hash = excluded.title_hash, "
+                "last_edited_time = COALESCE(excluded.last_edited_time, last_edited_time)",
+                (page_id, url or None, title or None, t_hash, last_edited_time),
+            )
+        if url:
+            self.urls[url] = page_id
+        if t_hash:
+            self.titles.add(t_hash)
+
+    def remove(self, page_id: str):
+        """删除一个页面（归档后调用）"""
+        row = self.conn.execute("SELECT url, title_hash FROM notion_pages WHERE page_id = ?",
+                                (page_id,)).fetchone()
+        if not row:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM notion_pages WHERE page_id = ?", (page_id,))
+        url, t_hash = row
+        if url and self.urls.get(url) == page_id:
+            # 同一链接的其他页面（重复同步产生的）仍在索引中
+            other = self.conn.execute("SELECT page_id FROM notion_pages WHERE url = ? LIMIT 1", (url,)).fetchone()
+            if other:
+                self.urls[url] = other[0]
+            else:
+                del self.urls[url]
+        # 其他页面可能有相同标题
+        if t_hash and not self.conn.execute(
+                "SELECT 1 FROM notion_pages WHERE title_hash = ? LIMIT 1", (t_hash,)).fetchone():
+            self.titles.discard(t_hash)
+
+    def add_pages(self, pages: list):
+        """写入 Notion 查询结果中的页面"""
+        for page in pages:
+            self.add(page["id"], page_url(page), page_title(page), page.get("last_edited_time"))
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM notion_pages")
+            self.conn.execute("DELETE FROM notion_index_meta WHERE key = 'cursor'")
+        self.urls.clear()
+        self.titles.clear()
+
+    def refresh(self, client, database_id: str, rebuild: bool = False) -> int:
+        """
+        从 Notion 刷新索引，返回拉取的页面数
+
+        默认只拉取 last_edited_time >= 上次游标的页面；首次运行、
+        切换数据库或 rebuild=True 时全量重建。
+        """
+        if rebuild or self.get_meta("database_id") != database_id:
+            self.clear()
+            self.set_meta("database_id", database_id)
+
+        cursor = self.get_meta("cursor")
+        query = {
+            "page_size": 100,
+            "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+        }
+        if cursor:
+            query["filter"] = {"timestamp": "last_edited_time",
+                               "last_edited_time": {"on_or_after": cursor}}
+
+        fetched = 0
+        latest = cursor
+        has_more = True
+        start_cursor = None
+        while has_more:
+            data = dict(query)
+            if start_cursor:
+                data["start_cursor"] = start_cursor
+            resp = client.post(f"databases/{database_id}/query", data)
+            if resp.status_code != 200:
+                print(f"⚠️ 刷新索引失败: {resp.status_code}")
+                break
+            result = resp.json()
+            pages = result.get("results", [])
+            self.add_pages(pages)
+            fetched += len(pages)
+            for page in pages:
+                edited = page.get("last_edited_time")
+                if edited and (not latest or edited > latest):
+                    latest = edited
+            has_more = result.get("has_more", False)
+            start_cursor = result.get("next_cursor")
+
+        if latest and latest != cursor:
+            self.set_meta("cursor", latest)
+        return fetched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="刷新 Notion 去重索引")
+    parser.add_argument("--rebuild", action="store_true", help="全量重建索引")
+    args = parser.parse_args()
+
+    token = os.environ.get("NOTION_TOKEN")
+    if not token:
+        print("❌ 未设置 NOTION_TOKEN 环境变量")
+        sys.exit(1)
+
+    from sync_notion import NotionSync
+
+    sync = NotionSync(token)
+    if not sync.find_database():
+        sys.exit(1)
+
+    fetched = sync.index.refresh(sync.client, sync.database_id, rebuild=args.rebuild)
+    print(f"✅ 索引已刷新: 拉取 {fetched} 个页面, 共 {len(sync.index)} 个链接")
+
+
+if __name__ == "__main__":
+    main()
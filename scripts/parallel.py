@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+多进程分块处理
+
+把记录按块分给进程池，按输入顺序逐条返回 (记录, 结果)；同时在途的块数有上限，
+输入可以是数据库游标等流式迭代器，内存占用与总记录数无关。
+
+func 必须是模块顶层函数（进程池需要 pickle）。workers <= 1 时在当前进程中直接执行。
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _run_chunk(func, chunk: list) -> list:
+    return [func(item) for item in chunk]
+
+
+def _chunks(items, size: int):
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap_ordered(func, items, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """对 items 逐条执行 func，按输入顺序返回 (item, func(item))"""
+    if workers <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in _chunks(items, chunk_size):
+            pending.append((chunk, executor.submit(_run_chunk, func, chunk)))
+            # 最多 2 倍进程数的块在途，先完成的块也要等前面的块返回后再输出
+            if len(pending) >= workers * 2:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+
+
+class Throughput:
+    """记录处理条数和耗时，输出每秒处理条数"""
+
+    def __init__(self):
+        self.count = 0
+        self.started = time.perf_counter()
+
+    def add(self, n: int = 1):
+        self.count += n
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        elapsed = self.elapsed
+        rate = self.count / elapsed if elapsed > 0 else 0
+        return f"{self.count} 条, {elapsed:.1f}s, {rate:.0f} 条/秒"
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+解析附件中的岗位表（.xlsx/.xls/.pdf），每个岗位一条记录
+
+公告正文里的招聘人数、学历往往只是笼统描述，真实的岗位信息在附件岗位表中。
+本阶段读取 attachments.py 下载的附件，逐行流式解析（内存占用与表格行数无关）:
+    - .xlsx: openpyxl 只读模式逐行读取
+    - .xls:  xlrd 按需加载，逐个工作表读取后卸载
+    - .pdf:  pdfplumber 逐页提取表格，表头跨页沿用
+在每个工作表（PDF 为整个文件）前若干行中找表头，按列名别名对应到
+招聘单位 / 岗位名称 / 岗位代码 / 招聘人数 / 学历要求 / 专业要求 / 其他条件，
+写入 data/jobs.db 的 positions 表，每行关联公告原文链接。
+附件内容不变（SHA-256 相同）时不重复解析。
+
+使用方法:
+    python scripts/position_table.py [--reparse]
+    python scripts/position_table.py --file data/attachments/xx/xxxx.xlsx   # 解析单个文件并输出 JSON
+    python scripts/position_table.py --show "https://公告链接"              # 查看公告的岗位
+
+依赖: pip install openpyxl xlrd pdfplumber（缺少的格式跳过）
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+from attachments import AttachmentStore
+from job_store import STORE_FILE, JobStore
+
+HEADER_SCAN_ROWS = 15   # 在每个表格前多少行中找表头
+BATCH_SIZE = 500        # 每次写入的行数
+
+# 字段 -> 表头别名，按优先级排列；表头单元格去掉空白后包含别名即匹配。
+# 已匹配的列不再参与后面字段的匹配，所以岗位代码排在别名更宽泛的岗位名称之前
+FIELD_ALIASES = {
+    "招聘单位": ["招聘单位", "用人单位", "单位名称", "招录机关", "招考单位", "主管部门"],
+    "岗位代码": ["岗位代码", "职位代码", "岗位编号", "职位编号", "岗位序号"],
+    "岗位名称": ["岗位名称", "职位名称", "招聘岗位", "招考职位", "岗位"],
+    "招聘人数": ["招聘人数", "招录人数", "招考人数", "计划数", "人数"],
+    "学历要求": ["学历要求", "学历"],
+    "专业要求": ["专业要求", "专业名称", "专业"],
+    "其他条件": ["其他条件", "其它条件", "资格条件", "备注"],
+}
+# 至少命中这些字段之一才认为是岗位表表头
+KEY_FIELDS = ("岗位名称", "岗位代码", "招聘人数")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    job_url        TEXT NOT NULL,
+    attachment_url TEXT NOT NULL,
+    sheet          TEXT NOT NULL,
+    row_no         INTEGER NOT NULL,
+    employer       TEXT,
+    position       TEXT,
+    code           TEXT,
+    count          INTEGER,
+    education      TEXT,
+    major          TEXT,
+    row_json       TEXT,
+    PRIMARY KEY (job_url, attachment_url, sheet, row_no)
+);
+CREATE INDEX IF NOT EXISTS idx_positions_job ON positions (job_url);
+CREATE TABLE IF NOT EXISTS position_files (
+    job_url        TEXT NOT NULL,
+    attachment_url TEXT NOT NULL,
+    sha256         TEXT,
+    rows           INTEGER,
+    parsed_at      TEXT,
+    PRIMARY KEY (job_url, attachment_url)
+);
+"""
+
+SPACE_RE = re.compile(r'\s+')
+LINE_BREAK_RE = re.compile(r'\s*\n\s*')
+COUNT_RE = re.compile(r'\d+')
+
+
+def clean_cell(value) -> str:
+    """单元格文本；单元格内换行（PDF 自动折行、表格中的手动换行）直接拼接"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return LINE_BREAK_RE.sub("", str(value).strip())
+
+
+def map_header(cells: list) -> dict:
+    """表头行 -> {字段: 列号}，每个字段取优先级最高的别名所在的第一列"""
+    names = [SPACE_RE.sub("", cell) for cell in cells]
+    mapping = {}
+    used = set()
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            col = next((i for i, name in enumerate(names) if alias in name and i not in used), None)
+            if col is not None:
+                mapping[field] = col
+                used.add(col)
+                break
+    return mapping
+
+
+def parse_count(text: str):
+    match = COUNT_RE.search(text or "")
+    return int(match.group()) if match else None
+
+
+class TableParser:
+    """
+    逐行接收一个表格的单元格，找到表头后把后续行转换为岗位记录
+
+    表头之前的标题行、表头重复行（PDF 每页重复的表头）和没有岗位名称/代码/人数的行被忽略。
+    两行表头（如合并单元格 “招聘条件” 下分 学历 / 专业 两列）按列合并，下一行的列名优先；
+    合并后原来的两行表头都保留在 header_rows 中，每页重复的两行表头都能识别。
+    """
+
+    def __init__(self):
+        self.header = None
+        self.header_rows = []
+        self.mapping = None
+        self.scanned = 0
+        self.subheader_checked = False
+
+    def feed(self, values) -> dict:
+        cells = [clean_cell(v) for v in values]
+        if not any(cells):
+            return None
+
+        if self.mapping is None:
+            self.scanned += 1
+            if self.scanned > HEADER_SCAN_ROWS:
+                return None
+            mapping = map_header(cells)
+            if any(field in mapping for field in KEY_FIELDS) and len(mapping) >= 2:
+                self.header, self.mapping = cells, mapping
+                self.header_rows.append(cells)
+            return None
+
+        if cells in self.header_rows:
+            return None
+
+        if not self.subheader_checked:
+            self.subheader_checked = True
+            if self.merge_subheader(cells):
+                return None
+
+        def get(field):
+            col = self.mapping.get(field)
+            return cells[col] if col is not None and col < len(cells) else ""
+
+        if not (get("岗位名称") or get("岗位代码") or get("招聘人数")):
+            return None
+        # 表头中的其余列原样保留（如 年龄、考试类别）
+        row = {name: cell for name, cell in zip(self.header, cells) if name and cell}
+        return {
+            "招聘单位": get("招聘单位"),
+            "岗位名称": get("岗位名称"),
+            "岗位代码": get("岗位代码"),
+            "招聘人数": parse_count(get("招聘人数")),
+            "学历要求": get("学历要求"),
+            "专业要求": get("专业要求"),
+            "其他条件": get("其他条件"),
+            "原始数据": row,
+        }
+
+    def merge_subheader(self, cells: list) -> bool:
+        """表头下一行是否为第二行表头（至少两列是列名、没有纯数字单元格），是则合并"""
+        if sum(1 for cell in cells if map_header([cell])) < 2 or any(cell.isdigit() for cell in cells):
+            return False
+        width = max(len(self.header), len(cells))
+        header = self.header + [""] * (width - len(self.header))
+        merged = [sub or main for main, sub in zip(header, cells + [""] * (width - len(cells)))]
+        self.header, self.mapping = merged, map_header(merged)
+        self.header_rows.append(cells)
+        return True
+
+
+def iter_xlsx(path: Path):
+    """逐行返回 (工作表名, 行号, 单元格)，只读模式下不把整个工作簿读入内存"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(str(path), read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            for row_no, values in enumerate(ws.iter_rows(values_only=True), 1):
+                yield ws.title, row_no, values
+    finally:
+        wb.close()
+
+
+def iter_xls(path: Path):
+    """逐行返回 (工作表名, 行号, 单元格)，一次只加载一个工作表"""
+    import xlrd
+
+    book = xlrd.open_workbook(str(path), on_demand=True)
+    try:
+        for index in range(book.nsheets):
+            sheet = book.sheet_by_index(index)
+            for row_no in range(sheet.nrows):
+                yield sheet.name, row_no + 1, sheet.row_values(row_no)
+            book.unload_sheet(index)
+    finally:
+        book.release_resources()
+
+
+def iter_pdf(path: Path):
+    """逐行返回 ("pdf", 行号, 单元格)，逐页提取表格并释放页面缓存；跨页表格视为同一个表"""
+    import pdfplumber
+
+    row_no = 0
+    with pdfplumber.open(str(path)) as pdf:
+        for page in pdf.pages:
+            for table in page.extract_tables():
+                for values in table:
+                    row_no += 1
+                    yield "pdf", row_no, values
+            page.close()
+
+
+READERS = {".xlsx": iter_xlsx, ".xls": iter_xls, ".pdf": iter_pdf}
+
+
+def parse_file(path: Path):
+    """逐条返回岗位记录 (工作表名, 行号, 记录)；每个工作表单独找表头，不支持的格式不返回任何记录"""
+    reader = READERS.get(path.suffix.lower())
+    if not reader:
+        return
+    parser = None
+    current_sheet = None
+    for sheet, row_no, values in reader(path):
+        if sheet != current_sheet:
+            parser = TableParser()
+            current_sheet = sheet
+        record = parser.feed(values)
+        if record:
+            yield sheet, row_no, record
+
+
+def missing_readers() -> list:
+    """缺少解析库的附件格式"""
+    missing = []
+    for ext, module in ((".xlsx", "openpyxl"), (".xls", "xlrd"), (".pdf", "pdfplumber")):
+        try:
+            __import__(module)
+        except ImportError:
+            missing.append(ext)
+    return missing
+
+
+class PositionStore:
+    """岗位记录（与职位库共用 data/jobs.db）"""
+
+    def __init__(self, path: Path = STORE_FILE):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def parsed_sha(self, job_url: str, attachment_url: str) -> str:
+        row = self.conn.execute(
+            "SELECT sha256 FROM position_files WHERE job_url = ? AND attachment_url = ?",
+            (job_url, attachment_url)).fetchone()
+        return row["sha256"] if row else None
+
+    def replace(self, targets: list, sha256: str, records) -> int:
+        """
+        用 records 替换 targets [(job_url, attachment_url)] 的岗位记录，返回记录数
+
+        删除和全部写入在同一个事务中（按批 executemany，内存占用与行数无关），
+        解析中途出错时回滚，保留原有的岗位记录。
+        """
+        count = 0
+        batch = []
+
+        def flush():
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO positions (job_url, attachment_url, sheet, row_no, employer, "
+                "position, code, count, education, major, row_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch)
+            batch.clear()
+
+        with self.conn:
+            for job_url, attachment_url in targets:
+                self.conn.execute("DELETE FROM positions WHERE job_url = ? AND attachment_url = ?",
+                                  (job_url, attachment_url))
+
+            for sheet, row_no, record in records:
+                count += 1
+                row_json = json.dumps(record["原始数据"], ensure_ascii=False)
+                for job_url, attachment_url in targets:
+                    batch.append((job_url, attachment_url, sheet, row_no, record["招聘单位"], record["岗位名称"],
+                                  record["岗位代码"], record["招聘人数"], record["学历要求"],
+                                  record["专业要求"], row_json))
+                if len(batch) >= BATCH_SIZE:
+                    flush()
+            if batch:
+                flush()
+
+            parsed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO position_files (job_url, attachment_url, sha256, rows, parsed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(job_url, attachment_url, sha256, count, parsed_at) for job_url, attachment_url in targets])
+        return count
+
+    def for_job(self, job_url: str) -> list:
+        rows = self.conn.execute(
+            "SELECT * FROM positions WHERE job_url = ? ORDER BY attachment_url, sheet, row_no",
+            (job_url,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def pending_files(reparse: bool = False) -> dict:
+    """
+    待解析的附件文件 {sha256: {"path", "name", "targets": [(job_url, attachment_url)]}}
+
+    同一文件被多个公告引用时只解析一次；已按当前内容解析过的跳过（reparse=True 时全部重新解析）。
+    """
+    files = {}
+    with JobStore() as jobs, AttachmentStore() as attachments, PositionStore() as positions:
+        downloaded = {row[0]: (row[1], row[2]) for row in attachments.conn.execute(
+            "SELECT url, sha256, ext FROM attachments WHERE sha256 IS NOT NULL")}
+        for row in jobs.iter_stage(["detail", "processed", "synced"]):
+            for item in row["detail"].get("attachments", []):
+                if item["url"] not in downloaded:
+                    continue
+                sha256, ext = downloaded[item["url"]]
+                if ext not in READERS:
+                    continue
+                if not reparse and positions.parsed_sha(row["url"], item["url"]) == sha256:
+                    continue
+                entry = files.setdefault(sha256, {
+                    "path": attachments.file_path(sha256, ext),
+                    "name": item.get("name", ""),
+                    "targets": [],
+                })
+                entry["targets"].append((row["url"], item["url"]))
+    return files
+
+
+def run_positions(reparse: bool = False) -> dict:
+    """
+    解析已下载附件中的岗位表
+
+    返回 {"files", "parsed", "positions", "failed", "skipped"}
+    """
+    stats = {"files": 0, "parsed": 0, "positions": 0, "failed": 0, "skipped": 0}
+    files = pending_files(reparse)
+    stats["files"] = len(files)
+    print(f"📑 待解析附件: {len(files)} 个")
+    if not files:
+        return stats
+
+    missing = missing_readers()
+    if missing:
+        print(f"⚠️ 缺少解析库，跳过 {', '.join(missing)} 附件 (pip install openpyxl xlrd pdfplumber)")
+
+    start = time.perf_counter()
+    with PositionStore() as store:
+        for i, (sha256, entry) in enumerate(files.items(), 1):
+            path = entry["path"]
+            if path.suffix.lower() in missing or not path.exists():
+                stats["skipped"] += 1
+                continue
+            try:
+                count = store.replace(entry["targets"], sha256, parse_file(path))
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"   [{i}/{len(files)}] ❌ {entry['name'][:40]}: {e}")
+                continue
+            stats["parsed"] += 1
+            stats["positions"] += count
+            print(f"   [{i}/{len(files)}] ✅ {entry['name'][:40]}: {count} 个岗位")
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 解析 {stats['parsed']} 个附件, {stats['positions']} 个岗位, "
+          f"失败 {stats['failed']}, 跳过 {stats['skipped']} ({elapsed:.1f}s)")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析附件中的岗位表")
+    parser.add_argument("--reparse", action="store_true", help="重新解析所有附件")
+    parser.add_argument("--file", help="解析单个文件，按行输出 JSON（不写入数据库）")
+    parser.add_argument("--show", metavar="URL", help="查看公告的岗位记录")
+    args = parser.parse_args()
+
+    if args.file:
+        for sheet, row_no, record in parse_file(Path(args.file)):
+            print(json.dumps({"sheet": sheet, "row": row_no, **record}, ensure_ascii=False))
+        return
+
+    if args.show:
+        with PositionStore() as store:
+            rows = store.for_job(args.show)
+        print(f"📋 {len(rows)} 个岗位")
+        for row in rows:
+            print(f"   {row['code'] or '-'} {row['employer']} {row['position']} "
+                  f"{row['count'] or '?'}人 {row['education']} {row['major'][:40]}")
+        return
+
+    run_positions(args.reparse)
+
+
+if __name__ == "__main__":
+    main()
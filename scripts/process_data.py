@@ -2,17 +2,31 @@
 """
 处理并合并采集数据
 
-读取: data/job_list_*.json, data/temp_details.json
-输出: data/gongkaoleida_YYYYMMDD.json
+读取: data/temp_details.jsonl (先导入职位库), data/jobs.db 中已抓取详情 (detail 阶段) 的记录
+输出: data/jobs.db (processed 阶段 + 全文索引), data/gongkaoleida_YYYYMMDD.json
+
+使用方法:
+    python scripts/process_data.py [--all] [--workers N]
+
+环境变量:
+    SEARCH_INDEX - 设为 0 时不更新全文索引 (见 scripts/search_index.py)
 """
 
-import glob
+import argparse
 import json
 import re
 from datetime import datetime
 from pathlib import Path
 
+from extractor import extract_fields
+from job_store import JobStore, iter_jsonl
+from parallel import DEFAULT_CHUNK_SIZE, Throughput, default_workers, imap_ordered
+from search_index import SearchIndex, search_index_enabled
+from sources import source_for_url
+
 DATA_DIR = Path(__file__).parent.parent / "data"
+DETAILS_FILE = DATA_DIR / "temp_details.jsonl"
+BATCH_SIZE = 200
 
 
 def extract_salary(text: str) -> str:
@@ -152,83 +166,173 @@ def extract_employer(text: str, title: str = "") -> str:
     return ""
 
 
-def main():
+def process_job(job: dict, detail: dict) -> dict:
+    """合并列表信息和详情，提取各字段"""
+    url = job.get("url", "") or detail.get("url", "")
+    content = detail.get("content", "") or ""
+    title = job.get("title", detail.get("title", ""))
+    
+    # 一次提取全部字段（extractor.py，输出与上面的 extract_* 函数一致）
+    fields = extract_fields(content, title)
+    now = datetime.now()
+    
+    return {
+        "职位名称": title or "未知职位",
+        "招聘单位": job.get("source", "") or fields["招聘单位"],
+        "薪资范围": fields["薪资范围"],
+        "工作地点": fields["工作地点"],
+        # 列表页日期优先，其次是详情页按来源规则解析的日期
+        "发布日期": job.get("date") or detail.get("date") or now.strftime("%Y-%m-%d"),
+        "来源网站": source_for_url(url).label,
+        "原文链接": url,
+        "职位描述": content[:2000] if content else "",
+        "招聘人数": fields["招聘人数"],
+        "学历要求": fields["学历要求"],
+        "报名截止": fields["报名截止"],
+        # 详情页上的附件（岗位表等），由 attachments.py 下载，不同步到 Notion
+        "附件列表": detail.get("attachments", []),
+        "采集时间": now.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def process_row(row: dict) -> dict:
+    """处理职位库中的一行（多进程模式下在子进程中执行）"""
+    return process_job(row["list"], row["detail"])
+
+
+def load_day_records(file_path: Path) -> dict:
+    """当天已有输出文件中的记录：原文链接 -> 记录（没有链接的记录以序号为键，原样保留）"""
+    if not file_path.exists():
+        return {}
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 无法读取已有输出文件 {file_path.name}: {e}")
+        return {}
+    return {(job.get("原文链接") if isinstance(job, dict) else None) or i: job
+            for i, job in enumerate(data if isinstance(data, list) else [])}
+
+
+def run_process(all_records: bool = False, workers: int = 1,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    处理职位库中已抓取详情的记录（all_records 时包括已处理/已同步的）
+
+    返回 {"imported": 导入的临时详情数, "processed": 处理条数,
+          "output_file": 输出文件 (没有记录时为 None), "records_per_sec": 处理速度,
+          "indexed": 全文索引新增/更新条数, "kept": 同一天之前运行输出、本次保留的条数}
+
+    同一天多次运行时与当天已有的输出文件按原文链接合并：本次处理的记录在前（覆盖同链接的旧记录），
+    之前运行输出的其他记录保留在后面。
+    """
     today_str = datetime.now().strftime("%Y%m%d")
     
-    # 加载职位列表
-    list_files = sorted(DATA_DIR.glob("job_list_*.json"), reverse=True)
-    if not list_files:
-        print("❌ 未找到职位列表文件")
-        return
-    
-    job_list = []
-    for f in list_files[:1]:  # 只取最新的
-        with open(f, "r", encoding="utf-8") as fp:
-            job_list = json.load(fp)
-    
-    print(f"📋 加载职位列表: {len(job_list)} 条")
-    
-    # 加载详情
-    details_file = DATA_DIR / "temp_details.json"
-    details = []
-    if details_file.exists():
-        with open(details_file, "r", encoding="utf-8") as f:
-            details = json.load(f)
-    
-    print(f"📄 加载详情: {len(details)} 条")
-    
-    # 建立 URL -> 详情 映射
-    detail_map = {d["url"]: d for d in details}
-    
-    # 合并处理
-    results = []
-    for job in job_list:
-        url = job.get("url", "")
-        detail = detail_map.get(url, {})
-        content = detail.get("content", "") or ""
-        title = job.get("title", detail.get("title", ""))
-        
-        # 提取招聘单位
-        employer = job.get("source", "") or extract_employer(content, title)
-        
-        processed = {
-            "职位名称": title or "未知职位",
-            "招聘单位": employer,
-            "薪资范围": extract_salary(content),
-            "工作地点": extract_location(content, title),
-            "发布日期": job.get("date", datetime.now().strftime("%Y-%m-%d")),
-            "来源网站": "公考雷达",
-            "原文链接": url,
-            "职位描述": content[:2000] if content else "",
-            "招聘人数": extract_count(content),
-            "学历要求": extract_education(content),
-            "报名截止": extract_deadline(content),
-            "采集时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        results.append(processed)
-    
-    # 保存
+    stages = ["detail", "processed", "synced"] if all_records else ["detail"]
     output_file = DATA_DIR / f"gongkaoleida_{today_str}.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    tmp_file = output_file.with_suffix(".json.tmp")
+    count = 0
+    sample = None
+    earlier = load_day_records(output_file)
+    index = SearchIndex() if search_index_enabled() else None
+    index_stats = {"added": 0, "updated": 0, "unchanged": 0}
+    
+    def save_batch(store, batch):
+        """回写一批处理结果，同时增量更新全文索引"""
+        store.save_processed(batch)
+        if index and batch:
+            for key, value in index.add(batch).items():
+                index_stats[key] += value
+    
+    with JobStore() as store:
+        # 导入临时详情文件（scrape_detail.py 入库失败或外部工具写入的记录）
+        imported = 0
+        batch = []
+        for detail in iter_jsonl(DETAILS_FILE):
+            batch.append(detail)
+            if len(batch) >= BATCH_SIZE:
+                imported += store.save_details(batch)
+                batch = []
+        imported += store.save_details(batch)
+        if imported:
+            print(f"📥 导入临时详情: {imported} 条")
+        
+        # 流式处理：逐条读库、分批回写，输出文件边处理边写
+        # 多进程模式下按块分给子进程，结果按读库顺序合并，输出与单进程一致
+        throughput = Throughput()
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write("[")
+            batch = []
+            rows = store.iter_stage(stages)
+            for row, processed in imap_ordered(process_row, rows, workers, chunk_size):
+                f.write(",\n" if count else "\n")
+                f.write(json.dumps(processed, ensure_ascii=False, indent=2))
+                earlier.pop(processed.get("原文链接"), None)
+                count += 1
+                throughput.add()
+                sample = sample or processed
+                
+                batch.append(processed)
+                if len(batch) >= BATCH_SIZE:
+                    save_batch(store, batch)
+                    batch = []
+            # 已同步的记录重新处理后回到 processed 阶段，由 sync_notion.py 按属性哈希判断是否需要更新
+            save_batch(store, batch)
+            if count:
+                for job in earlier.values():
+                    f.write(",\n")
+                    f.write(json.dumps(job, ensure_ascii=False, indent=2))
+            f.write("\n]\n")
     
-    print(f"✅ 处理完成: {len(results)} 条")
-    print(f"💾 输出文件: {output_file}")
+    if index:
+        index.close()
     
-    # 打印示例
-    if results:
+    result = {"imported": imported, "processed": count, "output_file": None,
+              "records_per_sec": count / throughput.elapsed if count else 0,
+              "indexed": index_stats["added"] + index_stats["updated"],
+              "kept": len(earlier) if count else 0}
+    if not count:
+        tmp_file.unlink()
+        print("⚠️ 没有需要处理的记录")
+    else:
+        result["output_file"] = output_file
+        tmp_file.replace(output_file)
+        print(f"✅ 处理完成: {count} 条")
+        print(f"⚡ 处理速度: {throughput.summary()} (进程数 {workers})")
+        print(f"💾 输出文件: {output_file}")
+        if earlier:
+            print(f"📎 保留当天之前运行的记录: {len(earlier)} 条")
+        if index:
+            print(f"🔍 全文索引: 新增 {index_stats['added']}, 更新 {index_stats['updated']}, "
+                  f"未变 {index_stats['unchanged']}")
+        
+        # 打印示例
         print(f"\n📊 示例数据:")
-        sample = results[0]
         print(f"   职位: {sample['职位名称'][:40]}")
         print(f"   单位: {sample['招聘单位']}")
         print(f"   人数: {sample['招聘人数']}")
         print(f"   学历: {sample['学历要求']}")
         print(f"   截止: {sample['报名截止']}")
     
-    # 清理临时文件
-    if details_file.exists():
-        details_file.unlink()
+    # 清理临时文件（详情已入库）
+    if DETAILS_FILE.exists():
+        DETAILS_FILE.unlink()
         print("🧹 已清理临时文件")
+    
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="处理并合并采集数据")
+    parser.add_argument("--all", action="store_true",
+                        help="重新处理库中所有已抓取详情的记录（补采/规则更新后使用）")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"并行进程数（0 为 CPU 核数 {default_workers()}，默认 1 单进程）")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="多进程模式下每块记录数")
+    args = parser.parse_args()
+    
+    run_process(args.all, args.workers or default_workers(), args.chunk_size)
 
 
 if __name__ == "__main__":
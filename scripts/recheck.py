@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+复查未截止的已同步公告
+
+日常抓取按 data/seen_urls.txt (frontier.py) 跳过已采集的公告，已同步的记录不会再被抓取，
+公告发布后的更正（延长报名、增加岗位、补充附件）也就不会同步到 Notion。
+本阶段从职位库中选出仍在报名期内的已同步公告重新抓取:
+    - 报名截止日期未过的；截止日期无法解析（如“详见公告”）的只复查最近 RECHECK_DAYS 天采集的
+    - 每次最多 RECHECK_MAX 条，优先最近采集的
+    - 响应缓存以 ttl=0 使用，每个页面发一次条件请求，未变化的页面通常只收到 304
+    - 标题、正文、日期或附件有变化的记录回到 detail 阶段，由 process_data.py 重新处理，
+      sync_notion.py 按属性哈希只 PATCH 变化的属性；没有变化的记录保持 synced
+
+使用方法:
+    python scripts/recheck.py [--limit N] [--days N] [--dry-run]
+
+环境变量:
+    RECHECK      - 设为 0 时工作流跳过复查
+    RECHECK_MAX  - 每次最多复查的公告数 (默认 100)
+    RECHECK_DAYS - 截止日期未知的公告复查多少天内采集的 (默认 14)
+"""
+
+import argparse
+import asyncio
+import os
+import re
+from datetime import date, datetime, timedelta
+
+from http_cache import ResponseCache, cache_enabled
+from job_store import JobStore
+from scrape_detail import fetch_details
+
+RECHECK_MAX = int(os.environ.get("RECHECK_MAX", "100"))
+RECHECK_DAYS = float(os.environ.get("RECHECK_DAYS", "14"))
+
+DATE_RE = re.compile(r'(\d{4})\s*[年\-/.]\s*(\d{1,2})\s*[月\-/.]\s*(\d{1,2})')
+
+# 抓取过程的记录字段，不参与变化判断
+VOLATILE_KEYS = {"ready_ms", "ready", "fetched_by", "error"}
+
+
+def recheck_enabled() -> bool:
+    return os.environ.get("RECHECK", "1") != "0"
+
+
+def parse_deadline(text: str):
+    """报名截止字段 (2026年01月27日 / 2026-1-27 等) -> date，无法解析时返回 None"""
+    match = DATE_RE.search(text or "")
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+def open_postings(limit: int = None, days: float = None, today: date = None) -> list:
+    """仍在报名期内的已同步公告 URL，最近采集的在前"""
+    limit = RECHECK_MAX if limit is None else limit
+    days = RECHECK_DAYS if days is None else days
+    today = today or date.today()
+    recent_since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    urls = []
+    with JobStore() as store:
+        for row in store.iter_stage("synced"):
+            if not row["detail"]:
+                continue
+            deadline = parse_deadline(row["processed"].get("报名截止"))
+            if deadline is None and row["created_at"] < recent_since:
+                continue
+            if deadline is not None and deadline < today:
+                continue
+            urls.append(row["url"])
+    return urls[::-1][:limit]
+
+
+def detail_changed(old: dict, new: dict) -> bool:
+    def fields(detail):
+        return {key: value for key, value in detail.items() if key not in VOLATILE_KEYS}
+    return fields(old) != fields(new)
+
+
+def run_recheck(limit: int = None, days: float = None, dry_run: bool = False) -> dict:
+    """
+    重新抓取未截止的已同步公告，有变化的写回职位库 (detail 阶段)
+
+    返回 {"checked": 复查数, "changed": 有变化数, "failed": 抓取失败数,
+          "cache": 响应缓存统计 (见 ResponseCache.stats，关闭缓存时为 None)}
+    """
+    result = {"checked": 0, "changed": 0, "failed": 0, "cache": None}
+    urls = open_postings(limit, days)
+    result["checked"] = len(urls)
+    print(f"🔁 未截止的已同步公告: {len(urls)} 个")
+    if not urls:
+        return result
+
+    # ttl=0：缓存中有的页面一律发条件请求
+    cache = ResponseCache(ttl=0) if cache_enabled() else None
+    try:
+        details = asyncio.run(fetch_details(urls, cache=cache))
+    finally:
+        if cache:
+            cache.close()
+
+    changed = []
+    with JobStore() as store:
+        for detail in details:
+            if detail.get("error") or not detail.get("content"):
+                result["failed"] += 1
+                continue
+            old = store.get(detail["url"])
+            if old and detail_changed(old["detail"], detail):
+                changed.append(detail)
+                print(f"   🔄 有更新: {(detail.get('title') or detail['url'])[:40]}")
+        if changed and not dry_run:
+            store.save_details(changed)
+
+    result["changed"] = len(changed)
+    print(f"📊 复查 {len(urls)} 个, 有更新 {len(changed)} 个, 失败 {result['failed']} 个"
+          f"{' (dry run，未写入)' if dry_run else ''}")
+    if cache:
+        print(f"💾 响应缓存: {cache.summary()}")
+        result["cache"] = cache.stats
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="复查未截止的已同步公告")
+    parser.add_argument("--limit", type=int, help=f"最多复查的公告数 (默认 {RECHECK_MAX})")
+    parser.add_argument("--days", type=float, help=f"截止日期未知的公告复查多少天内采集的 (默认 {RECHECK_DAYS:g})")
+    parser.add_argument("--dry-run", action="store_true", help="只报告有更新的公告，不写入职位库")
+    args = parser.parse_args()
+
+    run_recheck(args.limit, args.days, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Playwright 请求拦截
+
+抓取只用到 innerText 和 href，图片、字体、媒体和统计脚本都可以直接拦截，
+由 scrape_list.py / scrape_detail.py 通过 BrowserPool 共用。
+
+环境变量:
+    BLOCK_RESOURCE_TYPES - 拦截的资源类型，逗号分隔 (默认 image,media,font)
+                           stylesheet 会影响 innerText 对隐藏元素的判断，默认不拦截
+    BLOCK_DOMAINS        - 拦截的域名，逗号分隔，匹配域名本身及其子域名
+                           (默认为常见统计/客服/推送域名)
+    BLOCK_RESOURCES      - 设为 0 关闭拦截
+"""
+
+import os
+from urllib.parse import urlparse
+
+DEFAULT_BLOCK_TYPES = "image,media,font"
+DEFAULT_BLOCK_DOMAINS = ",".join([
+    "hm.baidu.com",
+    "zz.bdstatic.com",
+    "cnzz.com",
+    "qhres2.com",
+    "qhimg.com",
+    "sobot.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+])
+
+# 被拦截请求无法得知真实大小，按资源类型估算节省的字节数
+ESTIMATED_BYTES = {
+    "image": 30 * 1024,
+    "media": 500 * 1024,
+    "font": 60 * 1024,
+    "stylesheet": 20 * 1024,
+    "script": 40 * 1024,
+}
+DEFAULT_ESTIMATED_BYTES = 5 * 1024
+
+
+def _split(value: str) -> set:
+    return {item.strip().lower() for item in value.split(",") if item.strip()}
+
+
+def blocking_enabled() -> bool:
+    return os.environ.get("BLOCK_RESOURCES", "1") != "0"
+
+
+class ResourceBlocker:
+    """按资源类型和域名拦截请求，并统计拦截数量和估算节省流量"""
+
+    def __init__(self, resource_types=None, domains=None):
+        if resource_types is None:
+            resource_types = _split(os.environ.get("BLOCK_RESOURCE_TYPES", DEFAULT_BLOCK_TYPES))
+        if domains is None:
+            domains = _split(os.environ.get("BLOCK_DOMAINS", DEFAULT_BLOCK_DOMAINS))
+        self.resource_types = set(resource_types)
+        self.domains = set(domains)
+        self.stats = {"allowed": 0, "blocked": 0, "saved_bytes": 0, "by_reason": {}}
+
+    def match(self, resource_type: str, url: str) -> str:
+        """返回拦截原因，不拦截时返回空字符串"""
+        if resource_type in self.resource_types:
+            return resource_type
+        host = (urlparse(url).hostname or "").lower()
+        for domain in self.domains:
+            if host == domain or host.endswith("." + domain):
+                return domain
+        return ""
+
+    def record(self, reason: str, resource_type: str):
+        self.stats["blocked"] += 1
+        self.stats["saved_bytes"] += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        by_reason = self.stats["by_reason"]
+        by_reason[reason] = by_reason.get(reason, 0) + 1
+
+    async def handle(self, route):
+        """context.route("**/*", blocker.handle) 的回调"""
+        request = route.request
+        reason = self.match(request.resource_type, request.url)
+        if reason:
+            self.record(reason, request.resource_type)
+            await route.abort()
+        else:
+            self.stats["allowed"] += 1
+            await route.continue_()
+
+    async def install(self, context):
+        await context.route("**/*", self.handle)
+
+    def summary(self) -> str:
+        total = self.stats["allowed"] + self.stats["blocked"]
+        top = sorted(self.stats["by_reason"].items(), key=lambda kv: -kv[1])[:5]
+        detail = ", ".join(f"{reason} {count}" for reason, count in top)
+        return (f"拦截 {self.stats['blocked']}/{total} 个请求, "
+                f"估算节省 {self.stats['saved_bytes'] / 1024 / 1024:.1f} MB"
+                + (f" ({detail})" if detail else ""))
@@ -1,153 +1,413 @@
 #!/usr/bin/env python3
 """
-抓取单个职位详情
+抓取职位详情
+
+支持单个 URL 或批量 URL（共享一个浏览器，多页并发）
+
+服务端渲染的页面（如 jshrss.jiangsu.gov.cn 的 art_*.html）先走 HTTP 快速通道：
+requests 连接池 + BeautifulSoup，按与浏览器相同的选择器优先级提取正文；
+正文不足 100 字符时再交给 Playwright 渲染。
+
+正文/日期选择器和发布日期解析按 URL 所属来源选择（见 sources.py），
+浏览器中每个来源同时打开的页面数不超过该来源的并发上限。
+
+页面上的附件链接 (.pdf/.doc/.docx/.xls/.xlsx) 记录在 detail["attachments"]，
+由 attachments.py 下载。
 
 使用方法:
     python scripts/scrape_detail.py --url "https://..."
+    python scripts/scrape_detail.py --urls-file data/temp_urls.txt [--concurrency N] [--no-http] [--full]
+
+已记录在 data/seen_urls.txt 中的 URL 直接跳过，抓取成功的 URL 追加到该文件；
+--full 忽略记录。
+
+详情页响应缓存在 data/http_cache.db（见 http_cache.py），TTL 内不重复下载，
+过期后发条件请求，未变化的页面直接使用缓存。
+
+环境变量:
+    HTTP_FAST_PATH   - 设为 0 关闭 HTTP 快速通道
+    HTTP_CONCURRENCY - HTTP 快速通道并发数 (默认 8)
 
-输出: 追加到 data/temp_details.json
+输出: 写入 data/jobs.db (detail 阶段)，同时追加到 data/temp_details.jsonl
 """
 
 import argparse
 import asyncio
 import json
+import os
 import sys
 from pathlib import Path
+from urllib.parse import urlparse
+
+from attachments import EXTRACT_LINKS_JS, find_attachments
+from browser_pool import USER_AGENT, BrowserPool, summarize_ready, wait_until_ready
+from frontier import Frontier, frontier_enabled
+from http_cache import ResponseCache, cache_enabled
+from job_store import JobStore, append_jsonl
+from sources import Source, source_for_url
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+MIN_CONTENT_LENGTH = 100
+HTTP_FAST_PATH = os.environ.get("HTTP_FAST_PATH", "1") != "0"
+HTTP_CONCURRENCY = int(os.environ.get("HTTP_CONCURRENCY", "8"))
+
+# 详情页就绪条件：任一正文选择器已有足够文本
+DETAIL_READY_JS = """
+    (selectors) => selectors.some(sel => {
+        try {
+            const el = document.querySelector(sel);
+            return el && el.innerText && el.innerText.length > 100;
+        } catch(e) {
+            return false;
+        }
+    })
+"""
+
+EXTRACT_CONTENT_JS = """
+    (selectors) => {
+        for (const sel of selectors) {
+            try {
+                const el = document.querySelector(sel);
+                if (el && el.innerText && el.innerText.length > 100) {
+                    return el.innerText.trim();
+                }
+            } catch(e) {}
+        }
+
+        // 如果没找到，获取 body 内容但排除导航等
+        const body = document.body.cloneNode(true);
+        const removeSelectors = ['nav', 'header', 'footer', '.nav', '.header', '.footer', '.sidebar', 'script', 'style'];
+        removeSelectors.forEach(sel => {
+            body.querySelectorAll(sel).forEach(el => el.remove());
+        });
+
+        return body.innerText.trim();
+    }
+"""
+
+EXTRACT_DATE_JS = """
+    (dateSelectors) => {
+        for (const sel of dateSelectors) {
+            try {
+                const el = document.querySelector(sel);
+                if (el) return el.innerText.trim();
+            } catch(e) {}
+        }
+        return '';
+    }
+"""
+
+
+def create_http_session():
+    """创建带连接池的 requests Session"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_CONCURRENCY, pool_maxsize=HTTP_CONCURRENCY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def add_date(result: dict, source: Source) -> dict:
+    """按来源规则从 URL、日期区域和正文开头解析发布日期 (YYYY-MM-DD)"""
+    text = result.get("date_text", "") + "\n" + result.get("content", "")
+    date = source.parse_date(result["url"], text)
+    if date:
+        result["date"] = date
+    return result
+
+
+def extract_detail_html(html, url: str) -> dict:
+    """从静态 HTML 提取详情，选择器优先级与 EXTRACT_CONTENT_JS 一致"""
+    from bs4 import BeautifulSoup
+
+    source = source_for_url(url)
+
+    soup = BeautifulSoup(html, "html.parser")
+    for el in soup(["script", "style", "noscript"]):
+        el.decompose()
 
-async def fetch_detail(url: str) -> dict:
-    """使用 Playwright 抓取职位详情"""
+    result = {"url": url, "content": "", "title": ""}
+    if soup.title and soup.title.string:
+        result["title"] = soup.title.string.strip()
+
+    # 只接受命中正文选择器的内容；退化到 body 的情况交给浏览器处理
+    for sel in source.content_selectors:
+        el = soup.select_one(sel)
+        if el:
+            text = el.get_text("\n", strip=True)
+            if len(text) > MIN_CONTENT_LENGTH:
+                result["content"] = text[:8000]
+                break
+
+    for sel in source.date_selectors:
+        el = soup.select_one(sel)
+        if el:
+            date_text = el.get_text(" ", strip=True)
+            if date_text:
+                result["date_text"] = date_text
+            break
+
+    links = [{"url": a["href"], "name": a.get_text(" ", strip=True)} for a in soup.select("a[href]")]
+    attachments = find_attachments(url, links)
+    if attachments:
+        result["attachments"] = attachments
+
+    return add_date(result, source)
+
+
+def fetch_detail_http(url: str, session, cache: ResponseCache = None) -> dict:
+    """HTTP 快速通道，请求失败时返回带 error 的空结果"""
     try:
-        from playwright.async_api import async_playwright
-    except ImportError:
-        print("❌ 请安装 playwright")
-        return {"url": url, "content": "", "error": "playwright not installed"}
-    
+        if cache:
+            return extract_detail_html(cache.get(session, url, timeout=15), url)
+        resp = session.get(url, timeout=15)
+        resp.raise_for_status()
+        return extract_detail_html(resp.content, url)
+    except Exception as e:
+        return {"url": url, "content": "", "title": "", "error": str(e)}
+
+
+def source_semaphores(urls: list) -> dict:
+    """每个来源一个 Semaphore（来源的并发上限），限制浏览器中同一来源同时打开的页面数"""
+    sources = {source_for_url(url) for url in urls}
+    return {source.name: asyncio.Semaphore(max(1, source.concurrency)) for source in sources}
+
+
+async def fetch_details_http(urls: list, cache: ResponseCache = None) -> list:
+    """在线程池中并发执行 HTTP 快速通道"""
+    session = create_http_session()
+    semaphore = asyncio.Semaphore(HTTP_CONCURRENCY)
+
+    async def fetch_one(url):
+        async with semaphore:
+            return await asyncio.to_thread(fetch_detail_http, url, session, cache)
+
+    try:
+        return await asyncio.gather(*(fetch_one(url) for url in urls))
+    finally:
+        session.close()
+
+
+async def fetch_detail(url: str, pool: BrowserPool) -> dict:
+    """使用浏览器池中的页面抓取职位详情"""
     result = {"url": url, "content": "", "title": ""}
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        )
-        page = await context.new_page()
-        
+    source = source_for_url(url)
+
+    async with pool.page() as page:
         try:
             await page.goto(url, timeout=30000, wait_until="domcontentloaded")
-            await asyncio.sleep(3)  # 等待 JS 渲染
-            
+            # 等待正文渲染（超时则按已有内容提取）
+            timing = await wait_until_ready(page, DETAIL_READY_JS, source.content_selectors)
+            result["ready_ms"] = timing["ready_ms"]
+            result["ready"] = timing["ready"]
+
             # 获取标题
             title = await page.title()
             result["title"] = title
-            
+
             # 尝试多种选择器获取正文内容
-            content = await page.evaluate("""
-                () => {
-                    // 公考雷达特定选择器
-                    const selectors = [
-                        '.article-content',
-                        '.detail-content', 
-                        '.content-wrap',
-                        '.post-content',
-                        '.news-content',
-                        '.main-content',
-                        '#article-content',
-                        '#content',
-                        'article',
-                        '.content',
-                        '.main',
-                        '[class*="content"]',
-                        '[class*="article"]',
-                        '[class*="detail"]'
-                    ];
-                    
-                    for (const sel of selectors) {
-                        try {
-                            const el = document.querySelector(sel);
-                            if (el && el.innerText && el.innerText.length > 100) {
-                                return el.innerText.trim();
-                            }
-                        } catch(e) {}
-                    }
-                    
-                    // 如果没找到，获取 body 内容但排除导航等
-                    const body = document.body.cloneNode(true);
-                    const removeSelectors = ['nav', 'header', 'footer', '.nav', '.header', '.footer', '.sidebar', 'script', 'style'];
-                    removeSelectors.forEach(sel => {
-                        body.querySelectorAll(sel).forEach(el => el.remove());
-                    });
-                    
-                    return body.innerText.trim();
-                }
-            """)
-            
+            content = await page.evaluate(EXTRACT_CONTENT_JS, source.content_selectors)
+
             result["content"] = content[:8000] if content else ""
-            
+
             # 额外提取日期信息
-            date_text = await page.evaluate("""
-                () => {
-                    const dateSelectors = ['.date', '.time', '.publish-time', '.post-date', '[class*="date"]', '[class*="time"]'];
-                    for (const sel of dateSelectors) {
-                        try {
-                            const el = document.querySelector(sel);
-                            if (el) return el.innerText.trim();
-                        } catch(e) {}
-                    }
-                    return '';
-                }
-            """)
+            date_text = await page.evaluate(EXTRACT_DATE_JS, source.date_selectors)
             if date_text:
                 result["date_text"] = date_text
-            
+            add_date(result, source)
+
+            # 附件链接（岗位表等）
+            attachments = find_attachments(page.url, await page.evaluate(EXTRACT_LINKS_JS))
+            if attachments:
+                result["attachments"] = attachments
+
         except Exception as e:
             result["error"] = str(e)
-            print(f"⚠️ 抓取失败: {e}")
-        finally:
-            await browser.close()
-    
+            print(f"⚠️ 抓取失败: {url[:60]} - {e}")
+
     return result
 
 
-def main():
-    parser = argparse.ArgumentParser(description="抓取职位详情")
-    parser.add_argument("--url", required=True, help="职位详情URL")
-    args = parser.parse_args()
-    
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    
-    print(f"🔍 正在抓取: {args.url[:60]}...")
-    result = asyncio.run(fetch_detail(args.url))
-    
-    # 追加到临时文件
-    temp_file = DATA_DIR / "temp_details.json"
-    
-    details = []
-    if temp_file.exists():
-        with open(temp_file, "r", encoding="utf-8") as f:
-            try:
-                details = json.load(f)
-            except:
-                details = []
-    
-    # 检查是否已存在
-    existing_urls = {d.get("url") for d in details}
-    if args.url not in existing_urls:
-        details.append(result)
-    
-    with open(temp_file, "w", encoding="utf-8") as f:
-        json.dump(details, f, ensure_ascii=False, indent=2)
-    
-    if result.get("error"):
-        print(f"❌ 失败: {result['error']}")
+async def fetch_details_pool(urls: list, pool: BrowserPool) -> list:
+    """在已打开的浏览器池中并发抓取多个详情页（结果顺序与 urls 一致）"""
+    per_source = source_semaphores(urls)
+
+    async def fetch_one(url):
+        async with per_source[source_for_url(url).name]:
+            return await fetch_detail(url, pool)
+
+    return await asyncio.gather(*(fetch_one(url) for url in urls))
+
+
+async def fetch_details_browser(urls: list, concurrency: int = None,
+                                cache: ResponseCache = None, pool: BrowserPool = None) -> list:
+    """共享一个浏览器，并发抓取多个详情页（结果顺序与 urls 一致）；传入 pool 时复用该浏览器池"""
+    if pool is not None:
+        return await fetch_details_pool(urls, pool)
+
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        print("❌ 请安装 playwright")
+        return [{"url": url, "content": "", "error": "playwright not installed"} for url in urls]
+
+    async with async_playwright() as p:
+        async with BrowserPool(p, concurrency=concurrency, cache=cache) as pool:
+            print(f"⚡ 并发页数: {pool.concurrency}")
+            results = await fetch_details_pool(urls, pool)
+            if pool.blocker:
+                print(f"🚫 资源拦截: {pool.blocker.summary()}")
+            return results
+
+
+async def fetch_details(urls: list, concurrency: int = None, use_http: bool = None,
+                        path_stats: dict = None, cache: ResponseCache = None,
+                        pool: BrowserPool = None) -> list:
+    """
+    批量抓取详情（结果顺序与 urls 一致）
+
+    先走 HTTP 快速通道，正文不足 MIN_CONTENT_LENGTH 的再用浏览器抓取。
+    path_stats 按来源域名记录 {"http": n, "browser": n}；传入 cache 时两条通道都使用响应缓存；
+    传入 pool 时浏览器通道复用该浏览器池（如 backfill.py 的长时间运行的 worker）。
+    """
+    if use_http is None:
+        use_http = HTTP_FAST_PATH
+    if path_stats is None:
+        path_stats = {}
+
+    results = {}
+    if use_http:
+        try:
+            http_results = await fetch_details_http(urls, cache)
+        except ImportError:
+            print("⚠️ 未安装 requests/beautifulsoup4，跳过 HTTP 快速通道")
+            http_results = []
+        for result in http_results:
+            if len(result.get("content", "")) > MIN_CONTENT_LENGTH:
+                result["fetched_by"] = "http"
+                results[result["url"]] = result
+
+    browser_urls = [url for url in urls if url not in results]
+    if browser_urls:
+        print(f"🌐 {len(urls) - len(browser_urls)} 个走 HTTP 快速通道, {len(browser_urls)} 个交给浏览器")
+        for result in await fetch_details_browser(browser_urls, concurrency, cache, pool):
+            result["fetched_by"] = "browser"
+            results[result["url"]] = result
+
+    for url in urls:
+        source = urlparse(url).hostname or "unknown"
+        counts = path_stats.setdefault(source, {"http": 0, "browser": 0})
+        counts[results[url]["fetched_by"]] += 1
+
+    return [results[url] for url in urls]
+
+
+def load_urls(urls_file: str) -> list:
+    """读取 URL 文件：JSON 数组或每行一个 URL"""
+    with open(urls_file, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    if text.lstrip().startswith("["):
+        items = json.loads(text)
+        urls = [item.get("url") if isinstance(item, dict) else item for item in items]
     else:
-        content_len = len(result.get('content', ''))
-        print(f"✅ 成功: {result.get('title', 'N/A')[:40]}...")
-        print(f"   内容长度: {content_len} 字符")
+        urls = [line.strip() for line in text.splitlines()]
+
+    # 去重并保持顺序
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+def save_details(results: list) -> Path:
+    """逐条追加到临时 JSONL 文件（去重由读取方按 URL 处理）"""
+    temp_file = DATA_DIR / "temp_details.jsonl"
+    append_jsonl(temp_file, results)
+    return temp_file
+
+
+def run_details(urls: list, concurrency: int = None, use_http: bool = None,
+                full: bool = False) -> dict:
+    """
+    抓取详情并写入职位库 (detail 阶段) 和 temp_details.jsonl
+
+    返回 {"requested": 传入 URL 数, "skipped": 已采集跳过数, "success": 成功数,
+          "failed": 失败数, "path_stats": {域名: {"http": n, "browser": n}},
+          "cache": 响应缓存统计 (见 ResponseCache.stats，关闭缓存时为 None)}
+    """
+    result = {"requested": len(urls), "skipped": 0, "success": 0, "failed": 0, "path_stats": {},
+              "cache": None}
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+    frontier = None
+    if frontier_enabled() and not full:
+        frontier = Frontier()
+        new_urls = frontier.filter_new(urls)
+        if len(new_urls) < len(urls):
+            print(f"🧭 跳过已采集: {len(urls) - len(new_urls)} 个")
+        result["skipped"] = len(urls) - len(new_urls)
+        urls = new_urls
+
+    if not urls:
+        print("⚠️ 没有需要抓取的 URL")
+        return result
+
+    print(f"🔍 正在抓取 {len(urls)} 个详情页...")
+    path_stats = result["path_stats"]
+    cache = ResponseCache() if cache_enabled() else None
+    try:
+        results = asyncio.run(fetch_details(urls, concurrency, use_http=use_http,
+                                            path_stats=path_stats, cache=cache))
+    finally:
+        if cache:
+            cache.close()
+    save_details(results)
+    with JobStore() as store:
+        store.save_details(results)
+
+    if frontier is not None:
+        frontier.add([r["url"] for r in results if not r.get("error") and r.get("content")])
+
+    success_count = 0
+    for item in results:
+        if item.get("error"):
+            print(f"❌ 失败: {item['url'][:60]} - {item['error'][:80]}")
+            continue
+        success_count += 1
+        content_len = len(item.get('content', ''))
+        print(f"✅ 成功: {item.get('title', 'N/A')[:40]}...")
+        print(f"   内容长度: {content_len} 字符, 就绪 {item.get('ready_ms', 0)}ms")
         if content_len < 100:
             print(f"   ⚠️ 内容可能提取不完整")
 
+    print(f"📊 详情成功: {success_count}/{len(urls)}")
+    print(f"⏱️ 详情页就绪耗时: {summarize_ready([r for r in results if 'ready_ms' in r])}")
+    for source, counts in sorted(path_stats.items()):
+        print(f"🛣️ {source}: HTTP {counts['http']} / 浏览器 {counts['browser']}")
+    if cache:
+        print(f"💾 响应缓存: {cache.summary()}")
+        result["cache"] = cache.stats
+
+    result.update(success=success_count, failed=len(urls) - success_count)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取职位详情")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--url", help="职位详情URL")
+    group.add_argument("--urls-file", help="批量URL文件 (JSON 数组或每行一个)")
+    parser.add_argument("--concurrency", help="并发页数 (默认读取 BROWSER_CONCURRENCY)", type=int)
+    parser.add_argument("--no-http", action="store_true", help="关闭 HTTP 快速通道，全部使用浏览器")
+    parser.add_argument("--full", action="store_true", help="忽略已采集记录，重新抓取")
+    args = parser.parse_args()
+
+    urls = [args.url] if args.url else load_urls(args.urls_file)
+    run_details(urls, args.concurrency, use_http=False if args.no_http else None, full=args.full)
+
 
 if __name__ == "__main__":
     main()
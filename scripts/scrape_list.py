@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 """
-抓取公考雷达职位列表
+抓取职位列表（公考雷达、江苏省人社厅等，来源定义见 sources.py）
 
-支持分页抓取
+支持分页抓取；各来源共用一个浏览器同时抓取，每个来源按自己的并发上限翻页，
+结果合并写入同一个职位库，后续详情、处理、同步阶段不区分来源。
 
 使用方法:
-    python scripts/scrape_list.py [--pages N]
+    python scripts/scrape_list.py [--pages N] [--concurrency N] [--sources a,b] [--full]
+    
+增量模式（默认）: 只输出 data/seen_urls.txt 中没有的新公告，
+某个来源遇到整页都是已采集公告时停止该来源的翻页；--full 忽略记录全量抓取。
     
 示例:
-    python scripts/scrape_list.py --pages 10
+    python scripts/scrape_list.py --pages 10 --sources gongkaoleida,jshrss
 """
 
 import argparse
@@ -20,15 +24,37 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
-# 配置
-BASE_URL = "https://www.gongkaoleida.com"
-LIST_URL_TEMPLATE = BASE_URL + "/area/878-0-0-0-124?page={page}"
+from browser_pool import BrowserPool, summarize_ready, wait_until_ready
+from frontier import Frontier, frontier_enabled
+from http_cache import ResponseCache, cache_enabled
+from job_store import JobStore
+from sources import Source, enabled_sources
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 
 # 筛选规则
 EXCLUDE_KEYWORDS = ["成绩", "名单", "面试", "体检", "领取", "资格审查", "公示", "录用", "通知"]
 INCLUDE_KEYWORDS = ["招聘", "招募", "选聘", "招考", "遴选", "选调"]
 
+# 列表页就绪条件：出现公告链接（参数为来源的链接选择器）
+LIST_READY_JS = """
+    (selector) => document.querySelector(selector) !== null
+"""
+
+EXTRACT_LINKS_JS = """
+    (selector) => {
+        const results = [];
+        document.querySelectorAll(selector).forEach(link => {
+            const href = link.href;
+            const title = link.innerText.trim();
+            if (href && title && title.length > 10) {
+                results.push({title: title.substring(0, 200), url: href});
+            }
+        });
+        return results;
+    }
+"""
+
 
 def is_recruitment_post(title: str) -> bool:
     """判断是否为招聘公告"""
@@ -41,122 +67,181 @@ def is_recruitment_post(title: str) -> bool:
     return False
 
 
-async def fetch_page(page_num: int, playwright) -> list:
-    """抓取单页职位列表"""
-    url = LIST_URL_TEMPLATE.format(page=page_num)
+async def fetch_page(source: Source, page_num: int, pool: BrowserPool, timings: list = None,
+                     errors: list = None) -> list:
+    """抓取某个来源的单页职位列表（timings 用于收集就绪耗时，errors 收集失败原因）"""
+    url = source.list_url(page_num)
     jobs = []
     
-    browser = await playwright.chromium.launch(headless=True)
-    context = await browser.new_context(
-        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    )
-    page = await context.new_page()
-    
-    try:
-        print(f"   📄 加载第 {page_num} 页...")
-        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
-        await asyncio.sleep(3)
+    async with pool.page() as page:
+        try:
+            print(f"   📄 [{source.name}] 加载第 {page_num} 页...")
+            await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            timing = await wait_until_ready(page, LIST_READY_JS, source.link_selector)
+            if timings is not None:
+                timings.append(timing)
         
-        # 获取所有职位链接
-        items = await page.evaluate("""
-            () => {
-                const results = [];
-                const links = document.querySelectorAll('a');
-                
-                links.forEach(link => {
-                    const href = link.href;
-                    const title = link.innerText.trim();
-                    
-                    if (href && title && title.length > 10 && 
-                        (href.includes('/article/') || href.includes('/info/'))) {
-                        results.push({
-                            title: title.substring(0, 200),
-                            url: href
-                        });
-                    }
-                });
-                
-                return results;
-            }
-        """)
+            # 获取所有职位链接
+            items = await page.evaluate(EXTRACT_LINKS_JS, source.link_selector)
         
-        for item in items:
-            title = item.get("title", "")
-            full_url = item.get("url", "")
+            for item in items:
+                title = item.get("title", "")
+                full_url = item.get("url", "")
             
-            if not is_recruitment_post(title):
-                continue
+                if not source.is_detail_link(full_url) or not is_recruitment_post(title):
+                    continue
             
-            jobs.append({
-                "title": title,
-                "url": full_url,
-                "date": "",  # 日期将从详情页提取
-                "source": ""
-            })
+                jobs.append({
+                    "title": title,
+                    "url": full_url,
+                    "date": source.parse_date(full_url),  # URL 中没有日期的来源从详情页提取
+                    "source": "",
+                    "site": source.name,
+                })
         
-        print(f"      找到 {len(jobs)} 条招聘公告")
+            ready_note = "" if timing["ready"] else " (等待超时)"
+            print(f"      [{source.name}] 第 {page_num} 页找到 {len(jobs)} 条招聘公告, "
+                  f"就绪 {timing['ready_ms']}ms{ready_note}")
         
-    except Exception as e:
-        print(f"   ⚠️ 第 {page_num} 页抓取失败: {e}")
-    finally:
-        await browser.close()
+        except Exception as e:
+            print(f"   ⚠️ [{source.name}] 第 {page_num} 页抓取失败: {e}")
+            if errors is not None:
+                errors.append(str(e))
     
     return jobs
 
 
-async def fetch_list(max_pages: int) -> list:
-    """使用 Playwright 抓取职位列表（支持分页）"""
-    try:
-        from playwright.async_api import async_playwright
-    except ImportError:
-        print("❌ 请安装 playwright")
-        sys.exit(1)
+async def fetch_source(source: Source, max_pages: int, pool: BrowserPool, concurrency: int,
+                       frontier: Frontier = None, timings: list = None) -> list:
+    """按页码顺序抓取一个来源，同时最多 concurrency 页"""
+    jobs = []
+    empty_pages = 0
+    page_num = 1
+    stop = False
+    # 按并发数分批，批内并发抓取，批间按页码顺序判断是否停止翻页
+    while page_num <= max_pages and not stop:
+        batch = range(page_num, min(page_num + concurrency, max_pages + 1))
+        results = await asyncio.gather(*(fetch_page(source, n, pool, timings) for n in batch))
+        
+        for n, page_jobs in zip(batch, results):
+            if not page_jobs:
+                empty_pages += 1
+                if empty_pages >= 2:
+                    print(f"   [{source.name}] 连续 {empty_pages} 页无内容，停止翻页")
+                    stop = True
+                    break
+                continue
+            
+            empty_pages = 0
+            if frontier is not None:
+                page_jobs = [job for job in page_jobs if job["url"] not in frontier]
+                if not page_jobs:
+                    print(f"   [{source.name}] 第 {n} 页全部为已采集公告，停止翻页")
+                    stop = True
+                    break
+            jobs.extend(page_jobs)
+        
+        page_num = batch.stop
+    return jobs
+
+
+async def fetch_list(max_pages: int, concurrency: int = None, frontier: Frontier = None,
+                     cache: ResponseCache = None, sources: list = None,
+                     per_source: dict = None) -> list:
+    """
+    使用 Playwright 抓取职位列表（各来源同时抓取，支持分页；传入 frontier 时只返回新公告）
+
+    concurrency 为每个来源的并发页数，默认使用来源自己的上限；浏览器池并发为各来源之和。
+    per_source 记录 {来源名: 找到的公告数}。
+    列表页每天都有新公告，cache 应以 ttl=0 创建，只通过条件请求省流量。
+    """
+    from playwright.async_api import async_playwright
+    
+    if sources is None:
+        sources = enabled_sources()
+    if per_source is None:
+        per_source = {}
+    limits = {source.name: max(1, concurrency or source.concurrency) for source in sources}
     
-    all_jobs = []
     print(f"📋 开始抓取招聘信息...")
     print(f"🔢 最大页数: {max_pages}")
+    print("🌐 来源: " + ", ".join(f"{s.name} (并发 {limits[s.name]})" for s in sources))
     
+    timings = []
     async with async_playwright() as p:
-        empty_pages = 0
-        for page_num in range(1, max_pages + 1):
-            page_jobs = await fetch_page(page_num, p)
-            
-            if not page_jobs:
-                empty_pages += 1
-                if empty_pages >= 2:
-                    print(f"   连续 {empty_pages} 页无内容，停止翻页")
-                    break
-            else:
-                empty_pages = 0
-                all_jobs.extend(page_jobs)
+        async with BrowserPool(p, concurrency=sum(limits.values()), cache=cache) as pool:
+            print(f"⚡ 并发页数: {pool.concurrency}")
+            results = await asyncio.gather(*(
+                fetch_source(source, max_pages, pool, limits[source.name], frontier, timings)
+                for source in sources
+            ))
             
-            await asyncio.sleep(1)
+            if pool.blocker:
+                print(f"🚫 资源拦截: {pool.blocker.summary()}")
     
-    # 去重
+    print(f"⏱️ 列表页就绪耗时: {summarize_ready(timings)}")
+    
+    # 去重（按来源顺序合并）
     seen = set()
     unique_jobs = []
-    for job in all_jobs:
-        if job["url"] not in seen:
-            seen.add(job["url"])
-            unique_jobs.append(job)
+    for source, jobs in zip(sources, results):
+        count = 0
+        for job in jobs:
+            if job["url"] not in seen:
+                seen.add(job["url"])
+                unique_jobs.append(job)
+                count += 1
+        per_source[source.name] = count
+        print(f"   [{source.name}] {count} 条")
     
     print(f"✅ 共找到 {len(unique_jobs)} 条招聘公告")
     return unique_jobs
 
 
-def main():
-    parser = argparse.ArgumentParser(description="抓取公考雷达职位列表")
-    parser.add_argument("--pages", help="最大页数", type=int,
-                        default=int(os.environ.get("MAX_PAGES", "5")))
-    args = parser.parse_args()
-    
+def run_list(max_pages: int, concurrency: int = None, full: bool = False, sources=None) -> dict:
+    """
+    抓取列表并写入 job_list_YYYYMMDD.json 和职位库
+
+    sources 为来源名称列表或逗号分隔字符串，默认读取 SOURCES 环境变量（见 sources.py）。
+
+    返回 {"found": 本次找到的公告数, "new": 新写入职位库的数量, "per_source": {来源名: 公告数},
+          "output_file": 输出文件 (没有公告时为 None), "error": 错误信息或 None,
+          "cache": 响应缓存统计 (见 ResponseCache.stats，关闭缓存时为 None)}
+    """
+    result = {"found": 0, "new": 0, "per_source": {}, "output_file": None, "error": None, "cache": None}
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     
-    jobs = asyncio.run(fetch_list(args.pages))
+    try:
+        sources = enabled_sources(sources)
+    except ValueError as e:
+        print(f"❌ {e}")
+        result["error"] = str(e)
+        return result
+    
+    frontier = None
+    if frontier_enabled() and not full:
+        frontier = Frontier()
+        print(f"🧭 已采集记录: {len(frontier)} 条")
+    
+    cache = ResponseCache(ttl=0) if cache_enabled() else None
+    try:
+        jobs = asyncio.run(fetch_list(max_pages, concurrency, frontier, cache, sources,
+                                      result["per_source"]))
+    except ImportError:
+        print("❌ 请安装 playwright")
+        result["error"] = "playwright not installed"
+        return result
+    finally:
+        if cache:
+            cache.close()
+    
+    if cache:
+        print(f"💾 响应缓存: {cache.summary()}")
+        result["cache"] = cache.stats
     
     if not jobs:
         print("⚠️ 没有找到符合条件的招聘公告")
-        return
+        return result
     
     # 保存
     today_str = datetime.now().strftime("%Y%m%d")
@@ -166,9 +251,30 @@ def main():
         json.dump(jobs, f, ensure_ascii=False, indent=2)
     
     print(f"💾 已保存到: {output_file}")
+    
+    with JobStore() as store:
+        new_count = store.add_list(jobs)
+    print(f"🗄️ 已写入职位库: 新增 {new_count} 条")
     print(f"📊 共 {len(jobs)} 条职位")
     for i, job in enumerate(jobs[:5], 1):
         print(f"   {i}. {job['title'][:50]}...")
+    
+    result.update(found=len(jobs), new=new_count, output_file=output_file)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取职位列表")
+    parser.add_argument("--pages", help="每个来源的最大页数", type=int,
+                        default=int(os.environ.get("MAX_PAGES", "5")))
+    parser.add_argument("--concurrency", help="每个来源的并发页数 (默认读取 <NAME>_CONCURRENCY)", type=int)
+    parser.add_argument("--sources", help="来源，逗号分隔 (默认读取 SOURCES，全部来源)")
+    parser.add_argument("--full", action="store_true", help="忽略已采集记录，全量抓取")
+    args = parser.parse_args()
+    
+    result = run_list(args.pages, args.concurrency, args.full, args.sources)
+    if result["error"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+本地全文检索：按标题、招聘单位、工作地点、职位描述搜索已采集的招聘信息
+
+SQLite FTS5 索引（data/jobs.db 的 postings / postings_fts 表），中文按相邻两字切分 (bigram) 建索引:
+"事业单位" -> "事业 业单 单位"，查询词同样切分后按短语匹配，等价于子串匹配，
+两个字的常用词（本科、南京）也能走索引。英文和数字按单词索引，不区分大小写。
+process_data.py 每批写入处理结果时增量更新索引（内容未变的记录跳过）；
+--rebuild 从职位库和所有 data/gongkaoleida_*.json 重建，补上历史数据。
+
+使用方法:
+    python scripts/search_index.py "本科 南京 事业单位"
+    python scripts/search_index.py 护士 --location 苏州 --education 本科 --since 2026-01-01
+                                   [--sort new|rank|date] [--limit 20] [--json]
+    python scripts/search_index.py --rebuild [额外数据文件 ...]
+    python scripts/search_index.py --stats
+
+多个查询词之间为 “且”；--title / --employer / --location 只在对应字段中匹配。
+
+环境变量:
+    SEARCH_INDEX - 设为 0 时 process_data.py 不更新索引
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from job_store import STORE_FILE, JobStore
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# 索引字段 (FTS5 列名, 记录字段) 及 bm25 权重：标题命中最重要
+FTS_FIELDS = [("title", "职位名称"), ("employer", "招聘单位"), ("location", "工作地点"), ("description", "职位描述")]
+BM25_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    id           INTEGER PRIMARY KEY,
+    url          TEXT UNIQUE NOT NULL,
+    title        TEXT,
+    employer     TEXT,
+    location     TEXT,
+    education    TEXT,
+    headcount    TEXT,
+    deadline     TEXT,
+    published    TEXT,
+    source       TEXT,
+    collected_at TEXT,
+    doc_hash     TEXT,
+    description  TEXT  -- 放在最后：按其他列过滤时不必读取长文本的溢出页
+);
+CREATE INDEX IF NOT EXISTS idx_postings_published ON postings (published);
+CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5(
+    title, employer, location, description, content='', tokenize='unicode61'
+);
+"""
+
+COLUMNS = ["url", "title", "employer", "location", "education", "headcount", "deadline",
+           "published", "source", "collected_at", "description"]
+RECORD_FIELDS = ["原文链接", "职位名称", "招聘单位", "工作地点", "学历要求", "招聘人数", "报名截止",
+                 "发布日期", "来源网站", "采集时间", "职位描述"]
+
+TOKEN_RE = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]+|[A-Za-z0-9]+')
+CJK_RE = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]')
+
+
+def search_index_enabled() -> bool:
+    return os.environ.get("SEARCH_INDEX", "1") != "0"
+
+
+def tokenize(text: str) -> list:
+    """中文连续片段切成相邻两字 (单字片段保留单字)，英文数字按单词，统一小写"""
+    tokens = []
+    for match in TOKEN_RE.finditer(text or ""):
+        word = match.group()
+        if CJK_RE.match(word) and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+
+def index_text(text: str) -> str:
+    return " ".join(tokenize(text))
+
+
+def term_query(term: str) -> str:
+    """一个查询词 -> FTS5 表达式：切分后的短语（子串匹配）；单个汉字按前缀匹配"""
+    tokens = tokenize(term)
+    if not tokens:
+        return ""
+    if len(tokens) == 1 and len(tokens[0]) == 1 and CJK_RE.match(tokens[0]):
+        return f'"{tokens[0]}"*'
+    return '"' + " ".join(tokens) + '"'
+
+
+def build_match(terms: list, fields: dict = None) -> str:
+    """全文查询词 (任意字段) + 字段限定词 {列名: 查询} -> FTS5 MATCH 表达式，各部分为 “且”"""
+    parts = [term_query(term) for term in terms]
+    for column, text in (fields or {}).items():
+        parts.extend(f"{column} : {query}" for query in map(term_query, (text or "").split()) if query)
+    return " AND ".join(part for part in parts if part)
+
+
+def doc_hash(values: list) -> str:
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def load_records(file_path: str) -> list:
+    """数据文件中的记录（JSON 数组，或包含 招聘信息 列表的对象）"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("招聘信息") or data.get("招聘信息列表") or [data]
+    return [record for record in data if isinstance(record, dict) and record.get("原文链接")]
+
+
+class SearchIndex:
+    """招聘信息全文索引（与职位库共用 data/jobs.db）"""
+
+    def __init__(self, path: Path = STORE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _fts_values(self, row) -> list:
+        return [index_text(row[column]) for column, _ in FTS_FIELDS]
+
+    def add(self, records: list) -> dict:
+        """
+        写入或更新处理后的记录（以 原文链接 为键），内容未变化的跳过
+
+        返回 {"added", "updated", "unchanged"}
+        """
+        stats = {"added": 0, "updated": 0, "unchanged": 0}
+        with self.conn:
+            for record in records:
+                values = [str(record.get(field) or "") for field in RECORD_FIELDS]
+                if not values[0]:
+                    continue
+                new_hash = doc_hash(values)
+                old = self.conn.execute(
+                    "SELECT id, doc_hash, title, employer, location, description FROM postings WHERE url = ?",
+                    (values[0],)).fetchone()
+                if old and old["doc_hash"] == new_hash:
+                    stats["unchanged"] += 1
+                    continue
+
+                if old:
+                    # 无内容 (contentless) 的 FTS 表删除时需要提供原先写入的值
+                    self.conn.execute(
+                        "INSERT INTO postings_fts (postings_fts, rowid, title, employer, location, description) "
+                        "VALUES ('delete', ?, ?, ?, ?, ?)", (old["id"], *self._fts_values(old)))
+                    self.conn.execute(
+                        f"UPDATE postings SET {', '.join(f'{c} = ?' for c in COLUMNS[1:])}, doc_hash = ? "
+                        "WHERE id = ?", (*values[1:], new_hash, old["id"]))
+                    row_id = old["id"]
+                    stats["updated"] += 1
+                else:
+                    row_id = self.conn.execute(
+                        f"INSERT INTO postings ({', '.join(COLUMNS)}, doc_hash) "
+                        f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})", (*values, new_hash)).lastrowid
+                    stats["added"] += 1
+
+                fields = dict(zip(COLUMNS, values))
+                self.conn.execute(
+                    "INSERT INTO postings_fts (rowid, title, employer, location, description) VALUES (?, ?, ?, ?, ?)",
+                    (row_id, *self._fts_values(fields)))
+        return stats
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM postings")
+            self.conn.execute("INSERT INTO postings_fts (postings_fts) VALUES ('delete-all')")
+
+    def optimize(self):
+        """合并 FTS5 索引段（重建后执行，查询更快）"""
+        with self.conn:
+            self.conn.execute("INSERT INTO postings_fts (postings_fts) VALUES ('optimize')")
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def search(self, terms: list = None, fields: dict = None, education: str = None, source: str = None,
+               since: str = None, until: str = None, sort: str = "new", limit: int = 20) -> list:
+        """
+        搜索，返回记录 dict 列表
+
+        terms 在所有索引字段中匹配，fields 为 {列名: 查询} 的字段限定；
+        education / source 为子串过滤，since / until 为发布日期范围 (YYYY-MM-DD，含两端)。
+        sort: "new" 按收录顺序最新在前（沿索引顺序读取，取够 limit 条即停止，10 万条记录下
+        常用词也在 1ms 内）/ "rank" 按 bm25 相关度（需要为全部命中记录打分）/ "date" 按发布日期；
+        没有查询词时总是按发布日期。
+        """
+        match = build_match(terms or [], fields)
+        where, params = [], []
+        if education:
+            where.append("p.education LIKE ?")
+            params.append(f"%{education}%")
+        if source:
+            where.append("p.source LIKE ?")
+            params.append(f"%{source}%")
+        if since:
+            where.append("p.published >= ?")
+            params.append(since)
+        if until:
+            where.append("p.published <= ?")
+            params.append(until + "~")  # 包含当天带时间的值
+
+        conditions = "".join(f" AND {cond}" for cond in where)
+
+        if not match:
+            # 只有筛选条件时沿发布日期索引读取
+            sql = f"SELECT p.* FROM postings p WHERE 1{conditions} ORDER BY p.published DESC, p.id DESC LIMIT ?"
+            return [dict(row) for row in self.conn.execute(sql, [*params, limit])]
+
+        # 先在子查询中只取 id 排出前 limit 条，再读取这些记录的全部字段
+        score = f"bm25(postings_fts, {', '.join(map(str, BM25_WEIGHTS))})" if sort == "rank" else "0"
+        join = " JOIN postings p ON p.id = postings_fts.rowid" if where or sort == "date" else ""
+        order = {"rank": "score", "date": "p.published DESC, postings_fts.rowid DESC"}.get(
+            sort, "postings_fts.rowid DESC")
+        sql = (f"SELECT p.*, top.score FROM ("
+               f"SELECT postings_fts.rowid AS id, {score} AS score FROM postings_fts{join} "
+               f"WHERE postings_fts MATCH ?{conditions} ORDER BY {order} LIMIT ?"
+               f") AS top JOIN postings p ON p.id = top.id")
+        rows = [dict(row) for row in self.conn.execute(sql, [match, *params, limit])]
+        if sort == "rank":
+            rows.sort(key=lambda row: row["score"])
+        elif sort == "date":
+            rows.sort(key=lambda row: (row["published"], row["id"]), reverse=True)
+        else:
+            rows.sort(key=lambda row: row["id"], reverse=True)
+        return rows
+
+
+def rebuild(extra_files=()) -> dict:
+    """清空后从职位库和数据文件（按修改时间从旧到新，新记录覆盖旧记录）重建索引"""
+    files = sorted(glob.glob(str(DATA_DIR / "gongkaoleida_*.json")), key=os.path.getmtime)
+    files += [f for f in extra_files if f not in files]
+    stats = {"files": len(files), "records": 0}
+    with SearchIndex() as index:
+        index.clear()
+        for file_path in files:
+            try:
+                records = load_records(file_path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 跳过 {os.path.basename(file_path)}: {e}")
+                continue
+            index.add(records)
+            stats["records"] += len(records)
+        with JobStore() as store:
+            batch = []
+            for row in store.iter_stage(["processed", "synced"]):
+                if row["processed"]:
+                    batch.append(row["processed"])
+                if len(batch) >= 500:
+                    index.add(batch)
+                    stats["records"] += len(batch)
+                    batch = []
+            index.add(batch)
+            stats["records"] += len(batch)
+        index.optimize()
+        stats["postings"] = index.count()
+    return stats
+
+
+def snippet(text: str, terms: list, width: int = 60) -> str:
+    """描述中第一个命中词附近的一段文字"""
+    text = (text or "").replace("\n", " ")
+    positions = [text.find(term) for term in terms if term and term in text]
+    start = max(0, min(positions) - width // 3) if positions else 0
+    return ("…" if start else "") + text[start:start + width] + ("…" if len(text) > start + width else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="招聘信息全文检索")
+    parser.add_argument("terms", nargs="*", help="查询词（空格分隔，全部命中）；--rebuild 时为额外数据文件")
+    parser.add_argument("--title", help="只在职位名称中匹配")
+    parser.add_argument("--employer", help="只在招聘单位中匹配")
+    parser.add_argument("--location", help="只在工作地点中匹配")
+    parser.add_argument("--education", help="学历要求包含")
+    parser.add_argument("--source", help="来源网站包含")
+    parser.add_argument("--since", help="发布日期不早于 (YYYY-MM-DD)")
+    parser.add_argument("--until", help="发布日期不晚于 (YYYY-MM-DD)")
+    parser.add_argument("--sort", choices=["new", "rank", "date"], default="new",
+                        help="排序: 最新收录 (默认，最快) / 相关度 / 发布日期")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="按行输出 JSON")
+    parser.add_argument("--rebuild", action="store_true", help="从职位库和 data/gongkaoleida_*.json 重建索引")
+    parser.add_argument("--stats", action="store_true", help="显示索引记录数")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        start = time.perf_counter()
+        stats = rebuild(args.terms)
+        print(f"✅ 重建完成: {stats['postings']} 条 (读取 {stats['records']} 条记录, {stats['files']} 个数据文件, "
+              f"{time.perf_counter() - start:.1f}s)")
+        return
+
+    with SearchIndex() as index:
+        if args.stats:
+            print(f"📊 索引记录: {index.count()} 条")
+            return
+
+        fields = {"title": args.title, "employer": args.employer, "location": args.location}
+        fields = {column: text for column, text in fields.items() if text}
+        if not (args.terms or fields or args.education or args.source or args.since or args.until):
+            parser.error("请提供查询词或筛选条件")
+
+        start = time.perf_counter()
+        results = index.search(args.terms, fields, args.education, args.source, args.since, args.until,
+                               args.sort, args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        for row in results:
+            print(json.dumps({field: row[column] for field, column in zip(RECORD_FIELDS, COLUMNS)},
+                             ensure_ascii=False))
+        return
+
+    print(f"🔍 {len(results)} 条结果 ({elapsed_ms:.1f}ms)")
+    for i, row in enumerate(results, 1):
+        print(f"\n[{i}] {row['title']}")
+        print(f"    {row['employer'] or '-'} | {row['location'] or '-'} | {row['education'] or '-'} | "
+              f"发布 {row['published'] or '-'} | 截止 {row['deadline'] or '-'}")
+        print(f"    {snippet(row['description'], args.terms)}")
+        print(f"    {row['url']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+招聘信息来源适配器
+
+每个来源描述: 列表页 URL 模板、公告链接选择器和过滤规则、详情页正文选择器、发布日期解析。
+scrape_list.py 按来源并发抓取列表（每个来源有自己的并发上限），
+scrape_detail.py 按 URL 所属来源选择正文选择器并解析发布日期，
+之后的处理、同步阶段不区分来源。
+
+新增来源: 在 SOURCES 中加一个 Source。
+
+环境变量:
+    SOURCES                 - 启用的来源，逗号分隔 (默认全部: gongkaoleida,jshrss)
+    <NAME>_CONCURRENCY      - 单个来源的并发页数，如 JSHRSS_CONCURRENCY=2
+                              (公考雷达默认 BROWSER_CONCURRENCY，人社厅默认 2)
+    <NAME>_BASE_URL         - 替换来源的站点地址，如 GONGKAOLEIDA_BASE_URL=http://127.0.0.1:8801
+                              (本地假站点压测，见 fake_sites.py / load_test.py)
+"""
+
+import os
+import re
+from datetime import datetime
+from urllib.parse import urlparse, urlsplit, urlunsplit
+
+from browser_pool import DEFAULT_CONCURRENCY
+
+# 通用正文选择器，按优先级排列，排在各来源自己的选择器之后
+GENERIC_CONTENT_SELECTORS = [
+    '.content-wrap',
+    '.post-content',
+    '.news-content',
+    '.main-content',
+    '#article-content',
+    '#content',
+    'article',
+    '.content',
+    '.main',
+    '[class*="content"]',
+    '[class*="article"]',
+    '[class*="detail"]',
+]
+
+GENERIC_DATE_SELECTORS = ['.date', '.time', '.publish-time', '.post-date', '[class*="date"]', '[class*="time"]']
+
+DATE_RES = [
+    re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'),
+    re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日'),
+    re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})'),
+]
+
+
+def _format_date(year: str, month: str, day: str) -> str:
+    try:
+        return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+    except ValueError:
+        return ""
+
+
+class Source:
+    """一个招聘信息来源"""
+
+    def __init__(self, name: str, label: str, hosts: tuple, list_url_template: str,
+                 link_selector: str, first_page_url: str = None, link_pattern: str = None,
+                 content_selectors: list = None, date_selectors: list = None,
+                 url_date_pattern: str = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 total_pages: int = None):
+        self.name = name
+        self.label = label  # 写入 “来源网站” 字段
+        self.hosts = hosts
+        self.list_url_template = list_url_template
+        self.first_page_url = first_page_url
+        self.link_selector = link_selector
+        self.link_re = re.compile(link_pattern) if link_pattern else None
+        self.content_selectors = list(dict.fromkeys((content_selectors or []) + GENERIC_CONTENT_SELECTORS))
+        self.date_selectors = list(dict.fromkeys((date_selectors or []) + GENERIC_DATE_SELECTORS))
+        self.url_date_re = re.compile(url_date_pattern) if url_date_pattern else None
+        self.concurrency = int(os.environ.get(f"{name.upper()}_CONCURRENCY", concurrency))
+        self.total_pages = total_pages  # 列表总页数（backfill.py 全量回填的默认范围）
+
+        base_url = os.environ.get(f"{name.upper()}_BASE_URL")
+        if base_url:
+            self.rebase(base_url)
+
+    def __repr__(self) -> str:
+        return f"Source({self.name!r})"
+
+    def rebase(self, base_url: str):
+        """把列表页地址换成 base_url 的协议和主机，并接受该主机上的公告链接"""
+        base = urlsplit(base_url)
+
+        def replace_origin(url):
+            return urlunsplit(urlsplit(url)._replace(scheme=base.scheme, netloc=base.netloc)) if url else url
+
+        self.list_url_template = replace_origin(self.list_url_template)
+        self.first_page_url = replace_origin(self.first_page_url)
+        self.hosts = tuple(self.hosts) + (base.hostname,)
+
+    def list_url(self, page: int) -> str:
+        if page == 1 and self.first_page_url:
+            return self.first_page_url
+        return self.list_url_template.format(page=page)
+
+    def is_detail_link(self, url: str) -> bool:
+        """列表页中的链接是否为本来源的公告详情页"""
+        if (urlparse(url).hostname or "") not in self.hosts:
+            return False
+        return self.link_re is None or bool(self.link_re.search(url))
+
+    def parse_date(self, url: str = "", text: str = "") -> str:
+        """发布日期 YYYY-MM-DD：先看 URL 中的日期，再看日期区域/正文开头的第一个日期，找不到返回空字符串"""
+        if self.url_date_re and url:
+            match = self.url_date_re.search(url)
+            if match:
+                date = _format_date(*match.groups())
+                if date:
+                    return date
+        head = (text or "")[:500]
+        for date_re in DATE_RES:
+            match = date_re.search(head)
+            if match:
+                date = _format_date(*match.groups())
+                if date:
+                    return date
+        return ""
+
+
+SOURCES = {
+    "gongkaoleida": Source(
+        name="gongkaoleida",
+        label="公考雷达",
+        hosts=("www.gongkaoleida.com", "gongkaoleida.com"),
+        list_url_template="https://www.gongkaoleida.com/area/878-0-0-0-124?page={page}",
+        link_selector='a[href*="/article/"], a[href*="/info/"]',
+        content_selectors=['.article-content', '.detail-content'],
+        date_selectors=['.article-info'],
+        total_pages=334,
+    ),
+    "jshrss": Source(
+        name="jshrss",
+        label="jshrss.jiangsu.gov.cn",
+        hosts=("jshrss.jiangsu.gov.cn",),
+        # 省属事业单位招聘栏目；JCMS 栏目页第 1 页为 index.html，之后按 pageNum 翻页
+        first_page_url="https://jshrss.jiangsu.gov.cn/col/col78506/index.html",
+        list_url_template="https://jshrss.jiangsu.gov.cn/col/col78506/index.html?pageNum={page}",
+        link_selector='a[href*="/art/"]',
+        link_pattern=r'/art/\d{4}/\d{1,2}/\d{1,2}/art_\d+_\d+\.html',
+        content_selectors=['#zoom', '.bt-content', '.article-con'],
+        date_selectors=['.bt-info', '.sub-info'],
+        url_date_pattern=r'/art/(\d{4})/(\d{1,2})/(\d{1,2})/',
+        concurrency=2,
+    ),
+}
+
+# 无法确定来源的 URL 按公考雷达处理（与适配器之前的行为一致）
+DEFAULT_SOURCE = SOURCES["gongkaoleida"]
+
+
+def enabled_sources(names=None) -> list:
+    """按名称 (列表或逗号分隔字符串) 返回来源，默认读取 SOURCES 环境变量；未知名称抛出 ValueError"""
+    if names is None:
+        names = os.environ.get("SOURCES", ",".join(SOURCES))
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(",")]
+    unknown = [name for name in names if name and name not in SOURCES]
+    if unknown:
+        raise ValueError(f"未知来源: {', '.join(unknown)} (可选: {', '.join(SOURCES)})")
+    return [SOURCES[name] for name in dict.fromkeys(names) if name]
+
+
+def source_for_url(url: str) -> Source:
+    """按域名找到 URL 所属来源，未知域名返回 DEFAULT_SOURCE"""
+    host = urlparse(url or "").hostname or ""
+    for source in SOURCES.values():
+        if host in source.hosts:
+            return source
+    return DEFAULT_SOURCE
@@ -2,44 +2,69 @@
 """
 同步数据到 Notion
 
-读取: data/gongkaoleida_YYYYMMDD.json
-输出: 创建 Notion 数据库记录
+读取: data/jobs.db 中已处理 (processed 阶段) 的记录，或 --file 指定的 JSON 文件
+输出: 创建 Notion 数据库记录，成功或已存在的记录标记为 synced
 
-环境变量: NOTION_TOKEN
+使用方法:
+    python scripts/sync_notion.py [--file data/gongkaoleida_YYYYMMDD.json] [--rebuild-index]
+
+去重使用本地 Notion 索引 (notion_index.py)：先在本地过滤已同步的链接，
+只有存在新记录或变更时才访问 API，并按 last_edited_time 增量刷新索引。
+
+已同步的记录按属性哈希检测变更（截止日期、人数等修正），只 PATCH 变化的属性；
+索引中还没有哈希的旧页面首次只记录哈希，不更新。
+
+新记录还要经过近似重复检测 (near_dup.py)：其他来源转载或标题略有改动的同一公告
+不再新建页面，并输出与之相似的已有记录。
+
+环境变量: NOTION_TOKEN (限速/并发见 notion_client.py; 近似去重见 near_dup.py)
 """
 
-import glob
+import argparse
 import json
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
-import requests
+from job_store import JobStore
+from near_dup import NearDupIndex, format_match, job_key, near_dup_enabled, signature
+from notion_client import NotionClient, run_concurrent
+from notion_index import NotionIndex, property_hashes
 
 # 配置
-NOTION_API_URL = "https://api.notion.com/v1"
-NOTION_VERSION = "2022-06-28"
 DATABASE_NAME = "📋 招聘信息库"
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# 不参与变更检测的属性：采集时间每次处理都会变，状态由人工在 Notion 中维护
+UNTRACKED_PROPERTIES = ("采集时间", "状态")
+# 可选属性从有到无时用于清空的值
+EMPTY_PROPERTIES = {
+    "原文链接": {"url": None},
+    "发布日期": {"date": None},
+}
+
 
 class NotionSync:
-    def __init__(self, token: str):
+    def __init__(self, token: str, rebuild_index: bool = False):
         self.token = token
-        self.headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Notion-Version": NOTION_VERSION
-        }
+        self.client = NotionClient(token)
+        self.index = NotionIndex()
+        self.near_dup = NearDupIndex() if near_dup_enabled() else None
+        self.rebuild_index = rebuild_index
         self.database_id = None
     
     def find_database(self) -> bool:
-        """搜索数据库"""
-        url = f"{NOTION_API_URL}/search"
+        """搜索数据库（优先使用索引中缓存的数据库 ID）"""
+        cached_id = self.index.get_meta("database_id")
+        if cached_id and not self.rebuild_index:
+            self.database_id = cached_id
+            return True
+        
         data = {"query": DATABASE_NAME, "filter": {"value": "database", "property": "object"}}
         
-        resp = requests.post(url, headers=self.headers, json=data)
+        resp = self.client.post("search", data)
         if resp.status_code == 200:
             results = resp.json().get("results", [])
             if results:
@@ -50,39 +75,19 @@ class NotionSync:
         print(f"❌ 未找到数据库: {DATABASE_NAME}")
         return False
     
-    def get_existing_urls(self) -> set:
-        """获取已存在的 URL 用于去重"""
+    def refresh_index(self) -> int:
+        """增量刷新本地去重索引（首次或 --rebuild-index 时全量）"""
         if not self.database_id:
-            return set()
-        
-        urls = set()
-        url = f"{NOTION_API_URL}/databases/{self.database_id}/query"
-        has_more = True
-        start_cursor = None
-        
-        while has_more:
-            data = {"page_size": 100}
-            if start_cursor:
-                data["start_cursor"] = start_cursor
-            
-            resp = requests.post(url, headers=self.headers, json=data)
-            if resp.status_code == 200:
-                result = resp.json()
-                for page in result.get("results", []):
-                    url_prop = page.get("properties", {}).get("原文链接", {})
-                    if url_prop.get("url"):
-                        urls.add(url_prop["url"])
-                has_more = result.get("has_more", False)
-                start_cursor = result.get("next_cursor")
-            else:
-                break
-        
-        return urls
+            return 0
+        return self.index.refresh(self.client, self.database_id, rebuild=self.rebuild_index)
     
-    def create_page(self, job: dict) -> tuple[bool, str]:
-        """创建一条记录"""
-        url = f"{NOTION_API_URL}/pages"
-        
+    def get_existing_urls(self) -> set:
+        """获取已存在的 URL 用于去重（来自本地索引）"""
+        self.refresh_index()
+        return set(self.index.urls)
+    
+    def build_properties(self, job: dict) -> dict:
+        """把处理后的记录转换为 Notion 属性"""
         # 清理字段值，确保不是 None
         def clean(val, max_len=100):
             if val is None:
@@ -121,46 +126,159 @@ class NotionSync:
             except:
                 pass
         
-        payload = {"parent": {"database_id": self.database_id}, "properties": properties}
-        resp = requests.post(url, headers=self.headers, json=payload)
+        return properties
+    
+    def tracked_properties(self, job: dict) -> dict:
+        """参与变更检测的属性"""
+        properties = self.build_properties(job)
+        for name in UNTRACKED_PROPERTIES:
+            properties.pop(name, None)
+        return properties
+    
+    def changed_properties(self, job: dict) -> dict:
+        """
+        与上次写入相比发生变化的属性，无变化时返回空 dict
+
+        页面还没有记录哈希时（本功能之前创建或从 Notion 拉取的页面）以当前内容为基准，返回空 dict。
+        """
+        page_id = self.index.page_id(job.get("原文链接", ""))
+        properties = self.tracked_properties(job)
+        hashes = property_hashes(properties)
+        stored_hash, stored = self.index.get_hashes(page_id)
+        if stored_hash is None:
+            self.index.set_hashes(page_id, hashes)
+            return {}
+        changed = {name: value for name, value in properties.items() if stored.get(name) != hashes[name]}
+        for name in stored:
+            if name not in properties and name in EMPTY_PROPERTIES:
+                changed[name] = EMPTY_PROPERTIES[name]
+        return changed
+    
+    def update_page(self, item: tuple) -> tuple[bool, str]:
+        """PATCH 变化的属性，item 为 (page_id, properties)；成功返回 (True, page_id)"""
+        page_id, properties = item
+        try:
+            resp = self.client.patch(f"pages/{page_id}", {"properties": properties})
+        except Exception as e:
+            return False, str(e)
+        
+        if resp.status_code == 200:
+            return True, page_id
+        error_msg = resp.text[:200] if resp.text else f"HTTP {resp.status_code}"
+        return False, error_msg
+    
+    def create_page(self, job: dict) -> tuple[bool, str]:
+        """创建一条记录，成功返回 (True, page_id)，失败返回 (False, 错误信息)"""
+        payload = {"parent": {"database_id": self.database_id}, "properties": self.build_properties(job)}
+        try:
+            resp = self.client.post("pages", payload)
+        except Exception as e:
+            return False, str(e)
         
         if resp.status_code == 200:
-            return True, ""
+            return True, resp.json().get("id", "")
         else:
             error_msg = resp.text[:200] if resp.text else f"HTTP {resp.status_code}"
             return False, error_msg
     
     def sync(self, jobs: list) -> dict:
-        """同步所有数据"""
-        stats = {"success": 0, "skipped": 0, "failed": 0}
+        """
+        同步所有数据：先本地去重和变更检测，再按限速并发创建页面、PATCH 变化的属性
         
-        existing = self.get_existing_urls()
-        print(f"📊 数据库已有: {len(existing)} 条记录")
+        stats["done_urls"] 为已成功写入、更新或已存在的 URL，stats["page_ids"] 为新建页面 {url: page_id}，
+        stats["near_dups"] 为近似重复而跳过的记录 [(url, 相似的已有记录)]（同时计入 skipped）
+        """
+        stats = {"success": 0, "updated": 0, "skipped": 0, "near_dup": 0, "failed": 0, "done_urls": [],
+                 "page_ids": {}, "near_dups": [], "pages_per_sec": 0.0}
         
-        first_error = None
+        fetched = self.refresh_index()
+        print(f"📊 数据库已有: {len(self.index)} 条记录 (本次增量拉取 {fetched} 条)")
+        
+        to_create = []
+        to_update = []
+        queued = set()
         for i, job in enumerate(jobs, 1):
             job_url = job.get("原文链接", "")
-            job_title = job.get("职位名称", "未知")
-            if job_title:
-                job_title = str(job_title)[:30]
-            else:
-                job_title = "未知"
-            
-            if job_url in existing:
+            if job_url and job_url in queued:
                 stats["skipped"] += 1
-                print(f"   [{i}/{len(jobs)}] ⏭️ 跳过: {job_title}...")
+                stats["done_urls"].append(job_url)
+                print(f"   [{i}/{len(jobs)}] ⏭️ 跳过: {_short_title(job)}...")
+                continue
+            queued.add(job_url)
+            if self.index.has_url(job_url):
+                changed = self.changed_properties(job)
+                if changed:
+                    to_update.append(job)
+                    print(f"   [{i}/{len(jobs)}] 🔄 变更: {_short_title(job)}... ({', '.join(changed)})")
+                else:
+                    stats["skipped"] += 1
+                    stats["done_urls"].append(job_url)
+                    print(f"   [{i}/{len(jobs)}] ⏭️ 跳过: {_short_title(job)}...")
                 continue
-            
-            print(f"   [{i}/{len(jobs)}] 同步: {job_title}...")
-            success, error = self.create_page(job)
+            if self.near_dup is not None:
+                sig = signature(job.get("职位名称", ""), job.get("职位描述", ""))
+                match = self.near_dup.query(job, sig)
+                if match:
+                    stats["skipped"] += 1
+                    stats["near_dup"] += 1
+                    stats["done_urls"].append(job_url)
+                    stats["near_dups"].append((job_url, match))
+                    print(f"   [{i}/{len(jobs)}] 🔁 近似重复: {_short_title(job)}... {format_match(match)}")
+                    continue
+                # 先加到内存，同一批次内的转载也能命中；创建成功后再写库
+                self.near_dup.add(job, sig, save=False)
+            to_create.append(job)
+        
+        if not to_create and not to_update:
+            return stats
+        
+        print(f"🚀 并发创建 {len(to_create)} 条, 更新 {len(to_update)} 条 "
+              f"(并发 {self.client.concurrency}, 限速 {self.client.limiter.rate:g} 次/秒)")
+        start = time.perf_counter()
+        first_error = None
+        
+        results = run_concurrent(self.create_page, to_create, self.client.concurrency)
+        for i, (job, (success, info)) in enumerate(zip(to_create, results), 1):
+            job_url = job.get("原文链接", "")
             if success:
                 stats["success"] += 1
-                existing.add(job_url)
+                stats["done_urls"].append(job_url)
+                stats["page_ids"][job_url] = info
+                self.index.add(info, job_url, job.get("职位名称", ""))
+                self.index.set_hashes(info, property_hashes(self.tracked_properties(job)))
+                if self.near_dup is not None:
+                    self.near_dup.save(job_key(job))
+                print(f"   [{i}/{len(to_create)}] ✅ 同步: {_short_title(job)}...")
             else:
                 stats["failed"] += 1
+                if self.near_dup is not None:
+                    self.near_dup.discard(job_key(job))
                 if not first_error:
-                    first_error = error
-                print(f"      ❌ 错误: {error[:100]}")
+                    first_error = info
+                print(f"   [{i}/{len(to_create)}] ❌ 错误: {_short_title(job)}... {info[:100]}")
+        
+        updates = [(self.index.page_id(job.get("原文链接", "")), self.changed_properties(job))
+                   for job in to_update]
+        results = run_concurrent(self.update_page, updates, self.client.concurrency)
+        for i, (job, (success, info)) in enumerate(zip(to_update, results), 1):
+            job_url = job.get("原文链接", "")
+            if success:
+                stats["updated"] += 1
+                stats["done_urls"].append(job_url)
+                self.index.set_hashes(info, property_hashes(self.tracked_properties(job)))
+                print(f"   [{i}/{len(to_update)}] 🔄 更新: {_short_title(job)}...")
+            else:
+                stats["failed"] += 1
+                if not first_error:
+                    first_error = info
+                print(f"   [{i}/{len(to_update)}] ❌ 更新失败: {_short_title(job)}... {info[:100]}")
+        
+        elapsed = time.perf_counter() - start
+        written = len(to_create) + len(to_update)
+        stats["pages_per_sec"] = written / elapsed if elapsed else 0.0
+        print(f"⚡ 吞吐: {stats['pages_per_sec']:.2f} 页/秒 ({elapsed:.1f}s, "
+              f"请求 {self.client.stats['requests']} 次, 重试 {self.client.stats['retries']} 次, "
+              f"429 {self.client.stats['rate_limited']} 次)")
         
         if first_error:
             print(f"\n⚠️ 首个错误详情: {first_error}")
@@ -168,41 +286,85 @@ class NotionSync:
         return stats
 
 
-def main():
-    token = os.environ.get("NOTION_TOKEN")
-    if not token:
-        print("❌ 未设置 NOTION_TOKEN 环境变量")
-        sys.exit(1)
-    
-    # 查找最新的数据文件
-    files = sorted(DATA_DIR.glob("gongkaoleida_*.json"), reverse=True)
-    if not files:
-        print("❌ 未找到数据文件")
-        sys.exit(1)
-    
-    data_file = files[0]
-    print(f"📂 数据文件: {data_file.name}")
+def _short_title(job: dict) -> str:
+    job_title = job.get("职位名称", "未知")
+    return str(job_title)[:30] if job_title else "未知"
+
+
+def run_sync(token: str, file: str = None, rebuild_index: bool = False) -> dict:
+    """
+    同步待同步记录（或 file 中的记录）到 Notion，并在职位库中标记已同步
+
+    返回 {"pending": 待同步数, "success": 新建数, "updated": 更新数, "skipped": 已存在且无变化数,
+          "near_dup": 其中近似重复数, "failed": 失败数, "database_id": 数据库 ID, "error": 错误信息或 None}
+    """
+    result = {"pending": 0, "success": 0, "updated": 0, "skipped": 0, "near_dup": 0, "failed": 0,
+              "database_id": None, "error": None}
     
-    with open(data_file, "r", encoding="utf-8") as f:
-        jobs = json.load(f)
+    if file:
+        print(f"📂 数据文件: {file}")
+        with open(file, "r", encoding="utf-8") as f:
+            jobs = json.load(f)
+    else:
+        with JobStore() as store:
+            jobs = [row["processed"] for row in store.pending("processed")]
+        print(f"🗄️ 职位库待同步记录")
     
+    result["pending"] = len(jobs)
     print(f"📊 待同步: {len(jobs)} 条")
+    if not jobs:
+        return result
     
-    sync = NotionSync(token)
-    if not sync.find_database():
-        sys.exit(1)
+    sync = NotionSync(token, rebuild_index=rebuild_index)
+    
+    # 本地索引已包含全部链接且内容都没有变化时无需访问 Notion
+    known = [job.get("原文链接", "") for job in jobs if sync.index.has_url(job.get("原文链接", ""))]
+    if (len(known) == len(jobs) and not rebuild_index
+            and not any(sync.changed_properties(job) for job in jobs)):
+        stats = {"success": 0, "updated": 0, "skipped": len(jobs), "near_dup": 0, "failed": 0,
+                 "done_urls": known, "page_ids": {}, "near_dups": []}
+        print("🗂️ 本地索引显示全部已同步且无变化，跳过 API 调用")
+    else:
+        if not sync.find_database():
+            result["error"] = "database not found"
+            return result
+        stats = sync.sync(jobs)
     
-    stats = sync.sync(jobs)
+    with JobStore() as store:
+        store.mark_synced(stats["done_urls"], stats["page_ids"])
     
     print(f"\n{'='*40}")
     print(f"✅ 成功: {stats['success']} 条")
-    print(f"⏭️ 跳过: {stats['skipped']} 条 (已存在)")
+    print(f"🔄 更新: {stats['updated']} 条")
+    print(f"⏭️ 跳过: {stats['skipped']} 条 (已存在, 其中近似重复 {stats['near_dup']} 条)")
+    for url, match in stats["near_dups"]:
+        print(f"   🔁 {url or '无链接'} {format_match(match)}")
     print(f"❌ 失败: {stats['failed']} 条")
     
     # 输出数据库链接
     if sync.database_id:
         db_id = sync.database_id.replace("-", "")
         print(f"\n📎 Notion: https://www.notion.so/{db_id}")
+    
+    result.update(success=stats["success"], updated=stats["updated"], skipped=stats["skipped"],
+                  near_dup=stats["near_dup"], failed=stats["failed"], database_id=sync.database_id)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步数据到 Notion")
+    parser.add_argument("--file", help="同步指定 JSON 文件（默认读取职位库中待同步记录）")
+    parser.add_argument("--rebuild-index", action="store_true", help="全量重建本地 Notion 索引")
+    args = parser.parse_args()
+    
+    token = os.environ.get("NOTION_TOKEN")
+    if not token:
+        print("❌ 未设置 NOTION_TOKEN 环境变量")
+        sys.exit(1)
+    
+    result = run_sync(token, args.file, args.rebuild_index)
+    if result["error"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
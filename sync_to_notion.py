@@ -5,9 +5,11 @@ Sync Job Listings to Notion Database
 
 使用方法:
 1. 设置环境变量 NOTION_TOKEN (Notion Integration Token)
-2. 运行: python sync_to_notion.py [json_file]
+2. 运行: python sync_to_notion.py [json_file] [--rebuild-index]
 
 如果未指定 json_file，将自动查找当前目录下最新的 采集结果_*.json 文件
+除链接/标题精确去重外，还按 正文+标题 做近似重复检测 (scripts/near_dup.py，
+NEAR_DUP_THRESHOLD / NEAR_DUP_TITLE_THRESHOLD 调整阈值，NEAR_DUP=0 关闭)
 """
 
 import json
@@ -16,12 +18,14 @@ import sys
 import glob
 from datetime import datetime
 from typing import Optional
-import requests
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from notion_client import NotionClient, run_concurrent
+from notion_index import NotionIndex, title_hash
+from near_dup import NearDupIndex, format_match, job_key, near_dup_enabled, signature
+
 # Notion API 配置
-NOTION_API_URL = "https://api.notion.com/v1"
-NOTION_VERSION = "2022-06-28"
 DATABASE_NAME = "📋 招聘信息库"
 
 # 数据库属性定义
@@ -53,61 +57,33 @@ DATABASE_PROPERTIES = {
 
 
 class NotionSync:
-    def __init__(self, token: str):
+    def __init__(self, token: str, rebuild_index: bool = False):
         self.token = token
-        self.headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Notion-Version": NOTION_VERSION
-        }
+        self.client = NotionClient(token)
+        self.index = NotionIndex()  # 本地去重索引
+        self.near_dup = NearDupIndex() if near_dup_enabled() else None  # 近似重复索引
+        self.rebuild_index = rebuild_index
         self.database_id = None
         self.existing_urls = set()  # 用于去重
+        self.created_ids = {}  # 本次新建的页面 原文链接 -> page_id
     
     def get_existing_records(self) -> tuple[set, set]:
-        """获取数据库中已存在的原文链接和职位名称，用于去重"""
+        """
+        获取数据库中已存在的原文链接和职位名称哈希，用于去重
+        
+        来自本地索引 (scripts/notion_index.py)，只增量拉取上次之后编辑过的页面。
+        """
         if not self.database_id:
             return set(), set()
         
-        urls = set()
-        titles = set()
-        url = f"{NOTION_API_URL}/databases/{self.database_id}/query"
-        has_more = True
-        start_cursor = None
-        
         print("🔍 检查数据库中已有记录...")
-        while has_more:
-            data = {"page_size": 100}
-            if start_cursor:
-                data["start_cursor"] = start_cursor
-            
-            try:
-                response = requests.post(url, headers=self.headers, json=data)
-                if response.status_code == 200:
-                    result = response.json()
-                    for page in result.get("results", []):
-                        props = page.get("properties", {})
-                        
-                        # 获取 URL
-                        url_prop = props.get("原文链接", {})
-                        if url_prop.get("url"):
-                            urls.add(url_prop["url"])
-                            
-                        # 获取 Title
-                        title_prop = props.get("职位名称", {})
-                        if title_prop.get("title"):
-                            title_text = "".join([t.get("plain_text", "") for t in title_prop.get("title", [])])
-                            if title_text:
-                                titles.add(title_text)
-                                
-                    has_more = result.get("has_more", False)
-                    start_cursor = result.get("next_cursor")
-                else:
-                    print(f"⚠️ 查询数据库失败: {response.status_code}")
-                    break
-            except Exception as e:
-                print(f"⚠️ 查询数据库出错: {e}")
-                break
+        try:
+            fetched = self.index.refresh(self.client, self.database_id, rebuild=self.rebuild_index)
+            print(f"🗂️ 索引增量拉取: {fetched} 条")
+        except Exception as e:
+            print(f"⚠️ 刷新索引出错: {e}")
         
+        urls, titles = set(self.index.urls), set(self.index.titles)
         print(f"📊 已有记录: {len(urls)} 个链接, {len(titles)} 个标题")
         return urls, titles
     
@@ -115,9 +91,14 @@ class NotionSync:
         """检查数据库是否可访问，如果不知道ID则尝试搜索"""
         if self.database_id:
             return True
+        
+        cached_id = self.index.get_meta("database_id")
+        if cached_id and not self.rebuild_index:
+            self.database_id = cached_id
+            print(f"✅ 使用缓存的数据库 ID: {self.database_id}")
+            return True
             
         print("🔍 正在搜索 Notion 数据库...")
-        url = f"{NOTION_API_URL}/search"
         data = {
             "query": DATABASE_NAME,
             "filter": {
@@ -127,7 +108,7 @@ class NotionSync:
         }
         
         try:
-            response = requests.post(url, headers=self.headers, json=data)
+            response = self.client.post("search", data)
             if response.status_code == 200:
                 results = response.json().get("results", [])
                 if results:
@@ -149,8 +130,6 @@ class NotionSync:
         """创建一条新的招聘记录"""
         if not self.database_id:
             return False
-            
-        url = f"{NOTION_API_URL}/pages"
         
         # 构建属性
         properties = {}
@@ -219,8 +198,10 @@ class NotionSync:
         }
         
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self.client.post("pages", payload)
             if response.status_code == 200:
+                # 在工作线程中只记录 ID，索引由主线程写入
+                self.created_ids[job_data.get("原文链接") or id(job_data)] = response.json().get("id", "")
                 return True
             else:
                 print(f"❌ 创建页面失败: {response.status_code} - {response.text}")
@@ -230,8 +211,8 @@ class NotionSync:
             return False
 
     def sync_jobs(self, jobs: list, skip_duplicates: bool = True) -> dict:
-        """同步所有招聘信息，支持去重"""
-        results = {"success": 0, "failed": 0, "skipped": 0, "details": []}
+        """同步所有招聘信息，支持去重；去重在本地完成，新记录按限速并发创建"""
+        results = {"success": 0, "failed": 0, "skipped": 0, "near_dup": 0, "details": []}
         
         # 获取已存在的记录用于去重
         existing_urls = set()
@@ -240,11 +221,12 @@ class NotionSync:
         if skip_duplicates:
             existing_urls, existing_titles = self.get_existing_records()
         
+        to_create = []
         for i, job in enumerate(jobs, 1):
             job_name = job.get("职位名称", "未知职位")
             job_url = job.get("原文链接", "")
             
-            # 检查是否重复 (链接重复 或 标题重复)
+            # 检查是否重复 (链接重复、标题重复 或 近似重复)
             is_duplicate = False
             duplicate_reason = ""
             
@@ -252,9 +234,18 @@ class NotionSync:
                 if job_url and job_url in existing_urls:
                     is_duplicate = True
                     duplicate_reason = "链接已存在"
-                elif job_name and job_name in existing_titles:
+                elif job_name and title_hash(job_name) in existing_titles:
                     is_duplicate = True
                     duplicate_reason = "标题已存在"
+                elif self.near_dup is not None:
+                    sig = signature(job_name, job.get("职位描述", ""))
+                    match = self.near_dup.query(job, sig)
+                    if match:
+                        is_duplicate = True
+                        duplicate_reason = f"近似重复 {format_match(match)}"
+                        results["near_dup"] += 1
+                    else:
+                        self.near_dup.add(job, sig, save=False)
             
             if is_duplicate:
                 results["skipped"] += 1
@@ -263,20 +254,43 @@ class NotionSync:
                 print(f"  [{i}/{len(jobs)}] 跳过: {short_name} ({duplicate_reason})")
                 continue
             
-            print(f"  [{i}/{len(jobs)}] 同步: {job_name[:30]}...")
-            
-            if self.create_page(job):
+            # 同一批次内的重复也要跳过
+            if job_url:
+                existing_urls.add(job_url)
+            if job_name:
+                existing_titles.add(title_hash(job_name))
+            to_create.append(job)
+        
+        if not to_create:
+            return results
+        
+        print(f"  🚀 并发创建 {len(to_create)} 条 (并发 {self.client.concurrency}, "
+              f"限速 {self.client.limiter.rate:g} 次/秒)")
+        start = time.perf_counter()
+        created = run_concurrent(self.create_page, to_create, self.client.concurrency)
+        elapsed = time.perf_counter() - start
+        
+        for i, (job, ok) in enumerate(zip(to_create, created), 1):
+            job_name = job.get("职位名称", "未知职位")
+            print(f"  [{i}/{len(to_create)}] {'同步' if ok else '失败'}: {job_name[:30]}...")
+            if ok:
                 results["success"] += 1
                 results["details"].append(f"✅ {job_name[:30]}")
-                # 更新本地缓存
-                if job_url:
-                    existing_urls.add(job_url)
-                if job_name:
-                    existing_titles.add(job_name)
+                job_url = job.get("原文链接")
+                page_id = self.created_ids.get(job_url or id(job))
+                if page_id:
+                    self.index.add(page_id, job_url, job_name)
+                if self.near_dup is not None:
+                    self.near_dup.save(job_key(job))
             else:
                 results["failed"] += 1
+                if self.near_dup is not None:
+                    self.near_dup.discard(job_key(job))
                 results["details"].append(f"❌ {job_name[:30]}")
         
+        results["pages_per_sec"] = len(to_create) / elapsed if elapsed else 0.0
+        print(f"  ⚡ 吞吐: {results['pages_per_sec']:.2f} 页/秒 ({elapsed:.1f}s)")
+        
         return results
 
 
@@ -326,8 +340,10 @@ def main():
         sys.exit(1)
     
     # 确定要同步的文件
-    if len(sys.argv) > 1:
-        json_file = sys.argv[1]
+    file_args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    rebuild_index = "--rebuild-index" in sys.argv[1:]
+    if file_args:
+        json_file = file_args[0]
     else:
         json_file = find_latest_json()
         if not json_file:
@@ -350,7 +366,7 @@ def main():
         sys.exit(1)
     
     # 初始化 Notion 同步器
-    sync = NotionSync(token)
+    sync = NotionSync(token, rebuild_index=rebuild_index)
     
     # 确保数据库存在
     if not sync.ensure_database():
@@ -366,7 +382,7 @@ def main():
     print("📊 同步结果")
     print("=" * 50)
     print(f"✅ 成功: {results['success']} 条")
-    print(f"⏭️ 跳过: {results.get('skipped', 0)} 条 (已存在)")
+    print(f"⏭️ 跳过: {results.get('skipped', 0)} 条 (已存在, 其中近似重复 {results.get('near_dup', 0)} 条)")
     print(f"❌ 失败: {results['failed']} 条")
     
     if results['details']:
@@ -2,34 +2,52 @@
 """
 更新 Notion 中职位名称为空的记录
 Update Notion records with empty job titles
+
+空标题筛选在 Notion 查询中完成（职位名称为空或以空白开头、且原文链接不为空），返回的页面再在本地
+去掉空白后确认标题为空（只含空白的标题也需要修复）；
+标题从所有历史 data/gongkaoleida_*.json（从旧到新）和职位库 data/jobs.db（最后，优先）中按原文链接查找，
+更新按限速并发发送 (scripts/notion_client.py)。
+
+使用方法:
+    python update_empty_titles.py [额外数据文件 ...] [--dry-run]
 """
 
+import argparse
+import glob
 import json
 import os
 import sys
-import requests
+import time
 
-NOTION_API_URL = "https://api.notion.com/v1"
-NOTION_VERSION = "2022-06-28"
-DATABASE_NAME = "📋 招聘信息库"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from job_store import JobStore
+from notion_client import NotionClient, run_concurrent
+from notion_index import NotionIndex, page_title
 
-
-def get_headers(token):
-    return {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "Notion-Version": NOTION_VERSION
-    }
-
-
-def find_database(headers):
-    """Search for the database"""
-    url = f"{NOTION_API_URL}/search"
+DATABASE_NAME = "📋 招聘信息库"
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# 候选页面：职位名称为空或以空白开头（可能只含空白，返回后在本地确认），且有原文链接可用于查找标题
+BLANK_PREFIXES = (" ", "\u3000", "\t", "\n")
+EMPTY_TITLE_FILTER = {
+    "and": [
+        {"property": "原文链接", "url": {"is_not_empty": True}},
+        {"or": [{"property": "职位名称", "title": {"is_empty": True}}] +
+               [{"property": "职位名称", "title": {"starts_with": prefix}} for prefix in BLANK_PREFIXES]},
+    ]
+}
+
+
+def find_database(client, index):
+    """Search for the database (优先使用本地索引中缓存的数据库 ID)"""
+    cached_id = index.get_meta("database_id")
+    if cached_id:
+        return cached_id
     data = {
         "query": DATABASE_NAME,
         "filter": {"value": "database", "property": "object"}
     }
-    response = requests.post(url, headers=headers, json=data, timeout=30)
+    response = client.post("search", data)
     if response.status_code == 200:
         results = response.json().get("results", [])
         if results:
@@ -37,48 +55,39 @@ def find_database(headers):
     return None
 
 
-def get_pages_with_empty_titles(headers, database_id):
-    """Get all pages with empty titles"""
-    url = f"{NOTION_API_URL}/databases/{database_id}/query"
+def get_pages_with_empty_titles(client, database_id):
+    """Get all pages with empty titles (服务端筛选候选页面，本地确认去掉空白后为空)"""
     pages = []
     has_more = True
     start_cursor = None
-    
+
     while has_more:
-        data = {"page_size": 100}
+        data = {"page_size": 100, "filter": EMPTY_TITLE_FILTER}
         if start_cursor:
             data["start_cursor"] = start_cursor
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+
+        response = client.post(f"databases/{database_id}/query", data)
         if response.status_code != 200:
             print(f"❌ 查询失败: {response.status_code}")
             break
-        
+
         result = response.json()
         for page in result.get("results", []):
-            props = page.get("properties", {})
-            title_prop = props.get("职位名称", {})
-            title_arr = title_prop.get("title", [])
-            title_text = "".join([t.get("plain_text", "") for t in title_arr])
-            
-            url_prop = props.get("原文链接", {})
-            page_url = url_prop.get("url", "")
-            
-            if not title_text.strip() and page_url:
+            page_url = page.get("properties", {}).get("原文链接", {}).get("url", "")
+            if not page_title(page).strip() and page_url:
                 pages.append({
                     "page_id": page["id"],
                     "url": page_url
                 })
-        
+
         has_more = result.get("has_more", False)
         start_cursor = result.get("next_cursor")
-    
+
     return pages
 
 
-def update_page_title(headers, page_id, title):
+def update_page_title(client, page_id, title):
     """Update a page's title"""
-    url = f"{NOTION_API_URL}/pages/{page_id}"
     data = {
         "properties": {
             "职位名称": {
@@ -86,7 +95,10 @@ def update_page_title(headers, page_id, title):
             }
         }
     }
-    response = requests.patch(url, headers=headers, json=data, timeout=30)
+    try:
+        response = client.patch(f"pages/{page_id}", data)
+    except Exception:
+        return False
     return response.status_code == 200
 
 
@@ -94,64 +106,109 @@ def load_job_data(file_path):
     """Load job data and create URL -> title mapping"""
     with open(file_path, 'r', encoding='utf-8') as f:
         jobs = json.load(f)
-    return {job.get("原文链接"): job.get("职位名称") for job in jobs if job.get("原文链接")}
+    return {job.get("原文链接"): job.get("职位名称").strip() for job in jobs
+            if job.get("原文链接") and (job.get("职位名称") or "").strip()}
+
+
+def build_title_index(extra_files=()):
+    """
+    URL -> 标题索引：新数据覆盖旧数据
+        1. 所有 gongkaoleida_*.json 和额外数据文件，按修改时间从旧到新
+        2. 职位库中的记录（最新的处理结果）最后写入
+
+    返回 (索引, 读取的文件数)
+    """
+    url_to_title = {}
+    files = glob.glob(os.path.join(DATA_DIR, "gongkaoleida_*.json"))
+    files += [f for f in extra_files if f not in files]
+    files.sort(key=os.path.getmtime)
+    for file_path in files:
+        try:
+            url_to_title.update(load_job_data(file_path))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 跳过 {os.path.basename(file_path)}: {e}")
+
+    with JobStore() as store:
+        for row in store.iter_stage(["processed", "synced"]):
+            title = (row["processed"].get("职位名称") or row["list"].get("title") or "").strip()
+            if title:
+                url_to_title[row["url"]] = title
+    return url_to_title, len(files)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="更新 Notion 中职位名称为空的记录")
+    parser.add_argument("files", nargs="*", help="额外的数据文件（默认已包含 data/gongkaoleida_*.json）")
+    parser.add_argument("--dry-run", action="store_true", help="只列出需要更新的记录，不写入 Notion")
+    args = parser.parse_args()
+
     token = os.environ.get("NOTION_TOKEN")
     if not token:
         print("❌ 请设置 NOTION_TOKEN 环境变量")
         sys.exit(1)
-    
+
+    for data_file in args.files:
+        if not os.path.exists(data_file):
+            print(f"❌ 数据文件不存在: {data_file}")
+            sys.exit(1)
+
     # Load job data
-    data_file = sys.argv[1] if len(sys.argv) > 1 else "data/gongkaoleida_20260115.json"
-    if not os.path.exists(data_file):
-        print(f"❌ 数据文件不存在: {data_file}")
-        sys.exit(1)
-    
-    print(f"📂 加载数据: {data_file}")
-    url_to_title = load_job_data(data_file)
-    print(f"📊 共 {len(url_to_title)} 条记录")
-    
-    headers = get_headers(token)
-    
+    url_to_title, file_count = build_title_index(args.files)
+    print(f"📂 标题索引: {len(url_to_title)} 条 (职位库 + {file_count} 个数据文件)")
+
+    client = NotionClient(token)
+    index = NotionIndex()
+
     # Find database
     print("🔍 搜索 Notion 数据库...")
-    database_id = find_database(headers)
+    database_id = find_database(client, index)
     if not database_id:
         print("❌ 未找到数据库")
         sys.exit(1)
     print(f"✅ 找到数据库: {database_id}")
-    
+
     # Get pages with empty titles
     print("🔍 查找空标题记录...")
-    empty_pages = get_pages_with_empty_titles(headers, database_id)
+    empty_pages = get_pages_with_empty_titles(client, database_id)
     print(f"📊 找到 {len(empty_pages)} 条空标题记录")
-    
+
     if not empty_pages:
         print("✅ 没有需要更新的记录")
         return
-    
-    # Update pages
-    updated = 0
-    failed = 0
+
+    updates = []
     for page in empty_pages:
-        page_url = page["url"]
-        new_title = url_to_title.get(page_url, "")
-        
+        new_title = url_to_title.get(page["url"], "")
         if not new_title:
-            print(f"⚠️ 未找到标题: {page_url}")
+            print(f"⚠️ 未找到标题: {page['url']}")
             continue
-        
         short_title = new_title[:40] + "..." if len(new_title) > 40 else new_title
         print(f"  更新: {short_title}")
-        
-        if update_page_title(headers, page["page_id"], new_title):
+        updates.append((page, new_title))
+
+    if args.dry_run or not updates:
+        print(f"\n📋 可更新: {len(updates)} 条{' (dry run，未写入)' if args.dry_run else ''}")
+        return
+
+    # Update pages
+    print(f"🚀 并发更新 {len(updates)} 条 (并发 {client.concurrency}, 限速 {client.limiter.rate:g} 次/秒)")
+    start = time.perf_counter()
+    results = run_concurrent(lambda item: update_page_title(client, item[0]["page_id"], item[1]),
+                             updates, client.concurrency)
+    elapsed = time.perf_counter() - start
+
+    updated = 0
+    failed = 0
+    for (page, new_title), ok in zip(updates, results):
+        if ok:
             updated += 1
+            # 本地去重索引同步记录新标题
+            index.add(page["page_id"], page["url"], new_title)
         else:
             failed += 1
-    
-    print(f"\n✅ 更新完成: {updated} 条成功, {failed} 条失败")
+            print(f"❌ 更新失败: {page['url']}")
+
+    print(f"\n✅ 更新完成: {updated} 条成功, {failed} 条失败 ({elapsed:.1f}s)")
 
 
 if __name__ == "__main__":